@@ -0,0 +1,89 @@
+"""
+Compare a collection PATCH of 'add' patches against adding one ORM object per
+patch, as the collection PATCH did before inserts were batched.
+
+    python -m benchmarks.bulk_insert [dsn] [rows ...]
+
+The DSN defaults to a temporary SQLite file.
+"""
+from datetime import datetime
+import json
+import sys
+import tempfile
+import time
+
+import falcon
+import falcon.testing
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from falcon_autocrud.middleware import Middleware
+from falcon_autocrud.resource import CollectionResource
+from falcon_autocrud.test_base import Base
+from falcon_autocrud.test_fixtures import Employee
+
+
+class EmployeeCollectionResource(CollectionResource):
+    model   = Employee
+    methods = ['PATCH']
+
+
+def patches(rows):
+    return [
+        {'op': 'add', 'path': '/', 'value': {
+            'name':     'Employee {0}'.format(index),
+            'joined':   '2016-10-01T13:00:00Z',
+            'caps_name': 'EMPLOYEE {0}'.format(index),
+        }}
+        for index in range(rows)
+    ]
+
+
+def per_object(db_engine, body):
+    # The unit of work path: one object, and one INSERT, per patch
+    db_session = sessionmaker(bind=db_engine)()
+    for patch in body['patches']:
+        args = {}
+        for key, value in patch['value'].items():
+            if key == 'joined':
+                args[key] = datetime.strptime(value, '%Y-%m-%dT%H:%M:%SZ')
+            else:
+                args[key] = value
+        db_session.add(Employee(**args))
+    db_session.commit()
+    db_session.close()
+
+
+def collection_patch(db_engine, body):
+    app = falcon.API(middleware=[Middleware()])
+    app.add_route('/employees', EmployeeCollectionResource(db_engine))
+    srmock = falcon.testing.StartResponseMock()
+    env = falcon.testing.create_environ(
+        path='/employees',
+        method='PATCH',
+        body=json.dumps(body),
+        headers={'Accept': 'application/json', 'Content-Type': 'application/json'},
+    )
+    app(env, srmock)
+    assert srmock.status == '200 OK', srmock.status
+
+
+def main(dsn=None, *sizes):
+    sizes = [int(size) for size in sizes] or [1000, 10000, 100000]
+    if dsn is None:
+        db_file = tempfile.NamedTemporaryFile()
+        dsn = 'sqlite:///{0}'.format(db_file.name)
+    db_engine = create_engine(dsn)
+    for rows in sizes:
+        body = patches(rows)
+        for name, func in [('per object', per_object), ('collection patch', collection_patch)]:
+            Base.metadata.drop_all(db_engine)
+            Base.metadata.create_all(db_engine)
+            start = time.perf_counter()
+            func(db_engine, {'patches': body})
+            elapsed = time.perf_counter() - start
+            print('{0:<18} {1:>10.1f} ms for {2} rows'.format(name, elapsed * 1000, rows))
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
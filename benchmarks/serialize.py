@@ -0,0 +1,62 @@
+"""
+Compare the compiled serializer against per-value type inspection.
+
+    python -m benchmarks.serialize [rows]
+"""
+from datetime import datetime, time
+from decimal import Decimal
+import sys
+import timeit
+
+from sqlalchemy.inspection import inspect
+from sqlalchemy.orm.properties import ColumnProperty
+
+from falcon_autocrud.serialize import get_serializer, serialize_value
+from falcon_autocrud.test_fixtures import Employee
+
+
+def inspecting_serialize(resource, response_fields=None, geometry_axes=None, naive_datetimes=()):
+    # The serialization path used before serializers were compiled per model
+    attrs = inspect(resource.__class__).attrs
+    if response_fields is None:
+        response_fields = attrs.keys()
+    return {
+        attr: serialize_value(attr, getattr(resource, attr), geometry_axes, naive_datetimes)
+        for attr in response_fields
+        if isinstance(attrs[attr], ColumnProperty)
+    }
+
+
+def compiled_serialize(resource, response_fields=None, geometry_axes=None, naive_datetimes=()):
+    return get_serializer(resource.__class__, response_fields, geometry_axes, naive_datetimes)(resource)
+
+
+def main(rows=5000, repeat=5):
+    now = datetime.utcnow()
+    employees = [
+        Employee(
+            id=i,
+            name='Employee {0}'.format(i),
+            joined=now,
+            pay_rate=Decimal('25.40'),
+            start_time=time(9, 0),
+            end_time=time(17, 0),
+            company_id=i % 10,
+        )
+        for i in range(rows)
+    ]
+    assert [inspecting_serialize(e) for e in employees] == [compiled_serialize(e) for e in employees]
+
+    serialize = get_serializer(Employee)
+    for name, func in [
+        ('inspecting', inspecting_serialize),
+        ('compiled', compiled_serialize),
+        # As done by CollectionResource.on_get: look up once per request
+        ('hoisted', serialize),
+    ]:
+        best = min(timeit.repeat(lambda: [func(e) for e in employees], number=1, repeat=repeat))
+        print('{0:<12} {1:>8.2f} ms for {2} rows'.format(name, best * 1000, rows))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,88 @@
+"""
+Compare validating a bulk PATCH body with jsonschema.validate, as the
+middleware did before validators were cached, against the cached and the
+generated validators.
+
+    python -m benchmarks.validate [patches ...]
+"""
+import sys
+import time
+
+import jsonschema
+
+from falcon_autocrud.validator import FastjsonschemaValidator, JSONSchemaValidator
+
+
+SCHEMA = {
+    '$schema':      'http://json-schema.org/draft-04/schema#',
+    'type':         'object',
+    'properties':   {
+        'patches':  {
+            'type':     'array',
+            'items':    {
+                'type':         'object',
+                'properties':   {
+                    'op':       {'type': 'string', 'enum': ['add', 'upsert', 'replace', 'remove']},
+                    'path':     {'type': 'string', 'pattern': '^/'},
+                    'pks':      {'type': 'array', 'items': {'type': 'integer'}},
+                    'value':    {
+                        'type':         'object',
+                        'properties':   {
+                            'name':         {'type': 'string', 'minLength': 1, 'maxLength': 50},
+                            'joined':       {'type': 'string', 'format': 'date-time'},
+                            'left':         {'type': ['string', 'null'], 'format': 'date-time'},
+                            'company_id':   {'type': ['integer', 'null']},
+                            'pay_rate':     {'type': ['number', 'null'], 'minimum': 0},
+                            'start_time':   {'type': ['string', 'null'], 'pattern': '^[0-9]{2}:[0-9]{2}:[0-9]{2}$'},
+                            'caps_name':    {'type': ['string', 'null']},
+                        },
+                        'additionalProperties': False,
+                    },
+                },
+                'required':             ['op', 'path'],
+                'additionalProperties': False,
+            },
+        },
+    },
+    'required':     ['patches'],
+}
+
+
+def body(patches):
+    return {
+        'patches': [
+            {'op': 'add', 'path': '/', 'value': {
+                'name':         'Employee {0}'.format(index),
+                'joined':       '2016-10-01T13:00:00Z',
+                'left':         None,
+                'company_id':   index % 10,
+                'pay_rate':     12.5,
+                'start_time':   '09:00:00',
+                'caps_name':    'EMPLOYEE {0}'.format(index),
+            }}
+            for index in range(patches)
+        ],
+    }
+
+
+def main(*sizes):
+    sizes       = [int(size) for size in sizes] or [10, 1000, 10000]
+    validators  = [('jsonschema.validate', jsonschema.validate), ('cached', JSONSchemaValidator().validate)]
+    try:
+        validators.append(('fastjsonschema', FastjsonschemaValidator().validate))
+    except ImportError:
+        print('fastjsonschema is not installed')
+    for patches in sizes:
+        doc     = body(patches)
+        repeat  = max(1, 10000 // patches)
+        for name, validate in validators:
+            validate(doc, SCHEMA)
+            start = time.perf_counter()
+            for _ in range(repeat):
+                validate(doc, SCHEMA)
+            elapsed = (time.perf_counter() - start) / repeat
+            print('{0:<20} {1:>10.3f} ms for {2} patches'.format(name, elapsed * 1000, patches))
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
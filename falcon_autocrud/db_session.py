@@ -8,8 +8,32 @@ def session_scope(db_engine, sessionmaker_=sessionmaker, **kwargs):
     The session is created immediately before the scope begins, and is closed
     on scope exit.
     """
-    db_session = sessionmaker_(bind=db_engine, **kwargs)()
+    with factory_session_scope(sessionmaker_(bind=db_engine, **kwargs)) as db_session:
+        yield db_session
+
+@contextmanager
+def factory_session_scope(session_factory):
+    """
+    Provide a scoped db session from an existing session factory, closed on
+    scope exit.
+    """
+    db_session = session_factory()
     try:
         yield db_session
     finally:
         db_session.close()
+
+@contextmanager
+def request_session_scope(req, session_factory):
+    """
+    Provide the session of the request, which the middleware opens before the
+    resource is called and closes after the response, so that hooks and the
+    responder share one session and connection.  Requests without one get a
+    session of their own, closed on scope exit.
+    """
+    db_session = req.context.get('db_session')
+    if db_session is not None:
+        yield db_session
+        return
+    with factory_session_scope(session_factory) as db_session:
+        yield db_session
@@ -0,0 +1,117 @@
+from datetime import date, datetime, time
+import re
+import sqlalchemy.sql.sqltypes
+
+from .metadata import get_metadata
+
+try:
+    from geoalchemy2.elements import WKBElement
+    from geoalchemy2.types import Geometry
+    from shapely.geometry import Point, LineString, Polygon
+    support_geo = True
+except ImportError:
+    support_geo = False
+
+
+_deserializers = {}
+
+# The zero padded forms of the formats below.  Values in these forms are
+# parsed with fromisoformat, which is much faster than strptime, and anything
+# else is left to strptime, so that exactly the same values are accepted.
+# fromisoformat alone accepts other forms, such as time zone offsets.
+_PADDED_DATETIME    = re.compile(r'\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d\Z', re.ASCII)
+_PADDED_DATE        = re.compile(r'\d{4}-\d\d-\d\d\Z', re.ASCII)
+_PADDED_TIME        = re.compile(r'\d\d:\d\d:\d\d\Z', re.ASCII)
+
+
+def parse_datetime(value):
+    '''Parse a datetime in the format %Y-%m-%dT%H:%M:%SZ.'''
+    if value[-1:] == 'Z' and _PADDED_DATETIME.match(value, 0, len(value) - 1):
+        return datetime.fromisoformat(value[:-1])
+    return datetime.strptime(value, '%Y-%m-%dT%H:%M:%SZ')
+
+
+def parse_naive_datetime(value):
+    '''Parse a datetime in the format %Y-%m-%dT%H:%M:%S.'''
+    if _PADDED_DATETIME.match(value):
+        return datetime.fromisoformat(value)
+    return datetime.strptime(value, '%Y-%m-%dT%H:%M:%S')
+
+
+def parse_date(value):
+    '''Parse a date in the format %Y-%m-%d.'''
+    if _PADDED_DATE.match(value):
+        return date.fromisoformat(value)
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+def parse_time(value):
+    '''Parse a time in the format %H:%M:%S, where the fields may be unpadded.'''
+    if _PADDED_TIME.match(value):
+        return time.fromisoformat(value)
+    hour, minute, second = value.split(':')
+    return time(int(hour), int(minute), int(second))
+
+
+def _geometry_parser(column_type, axes):
+    if column_type.geometry_type == 'POINT':
+        def parse(value):
+            point = Point(value[axes[0]], value[axes[1]])
+            # geoalchemy2.shape.from_shape uses buffer() which causes INSERT to fail
+            return WKBElement(point.wkb, srid=4326)
+    elif column_type.geometry_type == 'LINESTRING':
+        def parse(value):
+            line = LineString([point[axes[0]], point[axes[1]]] for point in value)
+            return WKBElement(line.wkb, srid=4326)
+    elif column_type.geometry_type == 'POLYGON':
+        def parse(value):
+            polygon = Polygon([point[axes[0]], point[axes[1]]] for point in value)
+            return WKBElement(polygon.wkb, srid=4326)
+    else:
+        return None
+    return parse
+
+
+def _value_parser(key, column_type, naive_datetimes, geometry_axes):
+    if isinstance(column_type, sqlalchemy.sql.sqltypes.DateTime):
+        return parse_naive_datetime if key in naive_datetimes else parse_datetime
+    elif isinstance(column_type, sqlalchemy.sql.sqltypes.Date):
+        return parse_date
+    elif isinstance(column_type, sqlalchemy.sql.sqltypes.Time):
+        return parse_time
+    elif support_geo and isinstance(column_type, Geometry):
+        return _geometry_parser(column_type, (geometry_axes or {}).get(key, ['x', 'y']))
+    return None
+
+
+def compile_deserializer(model, naive_datetimes=(), geometry_axes=None):
+    """
+    Map the key of every column attribute and property of `model` to the
+    function parsing its values from a request body, or None if values are
+    used as they are.  Relationships are left out.
+    """
+    metadata    = get_metadata(model)
+    parsers     = {}
+    for key, column_type in metadata.column_types.items():
+        parsers[key] = _value_parser(key, column_type, naive_datetimes, geometry_axes)
+    for key in metadata.properties:
+        # Value is set using a function, so we cannot tell what type it will be
+        parsers[key] = None
+    return parsers
+
+
+def get_deserializer(model, naive_datetimes=(), geometry_axes=None):
+    """
+    Return the compiled deserializer for the given options, compiling it on
+    first use.
+    """
+    key = (
+        model,
+        frozenset(naive_datetimes),
+        tuple(sorted((name, tuple(axes)) for name, axes in (geometry_axes or {}).items())),
+    )
+    try:
+        return _deserializers[key]
+    except KeyError:
+        parsers = _deserializers[key] = compile_deserializer(model, naive_datetimes, geometry_axes)
+        return parsers
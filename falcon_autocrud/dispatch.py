@@ -0,0 +1,75 @@
+from collections import namedtuple
+
+
+RESPONDERS = {'GET': 'on_get', 'POST': 'on_post', 'PUT': 'on_put', 'PATCH': 'on_patch', 'DELETE': 'on_delete'}
+
+Dispatch = namedtuple('Dispatch', [
+    'allowed',              # Whether the resource allows the method
+    'methods',              # The methods the resource allows
+    'request_schema',
+    'response_schema',
+    'identifier',
+    'authorizer',
+    'before',               # The resource's before_<method> hook, or None
+    'after',                # The resource's after_<method> hook, or None
+    'mark_deleted',
+    'mark_deleted_values',
+])
+
+
+def _schema(resource, responder_name, attr, attrs):
+    # First try to get schema from method itself
+    return getattr(
+        getattr(resource, responder_name, None),
+        attr,
+        None
+    # Otherwise, fall back to schema defined directly in class
+    ) or getattr(resource, attrs, {}).get(responder_name)
+
+
+def compile_dispatch(resource, method):
+    """
+    Resolve everything needed to handle `method` requests for `resource` that
+    does not depend on the request itself.
+    """
+    responder_name  = RESPONDERS.get(method)
+    methods         = getattr(resource, 'methods', getattr(resource, 'default_methods', list(RESPONDERS)))
+    request_schema  = None
+    response_schema = None
+    if responder_name is not None:
+        if method in ['POST', 'PUT', 'PATCH']:
+            request_schema = _schema(resource, responder_name, '__request_schema__', '__request_schemas__')
+        response_schema = _schema(resource, responder_name, '__response_schema__', '__response_schemas__')
+    return Dispatch(
+        allowed             = method in methods,
+        methods             = methods,
+        request_schema      = request_schema,
+        response_schema     = response_schema,
+        identifier          = getattr(resource, '__identifiers__', {}).get(method),
+        authorizer          = getattr(resource, '__authorizers__', {}).get(method),
+        before              = getattr(resource, 'before_' + method.lower(), None),
+        after               = getattr(resource, 'after_' + method.lower(), None),
+        mark_deleted        = getattr(resource, 'mark_deleted', None),
+        mark_deleted_values = getattr(resource, 'mark_deleted_values', None),
+    )
+
+
+def get_dispatch(resource, method):
+    """
+    Return the dispatch record for `method` requests to `resource`, resolving
+    it the first time the resource is routed a request of that method.  The
+    record is not updated if the resource is changed afterwards.
+
+    Records are kept on the resource itself, as they hold its bound methods,
+    so that they go away along with it.
+    """
+    try:
+        return resource.__dict__['_dispatches'][method]
+    except KeyError:
+        pass
+    except AttributeError:
+        # Resources without an instance dictionary are resolved every time
+        return compile_dispatch(resource, method)
+    dispatch = compile_dispatch(resource, method)
+    resource.__dict__.setdefault('_dispatches', {})[method] = dispatch
+    return dispatch
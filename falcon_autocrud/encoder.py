@@ -0,0 +1,86 @@
+from datetime import datetime
+from decimal import Decimal
+import json
+import uuid
+
+
+class JSONEncoder(object):
+    """
+    Encodes response documents using the standard library json module.
+
+    `native_types` lists the python types an encoder writes in autocrud's wire
+    format by itself, so that serialization can leave those values alone:
+    datetimes as 'YYYY-mm-ddTHH:MM:SSZ', UUIDs as hex strings and Decimals as
+    numbers.
+    """
+    native_types = ()
+
+    def encode(self, doc):
+        return json.dumps(doc).encode('utf-8')
+
+
+class OrjsonEncoder(JSONEncoder):
+    """
+    Encodes response documents using orjson.  Documents orjson cannot encode,
+    such as those with integers beyond 64 bits, are encoded by the standard
+    library instead.
+    """
+    native_types = (datetime, Decimal)
+
+    def __init__(self):
+        import orjson
+        self._dumps     = orjson.dumps
+        self._option    = orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z | orjson.OPT_OMIT_MICROSECONDS | orjson.OPT_NON_STR_KEYS
+
+    def encode(self, doc):
+        try:
+            return self._dumps(doc, default=_orjson_default, option=self._option)
+        except TypeError:
+            return json.dumps(doc, default=_stdlib_default).encode('utf-8')
+
+
+def _orjson_default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError('Object of type {0} is not JSON serializable'.format(value.__class__.__name__))
+
+
+def _stdlib_default(value):
+    # The native types of OrjsonEncoder, in the same format
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%dT%H:%M:%SZ')
+    return _orjson_default(value)
+
+
+class RapidjsonEncoder(JSONEncoder):
+    native_types = (uuid.UUID, Decimal)
+
+    def __init__(self):
+        import rapidjson
+        self._dumps         = rapidjson.dumps
+        self._uuid_mode     = rapidjson.UM_HEX
+        self._number_mode   = rapidjson.NM_DECIMAL | rapidjson.NM_NATIVE
+
+    def encode(self, doc):
+        return self._dumps(doc, uuid_mode=self._uuid_mode, number_mode=self._number_mode).encode('utf-8')
+
+
+class UjsonEncoder(JSONEncoder):
+    def __init__(self):
+        import ujson
+        self._dumps = ujson.dumps
+
+    def encode(self, doc):
+        return self._dumps(doc, ensure_ascii=False, escape_forward_slashes=False).encode('utf-8')
+
+
+def get_encoder():
+    """
+    Return an encoder for the fastest JSON library installed.
+    """
+    for encoder_class in [OrjsonEncoder, RapidjsonEncoder, UjsonEncoder]:
+        try:
+            return encoder_class()
+        except ImportError:
+            pass
+    return JSONEncoder()
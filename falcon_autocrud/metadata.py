@@ -0,0 +1,93 @@
+from operator import attrgetter, itemgetter
+from sqlalchemy import tuple_
+from sqlalchemy.inspection import inspect
+
+
+_metadata = {}
+
+
+class ModelMetadata(object):
+    """
+    What resources need to know about a mapped class, gathered from its
+    mapper once rather than on every request.
+
+    Primary keys may be composite.  The primary key of an item is then given
+    as a list of its values in the order of the key's columns, and a single
+    column key as its value alone.
+    """
+    def __init__(self, model):
+        mapper              = inspect(model)
+        self.model          = model
+        self.mapper         = mapper
+        self.tablename      = getattr(model, '__tablename__', mapper.local_table.name)
+        self.primary_key    = tuple(mapper.get_property_by_column(column).key for column in mapper.primary_key)
+        # Attributes and types of the column properties, in mapper order
+        self.columns        = dict((key, getattr(model, key)) for key in mapper.column_attrs.keys())
+        self.column_types   = dict((key, prop.columns[0].type) for key, prop in mapper.column_attrs.items())
+        self.nullable       = set(key for key, prop in mapper.column_attrs.items() if prop.columns[0].nullable)
+        self.relationships  = dict(mapper.relationships.items())
+        # Python properties, which are set through functions
+        self.properties     = [key for key in dir(model) if isinstance(getattr(model, key, None), property)]
+        self.composite      = len(self.primary_key) > 1
+        self._instance_pk   = attrgetter(*self.primary_key)
+        self._row_pk        = itemgetter(*range(len(self.primary_key)))
+
+    def pk(self, instance):
+        '''The primary key of an instance of the model.'''
+        value = self._instance_pk(instance)
+        return list(value) if self.composite else value
+
+    def pk_key(self, instance):
+        """
+        The primary key of an instance as a hashable value: a tuple of its
+        values for a composite key.
+        """
+        return self._instance_pk(instance)
+
+    def row_pk(self, row):
+        '''The primary key of a row selected with the primary key columns first.'''
+        value = self._row_pk(row)
+        return list(value) if self.composite else value
+
+    def attributes_pk(self, attributes):
+        '''The primary key in a dictionary of attribute values.'''
+        if self.composite:
+            return [attributes[key] for key in self.primary_key]
+        return attributes[self.primary_key[0]]
+
+    def pk_values(self, pk):
+        """
+        The values of the primary key columns for a primary key given in a
+        request, or None if it has the wrong number of values.
+        """
+        if not self.composite:
+            return (pk,)
+        if not isinstance(pk, (list, tuple)) or len(pk) != len(self.primary_key):
+            return None
+        return tuple(pk)
+
+    def pk_condition(self, pks):
+        '''A condition selecting the rows with any of the primary keys in `pks`.'''
+        if self.composite:
+            return tuple_(*[self.columns[key] for key in self.primary_key]).in_([tuple(pk) for pk in pks])
+        return self.columns[self.primary_key[0]].in_(pks)
+
+    def column(self, key, attr_map=None):
+        """
+        The column attribute for `key`, looked up through `attr_map` first if
+        given, or None if it is not a column.
+        """
+        if attr_map is not None:
+            key = attr_map.get(key, key)
+        return self.columns.get(key)
+
+
+def get_metadata(model):
+    """
+    Return the metadata for `model`, gathering it on first use.
+    """
+    try:
+        return _metadata[model]
+    except KeyError:
+        metadata = _metadata[model] = ModelMetadata(model)
+        return metadata
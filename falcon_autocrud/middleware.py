@@ -3,35 +3,9 @@ import json
 import jsonschema
 import logging
 
-
-def _get_request_schema(req, resource):
-    if resource is None or req.method not in ['POST', 'PUT', 'PATCH']:
-        return None
-
-    # First try to get schema from method itself
-    schema = getattr(
-        getattr(resource, {'POST': 'on_post', 'PUT': 'on_put', 'PATCH': 'on_patch'}[req.method], None),
-        '__request_schema__',
-        None
-    # Otherwise, fall back to schema defined directly in class
-    ) or getattr(resource, '__request_schemas__', {}).get(
-        {'POST': 'on_post', 'PUT': 'on_put', 'PATCH': 'on_patch'}[req.method]
-    )
-    return schema
-
-def _get_response_schema(resource, req):
-    try:
-        method_name = {'POST': 'on_post', 'PUT': 'on_put', 'PATCH': 'on_patch', 'GET': 'on_get', 'DELETE': 'on_delete'}[req.method]
-    except KeyError:
-        return
-
-    # First try to get schema from method itself
-    return getattr(
-        getattr(resource, method_name, None),
-        '__response_schema__',
-        None
-    # Otherwise, fall back to schema defined directly in class
-    ) or getattr(resource, '__response_schemas__', {}).get(method_name)
+from .dispatch import RESPONDERS, get_dispatch
+from .encoder import get_encoder
+from .validator import get_validator
 
 
 class _null_handler(logging.Handler):
@@ -39,21 +13,46 @@ class _null_handler(logging.Handler):
         pass
 
 class Middleware(object):
-    def __init__(self, logger=None):
+    def __init__(self, logger=None, encoder=None, validator=None):
         if logger is None:
             # Default to no logging if no logger provided
             logger = logging.getLogger(__name__)
             logger.addHandler(_null_handler())
         self.logger = logger
+        if encoder is None:
+            encoder = get_encoder()
+        self.encoder = encoder
+        if validator is None:
+            validator = get_validator()
+        self.validator = validator
 
     def process_resource(self, req, resp, resource, params):
-        if _get_response_schema(resource, req) and not req.client_accepts_json:
+        # One session for the whole request, shared by the identifiers,
+        # authorizers, hooks and the responder.  It only checks out a
+        # connection when first used.
+        open_session = getattr(resource, 'open_session', None)
+        if open_session is not None and 'db_session' not in req.context:
+            req.context['db_session'] = open_session(req)
+
+        if resource is not None:
+            dispatch        = get_dispatch(resource, req.method)
+            response_schema = dispatch.response_schema
+        else:
+            response_schema = None
+        if response_schema and not req.client_accepts_json:
             raise falcon.HTTPNotAcceptable('This API supports only JSON-encoded responses')
 
+        req.context['json_encoder'] = self.encoder
+        if response_schema is None:
+            # Responses that are validated against a schema must be plain JSON
+            # types, otherwise let the encoder deal with what it can
+            req.context['json_native_types'] = self.encoder.native_types
+
         if resource is None or req.method not in ['POST', 'PUT', 'PATCH']:
             return
 
-        if _get_request_schema(req, resource) is not None:
+        schema = dispatch.request_schema
+        if schema is not None:
             if req.content_type is None or 'application/json' not in req.content_type:
                 raise falcon.HTTPUnsupportedMediaType('This API supports only JSON-encoded requests')
 
@@ -65,7 +64,6 @@ class Middleware(object):
                     'A valid JSON document is required'
                 )
 
-            schema = _get_request_schema(req, resource)
             try:
                 req.context['doc'] = json.loads(body.decode('utf-8'))
             except (ValueError, UnicodeDecodeError) as error:
@@ -78,7 +76,7 @@ class Middleware(object):
 
             if schema is not None:
                 try:
-                    jsonschema.validate(req.context['doc'], schema)
+                    self.validator.validate(req.context['doc'], schema)
                 except jsonschema.exceptions.ValidationError as error:
                     raise falcon.HTTPBadRequest(
                         'Invalid request body',
@@ -86,18 +84,24 @@ class Middleware(object):
                     )
 
     def process_response(self, req, resp, resource):
+        db_session = req.context.pop('db_session', None)
+        if db_session is not None:
+            db_session.close()
+
         if 'result' not in req.context:
             return
 
-        resp.body = json.dumps(req.context['result'])
+        resp.data = self.encoder.encode(req.context['result'])
 
-        schema = _get_response_schema(resource, req)
+        if resource is None:
+            return
+        schema = get_dispatch(resource, req.method).response_schema
         if schema is None:
             return
 
         try:
-            jsonschema.validate(req.context['result'], schema)
+            self.validator.validate(req.context['result'], schema)
         except jsonschema.exceptions.ValidationError as error:
-            method_name = {'POST': 'on_post', 'PUT': 'on_put', 'PATCH': 'on_patch', 'GET': 'on_get', 'DELETE': 'on_delete'}[req.method]
+            method_name = RESPONDERS[req.method]
             self.logger.error('Blocking proposed response from being sent from {0}.{1}.{2} to client as it does not match the defined schema: {3}'.format(resource.__module__, resource.__class__.__name__, method_name, str(error)))
             raise falcon.HTTPInternalServerError('Internal Server Error', 'Undisclosed')
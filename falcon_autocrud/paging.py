@@ -0,0 +1,163 @@
+import base64
+from datetime import date, datetime, time
+from decimal import Decimal
+import json
+from sqlalchemy import and_, false, literal, or_, tuple_
+import sqlalchemy.exc
+from sqlalchemy.sql.elements import BindParameter
+from time import monotonic
+import uuid
+
+
+COUNT_STRATEGIES = ['exact', 'window', 'estimate', 'cached', 'none']
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    elif isinstance(value, date):
+        return {'d': value.isoformat()}
+    elif isinstance(value, time):
+        return {'t': value.isoformat()}
+    elif isinstance(value, Decimal):
+        return {'n': str(value)}
+    elif isinstance(value, uuid.UUID):
+        return {'u': value.hex}
+    return value
+
+
+def _decode_value(value):
+    if not isinstance(value, dict):
+        return value
+    (kind, text), = value.items()
+    if kind == 'dt':
+        return datetime.fromisoformat(text)
+    elif kind == 'd':
+        return date.fromisoformat(text)
+    elif kind == 't':
+        return time.fromisoformat(text)
+    elif kind == 'n':
+        return Decimal(text)
+    elif kind == 'u':
+        return uuid.UUID(text)
+    raise ValueError('Unknown cursor value type {0}'.format(kind))
+
+
+def encode_cursor(sort, values):
+    """
+    Make an opaque cursor from the sort a page was read with, and the values
+    of the sort keys for the last row of the page.
+    """
+    doc = json.dumps([list(sort), [_encode_value(value) for value in values]], separators=(',', ':'))
+    return base64.urlsafe_b64encode(doc.encode('utf-8')).rstrip(b'=').decode('ascii')
+
+
+def decode_cursor(cursor):
+    """
+    Return the sort and values encoded in a cursor, raising ValueError if the
+    cursor is malformed.
+    """
+    try:
+        doc = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8'))
+        sort, values = doc
+        return sort, [_decode_value(value) for value in values]
+    except (TypeError, ValueError, UnicodeDecodeError, AttributeError):
+        raise ValueError('Malformed cursor')
+
+
+def nulls_sort_high(dialect):
+    '''Whether `dialect` sorts NULLs after all other values in ascending order.'''
+    return dialect.name in ('postgresql', 'oracle')
+
+
+def _after(column, descending, value, nulls_last):
+    # Rows whose value of one sort column comes after `value`, given whether
+    # NULLs come last in the sort
+    if value is None:
+        return false() if nulls_last else column.isnot(None)
+    after = column < value if descending else column > value
+    return or_(after, column.is_(None)) if nulls_last else after
+
+
+def keyset_filter(columns, descending, values, nullable=(), nulls_high=False):
+    """
+    Build the condition selecting rows that sort after `values`, given the
+    sort columns and whether each is sorted in descending order.  Values may
+    be bound parameters, except for None.
+
+    `nullable` flags the columns that may be NULL, and `nulls_high` tells
+    whether the database sorts NULLs after other values in ascending order.
+    """
+    if any(nullable) or any(value is None for value in values):
+        return or_(*[
+            and_(*(
+                [
+                    columns[previous].is_(None) if values[previous] is None else columns[previous] == values[previous]
+                    for previous in range(index)
+                ]
+                + [_after(columns[index], descending[index], values[index], nulls_high != descending[index])]
+            ))
+            for index in range(len(columns))
+        ])
+    if len(columns) == 1:
+        return columns[0] < values[0] if descending[0] else columns[0] > values[0]
+    if all(descending) or not any(descending):
+        # A row value comparison lets the database seek on a matching index
+        row     = tuple_(*columns)
+        after   = tuple_(*[
+            value if isinstance(value, BindParameter) else literal(value, column.type)
+            for column, value in zip(columns, values)
+        ])
+        return row < after if descending[0] else row > after
+    return or_(*[
+        and_(*(
+            [columns[previous] == values[previous] for previous in range(index)]
+            + [columns[index] < values[index] if descending[index] else columns[index] > values[index]]
+        ))
+        for index in range(len(columns))
+    ])
+
+
+def estimate_count(db_session, query):
+    """
+    Ask the query planner how many rows `query` will return.  Returns None if
+    the database cannot tell us (only PostgreSQL is supported).
+    """
+    dialect = db_session.get_bind().dialect
+    if dialect.name != 'postgresql':
+        return None
+    try:
+        sql = str(query.statement.compile(dialect=dialect, compile_kwargs={'literal_binds': True}))
+    except (NotImplementedError, sqlalchemy.exc.CompileError):
+        return None
+    connection = db_session.connection()
+    execute = getattr(connection, 'exec_driver_sql', connection.execute)
+    plan = execute('EXPLAIN (FORMAT JSON) ' + sql).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class CountCache(object):
+    """
+    Totals kept for `ttl` seconds, holding at most `size` entries.
+    """
+    def __init__(self, ttl, size):
+        self.ttl        = ttl
+        self.size       = size
+        self.entries    = {}
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None or entry[0] < monotonic():
+            return None
+        return entry[1]
+
+    def set(self, key, total):
+        now = monotonic()
+        if len(self.entries) >= self.size:
+            for stale in [k for k, (expires, _) in list(self.entries.items()) if expires < now]:
+                self.entries.pop(stale, None)
+            if len(self.entries) >= self.size:
+                self.entries.clear()
+        self.entries[key] = (now + self.ttl, total)
@@ -0,0 +1,108 @@
+from .metadata import get_metadata
+
+
+def _null(attr, is_null):
+    return attr.is_(None) if is_null else attr.isnot(None)
+
+
+def _as_list(value):
+    return value if isinstance(value, list) else [value]
+
+
+# For each filter comparison, by parameter suffix: the builder for its
+# condition, the function preparing the parameter value to pass to it (None
+# to pass the value as is), and whether the prepared value can be a bound
+# parameter.  Otherwise the value decides the form of the condition.
+COMPARISONS = {
+    '=':            (lambda attr, value: attr == value, None, True),
+    'in':           (lambda attr, value: attr.in_(value), _as_list, True),
+    'null':         (_null, lambda value: value != '0', False),
+    'startswith':   (lambda attr, value: attr.ilike(value), '{0}%'.format, True),
+    'contains':     (lambda attr, value: attr.ilike(value), '%{0}%'.format, True),
+    'lt':           (lambda attr, value: attr < value, None, True),
+    'lte':          (lambda attr, value: attr <= value, None, True),
+    'gt':           (lambda attr, value: attr > value, None, True),
+    'gte':          (lambda attr, value: attr >= value, None, True),
+}
+
+_filter_plans   = {}
+_sort_plans     = {}
+
+
+class StatementCache(object):
+    """
+    Queries built for each shape of request, holding at most `size` entries.
+    The queries use bound parameters for request values, so one query serves
+    every request of the same shape.
+    """
+    def __init__(self, size):
+        self.size       = size
+        self.entries    = {}
+        self.hits       = 0
+        self.misses     = 0
+
+    def get(self, key, build):
+        """
+        Return the query for `key`, calling `build` to make it if it is not
+        cached.
+        """
+        try:
+            query = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            query = build()
+            if len(self.entries) >= self.size:
+                self.entries.clear()
+            self.entries[key] = query
+            return query
+        self.hits += 1
+        return query
+
+
+def compile_filter_plan(model):
+    """
+    Map every valid filter parameter for `model` to the column it filters on,
+    followed by its comparison from COMPARISONS.  A parameter is a column
+    attribute key, optionally followed by '__' and a comparison.
+    """
+    plan = {}
+    for key, attr in get_metadata(model).columns.items():
+        plan[key] = (attr,) + COMPARISONS['=']
+        for comparison, entry in COMPARISONS.items():
+            plan[key + '__' + comparison] = (attr,) + entry
+    return plan
+
+
+def compile_sort_plan(model):
+    """
+    Map every valid sort token for `model` ('key' or '-key' for a column
+    attribute) to the key, whether the sort is descending, the column and the
+    order by expression.
+    """
+    plan = {}
+    for key, attr in get_metadata(model).columns.items():
+        plan[key]       = (key, False, attr, attr)
+        plan['-' + key] = (key, True, attr, attr.desc())
+    return plan
+
+
+def get_filter_plan(model):
+    """
+    Return the filter plan for `model`, compiling it on first use.
+    """
+    try:
+        return _filter_plans[model]
+    except KeyError:
+        plan = _filter_plans[model] = compile_filter_plan(model)
+        return plan
+
+
+def get_sort_plan(model):
+    """
+    Return the sort plan for `model`, compiling it on first use.
+    """
+    try:
+        return _sort_plans[model]
+    except KeyError:
+        plan = _sort_plans[model] = compile_sort_plan(model)
+        return plan
@@ -1,33 +1,35 @@
-from datetime import date, datetime, time
-from decimal import Decimal
 import falcon
 import falcon.errors
 import json
 import sqlalchemy.exc
 import sqlalchemy.orm.exc
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.orm.properties import ColumnProperty
-from sqlalchemy.inspection import inspect
+from sqlalchemy import bindparam, func
+from sqlalchemy.orm import Query, joinedload, load_only, selectinload, sessionmaker, with_parent
 from sqlalchemy.orm.session import make_transient
-import sqlalchemy.sql.sqltypes
-import uuid
 import logging
+from operator import attrgetter, itemgetter
 import sys
 
-from .db_session import session_scope
+from .db_session import factory_session_scope, request_session_scope
+from .deserialize import get_deserializer
+from .encoder import JSONEncoder
+from .dispatch import get_dispatch
+from .metadata import get_metadata
+from .paging import COUNT_STRATEGIES, CountCache, decode_cursor, encode_cursor, estimate_count, keyset_filter, nulls_sort_high
+from .query_plan import StatementCache, get_filter_plan, get_sort_plan
+from .statements import supports_returning, target_condition, upsert
+from .serialize import UnsupportedGeometryType, get_row_serializer, get_serializer
 
 
 def identify(req, resp, resource, params):
-    identifiers = getattr(resource, '__identifiers__', {})
-    if req.method in identifiers:
-        Identifier = identifiers[req.method]
+    Identifier = get_dispatch(resource, req.method).identifier
+    if Identifier is not None:
         Identifier().identify(req, resp, resource, params)
 
 
 def authorize(req, resp, resource, params):
-    authorizers = getattr(resource, '__authorizers__', {})
-    if req.method in authorizers:
-        Authorizer = authorizers[req.method]
+    Authorizer = get_dispatch(resource, req.method).authorizer
+    if Authorizer is not None:
         Authorizer().authorize(req, resp, resource, params)
 
 
@@ -37,31 +39,65 @@ def update_resource(resource, attributes):
         setattr(resource, key, value)
 
 
-def get_pk(attributes):
-    '''Get pk from a dictionary of attributes or throw error.'''
+def get_pk(attributes, metadata=None):
+    '''
+    Get pk from a dictionary of attributes or throw error.  For models with
+    a composite primary key, given by `metadata`, it is a tuple of values.
+    '''
     try:
-        return int(attributes.pop('pk'))
+        pk = attributes.pop('pk')
     except KeyError:
         raise falcon.errors.HTTPBadRequest('Invalid request', 'No primary key provided for related object.')
+    if metadata is None or not metadata.composite:
+        return int(pk)
+    values = metadata.pk_values(pk)
+    if values is None:
+        raise falcon.errors.HTTPBadRequest('Invalid request', 'Invalid primary key provided for related object.')
+    return values
+
+
+def native_types(req):
+    '''Types the JSON encoder of the request can write without help.'''
+    return req.context.get('json_native_types', ())
 
 
 def identify_pk(resource_class):
-    '''Find the primary key of a resource class.'''
-    primary_key, = [
-        attr
-        for attr in inspect(resource_class).attrs.values()
-        if isinstance(attr, ColumnProperty) and attr.columns[0].primary_key
-    ]
-    return primary_key.key
+    '''Find the primary key of a resource class with a single column primary key.'''
+    primary_key, = get_metadata(resource_class).primary_key
+    return primary_key
+
+
+def included_paths(instance, req):
+    '''The validated attribute paths listed in the "__included" parameter.'''
+    if '__included' not in req.params:
+        return []
+    allowed_included = getattr(instance, 'allowed_included', [])
+    paths = req.get_param_as_list('__included')
+    for included in paths:
+        if included not in allowed_included:
+            raise falcon.errors.HTTPBadRequest('Invalid parameter', 'The "__included" parameter includes invalid entities')
+    return paths
+
+
+def included_relationships(model, path):
+    '''
+    The relationships followed by a dotted attribute path from `model`, or
+    None if any step of the path is not a relationship.
+    '''
+    relationships = []
+    for attr in path.split('.'):
+        prop = get_metadata(model).relationships.get(attr)
+        if prop is None:
+            return None
+        relationships.append(prop)
+        model = prop.mapper.class_
+    return relationships
 
 
 def add_included(instance, req, res, data):
     '''Add included objects to a data dictionary.'''
     if '__included' in req.params:
-        allowed_included = getattr(instance, 'allowed_included', [])
-        for included in req.get_param_as_list('__included'):
-            if included not in allowed_included:
-                raise falcon.errors.HTTPBadRequest('Invalid parameter', 'The "__included" parameter includes invalid entities')
+        for included in included_paths(instance, req):
             # Get secondary/tertiary objects
             if '.' in included:
                 attrs = included.split('.')
@@ -73,28 +109,20 @@ def add_included(instance, req, res, data):
 
             # Store the related resource underneath the table name as a key
             if isinstance(included_resources, list):
-                data['attributes'][included_resource.__tablename__] = []
+                relationships = included_relationships(res.__class__, included)
+                if relationships is not None:
+                    tablename = get_metadata(relationships[-1].mapper.class_).tablename
+                elif included_resources:
+                    tablename = get_metadata(included_resources[0].__class__).tablename
+                else:
+                    continue
+                data['attributes'][tablename] = []
                 for included_resource in included_resources:
-                    primary_key = identify_pk(included_resource.__class__)
-                    attributes = instance.serialize(included_resource, getattr(included_resource, 'response_fields', None), getattr(included_resource, 'geometry_axes', {}))
-                    data['attributes'][included_resource.__tablename__].append(attributes)
+                    attributes = instance.serialize(included_resource, getattr(included_resource, 'response_fields', None), getattr(included_resource, 'geometry_axes', {}), native_types(req))
+                    data['attributes'][tablename].append(attributes)
             elif included_resources is not None:
-                primary_key = identify_pk(included_resources.__class__)
-                attributes = instance.serialize(included_resources, getattr(included_resources, 'response_fields', None), getattr(included_resources, 'geometry_axes', {}))
-                data['attributes'][included_resources.__tablename__] = attributes
-
-
-class UnsupportedGeometryType(Exception):
-    pass
-
-try:
-    import geoalchemy2.shape
-    from geoalchemy2.elements import WKBElement
-    from geoalchemy2.types import Geometry
-    from shapely.geometry import Point, LineString, Polygon
-    support_geo = True
-except ImportError:
-    support_geo = False
+                attributes = instance.serialize(included_resources, getattr(included_resources, 'response_fields', None), getattr(included_resources, 'geometry_axes', {}), native_types(req))
+                data['attributes'][get_metadata(included_resources.__class__).tablename] = attributes
 
 
 class BaseResource(object):
@@ -102,96 +130,147 @@ class BaseResource(object):
         self.db_engine = db_engine
         self.sessionmaker = sessionmaker_
         self.sessionmaker_kwargs = sessionmaker_kwargs
+        self.session_factory = sessionmaker_(bind=db_engine, **sessionmaker_kwargs)
+        self.read_session_factory = sessionmaker_(bind=self.read_engine(db_engine), **dict(sessionmaker_kwargs, autoflush=False))
         if logger is None:
             logger = logging.getLogger('autocrud')
         self.logger = logger
 
+    def read_engine(self, db_engine):
+        """
+        The engine for the sessions of GET requests, sharing the pool of
+        `db_engine`.  On PostgreSQL its transactions are read-only and
+        deferrable, so the database can skip the bookkeeping for writes, and
+        hot standbys accept them.  With read_autocommit, single statement
+        reads don't start a transaction at all.
+        """
+        options = {}
+        if db_engine.dialect.name == 'postgresql':
+            options['postgresql_readonly']      = True
+            options['postgresql_deferrable']    = True
+        if getattr(self, 'read_autocommit', False):
+            options['isolation_level']          = 'AUTOCOMMIT'
+        return db_engine.execution_options(**options) if options else db_engine
+
+    def open_session(self, req):
+        """
+        Open a session for `req`.  GET requests get a read-only session
+        without autoflush, unless the resource sets read_only_gets to False.
+        """
+        if req.method == 'GET' and getattr(self, 'read_only_gets', True):
+            return self.read_session_factory()
+        return self.session_factory()
+
+    def request_session(self, req):
+        """
+        Provide the session for a request: the one the middleware opened for
+        it, shared with identifiers, authorizers and hooks through
+        req.context['db_session'], or else a new one opened for it.
+        """
+        return request_session_scope(req, lambda: self.open_session(req))
+
     def filter_by_params(self, resources, params):
+        plan = get_filter_plan(self.model)
         for filter_key, value in params.items():
             if filter_key.startswith('__'):
                 # Not a filtering parameter
                 continue
-            filter_parts = filter_key.split('__')
-            key = filter_parts[0]
-            if len(filter_parts) == 1:
-                comparison = '='
-            elif len(filter_parts) == 2:
-                comparison = filter_parts[1]
-            else:
-                raise falcon.errors.HTTPBadRequest('Invalid attribute', 'An attribute provided for filtering is invalid')
-
-            attr = getattr(self.model, key, None)
-            if attr is None or not isinstance(inspect(self.model).attrs[key], ColumnProperty):
-                self.logger.warn('An attribute ({0}) provided for filtering is invalid'.format(key))
-                raise falcon.errors.HTTPBadRequest('Invalid attribute', 'An attribute provided for filtering is invalid')
-            if comparison == '=':
-                resources = resources.filter(attr == value)
-            elif comparison == 'in':
-                resources = resources.filter(attr.in_(value))
-            elif comparison == 'null':
-                if value != '0':
-                    resources = resources.filter(attr.is_(None))
-                else:
-                    resources = resources.filter(attr.isnot(None))
-            elif comparison == 'startswith':
-                resources = resources.filter(attr.ilike('{0}%'.format(value)))
-            elif comparison == 'contains':
-                resources = resources.filter(attr.ilike('%{0}%'.format(value)))
-            elif comparison == 'lt':
-                resources = resources.filter(attr < value)
-            elif comparison == 'lte':
-                resources = resources.filter(attr <= value)
-            elif comparison == 'gt':
-                resources = resources.filter(attr > value)
-            elif comparison == 'gte':
-                resources = resources.filter(attr >= value)
-            else:
+            try:
+                attr, condition, prepare, _ = plan[filter_key]
+            except KeyError:
+                self.logger.warn('An attribute ({0}) provided for filtering is invalid'.format(filter_key.split('__')[0]))
                 raise falcon.errors.HTTPBadRequest('Invalid attribute', 'An attribute provided for filtering is invalid')
+            resources = resources.filter(condition(attr, prepare(value) if prepare is not None else value))
         return resources
 
-    def serialize(self, resource, response_fields=None, geometry_axes=None):
-        attrs           = inspect(resource.__class__).attrs
-        naive_datetimes = getattr(self, 'naive_datetimes', [])
-        def _serialize_value(name, value):
-            if isinstance(value, uuid.UUID):
-                return value.hex
-            if isinstance(value, datetime):
-                if name in naive_datetimes:
-                    return value.strftime('%Y-%m-%dT%H:%M:%S')
-                else:
-                    return value.strftime('%Y-%m-%dT%H:%M:%SZ')
-            elif isinstance(value, date):
-                return value.strftime('%Y-%m-%d')
-            elif isinstance(value, time):
-                return value.isoformat()
-            elif isinstance(value, Decimal):
-                return float(value)
-            elif support_geo and isinstance(value, WKBElement):
-                value = geoalchemy2.shape.to_shape(value)
-                if isinstance(value, Point):
-                    axes = (geometry_axes or {}).get(name, ['x', 'y'])
-                    return {axes[0]: value.x, axes[1]: value.y}
-                elif isinstance(value, LineString):
-                    axes = (geometry_axes or {}).get(name, ['x', 'y'])
-                    return [
-                        {axes[0]: point[0], axes[1]: point[1]}
-                        for point in list(value.coords)
-                    ]
-                elif isinstance(value, Polygon):
-                    axes = (geometry_axes or {}).get(name, ['x', 'y'])
-                    return [
-                        {axes[0]: point[0], axes[1]: point[1]}
-                        for point in list(value.boundary.coords)
-                    ]
-                else:
-                    raise UnsupportedGeometryType('Unsupported geometry type {0}'.format(value.geometryType()))
-            else:
-                return value
+    def serializer(self, model, response_fields=None, geometry_axes=None, native_types=()):
+        """
+        Return the compiled serializer for instances of `model`.
+        """
+        return get_serializer(model, response_fields, geometry_axes, getattr(self, 'naive_datetimes', []), native_types)
+
+    def serialize(self, resource, response_fields=None, geometry_axes=None, native_types=()):
+        return self.serializer(resource.__class__, response_fields, geometry_axes, native_types)(resource)
+
+    def row_serializer(self, model, response_fields=None, geometry_axes=None, native_types=()):
+        """
+        Return the attribute keys to select for rows of `model`, and the
+        compiled serializer for such rows.
+        """
+        return get_row_serializer(model, response_fields, geometry_axes, getattr(self, 'naive_datetimes', []), native_types)
+
+    def use_core_reads(self, req):
+        """
+        Whether a GET can be answered from plain rows rather than instances.
+        Included resources and after_get need instances, as do polymorphic
+        models, so those fall back to the ORM.
+        """
+        return (
+            getattr(self, 'core_reads', False)
+            and '__included' not in req.params
+            and get_dispatch(self, 'GET').after is None
+            and get_metadata(self.model).mapper.polymorphic_on is None
+        )
+
+    def select_rows(self, db_session, query, keys, chunk_size=None, extra_columns=()):
+        """
+        Execute `query` as a Core select of the columns for attribute `keys`,
+        followed by `extra_columns`, bypassing the identity map and instance
+        state.  Rows are fetched `chunk_size` at a time if given.
+        """
+        statement = query.with_entities(*([getattr(self.model, key) for key in keys] + list(extra_columns))).statement
+        if chunk_size is not None:
+            statement = statement.execution_options(stream_results=True, max_row_buffer=chunk_size)
+        return db_session.connection().execute(statement)
+
+    def response_fields_for(self, req):
+        """
+        Fields to return for a GET: response_fields, narrowed down to those
+        listed in the "__fields" parameter if given.  None means all columns.
+        """
+        response_fields = getattr(self, 'response_fields', None)
+        if '__fields' not in req.params:
+            return response_fields
         if response_fields is None:
-            response_fields = attrs.keys()
-        return {
-            attr: _serialize_value(attr, getattr(resource, attr)) for attr in response_fields if isinstance(attrs[attr], ColumnProperty)
-        }
+            response_fields = list(get_metadata(self.model).columns)
+        requested = req.get_param_as_list('__fields')
+        for field in requested:
+            if field not in response_fields:
+                raise falcon.errors.HTTPBadRequest('Invalid parameter', 'The "__fields" parameter includes invalid attributes')
+        return [field for field in response_fields if field in requested]
+
+    def load_only_fields(self, query, fields):
+        """
+        Limit the columns loaded by `query` to `fields`, which must include
+        the primary key so that instances can be identified.
+        """
+        if fields is None:
+            return query
+        metadata = get_metadata(self.model)
+        keys = list(metadata.primary_key)
+        keys.extend(key for key in fields if key in metadata.columns and key not in keys)
+        return query.options(load_only(*[metadata.columns[key] for key in keys]))
+
+    def load_included(self, req, query):
+        """
+        Eagerly load the relationships listed in "__included", so that
+        add_included does not have to query for each instance.  Collections
+        are loaded with one extra query per relationship, and single related
+        objects are joined into the main query.
+        """
+        for included in included_paths(self, req):
+            relationships = included_relationships(self.model, included)
+            if relationships is None:
+                continue
+            loader = None
+            for relationship in relationships:
+                attr = getattr(relationship.parent.class_, relationship.key)
+                if relationship.uselist:
+                    loader = selectinload(attr) if loader is None else loader.selectinload(attr)
+                else:
+                    loader = joinedload(attr) if loader is None else loader.joinedload(attr)
+            query = query.options(loader)
+        return query
 
     def apply_arg_filter(self, req, resp, resources, kwargs):
         for key, value in kwargs.items():
@@ -199,13 +278,55 @@ class BaseResource(object):
             if callable(key):
                 resources = key(req, resp, resources, **kwargs)
             else:
-                attr = getattr(self.model, key, None)
-                if attr is None or not isinstance(inspect(self.model).attrs[key], ColumnProperty):
+                try:
+                    attr = get_filter_plan(self.model)[key][0]
+                except KeyError:
                     self.logger.error("Programming error: {0}.attr_map['{1}'] does not exist or is not a column".format(self.model, key))
                     raise falcon.errors.HTTPInternalServerError('Internal Server Error', 'An internal server error occurred')
                 resources = resources.filter(attr == value)
         return resources
 
+    def deserializer(self, model):
+        """
+        Return the compiled functions parsing request values for `model`.
+        """
+        return get_deserializer(model, getattr(self, 'naive_datetimes', []), getattr(self, 'geometry_axes', {}))
+
+    def deserialize_body(self, model, data, allow_recursion=False, passthrough=(), nested=False):
+        """
+        Parse the attribute values in a request body for `model`.  Returns the
+        attributes, and, if `allow_recursion`, the attributes of the related
+        resources given by relationship key.  If `nested`, each related
+        resource is instead an (attributes, linked) pair of its own, to any
+        depth.
+        """
+        parsers     = self.deserializer(model)
+        attributes  = {}
+        linked      = {}
+        for key, value in data.items():
+            try:
+                parse = parsers[key]
+            except KeyError:
+                if key in passthrough:
+                    attributes[key] = value
+                elif allow_recursion and key in get_metadata(model).relationships:
+                    relationship = get_metadata(model).relationships[key]
+                    if relationship.uselist:
+                        linked[key] = [self._deserialize_related(relationship.mapper.entity, entity, passthrough, nested) for entity in value]
+                    else:
+                        linked[key] = self._deserialize_related(relationship.mapper.entity, value, passthrough, nested)
+                # Otherwise, assume programmer has done their job of filtering
+                # out invalid columns, and that they are going to use this
+                # field for some custom purpose
+                continue
+            attributes[key] = parse(value) if parse is not None and value is not None else value
+        return attributes, linked
+
+    def _deserialize_related(self, model, data, passthrough, nested):
+        if nested:
+            return self.deserialize_body(model, data, True, passthrough, nested=True)
+        return self.deserialize_body(model, data, passthrough=passthrough)[0]
+
     def apply_default_attributes(self, defaults_type, req, resp, attributes):
         defaults = getattr(self, defaults_type, {})
         for key, setter in defaults.items():
@@ -216,93 +337,117 @@ class CollectionResource(BaseResource):
     """
     Provides CRUD facilities for a resource collection.
     """
+    default_methods = ['GET', 'POST', 'PATCH']
+
     def deserialize(self, model, path_data, body_data, allow_recursion=False):
-        mapper          = inspect(model)
-        attributes      = {}
-        naive_datetimes = getattr(self, 'naive_datetimes', [])
+        attributes = {}
 
         for key, value in path_data.items():
             key = getattr(self, 'attr_map', {}).get(key, key)
-            if getattr(model, key, None) is None or not isinstance(inspect(model).attrs[key], ColumnProperty):
+            if get_metadata(model).column(key) is None:
                 self.logger.error("Programming error: {0}.attr_map['{1}'] does not exist or is not a column".format(model, key))
                 raise falcon.errors.HTTPInternalServerError('Internal Server Error', 'An internal server error occurred')
             attributes[key] = value
 
-        deserialized = [attributes, {}]
+        body_attributes, linked = self.deserialize_body(model, body_data, allow_recursion, nested=True)
+        attributes.update(body_attributes)
+        return [attributes, linked]
 
-        for key, value in body_data.items():
-            if isinstance(getattr(model, key, None), property):
-                # Value is set using a function, so we cannot tell what type it will be
-                attributes[key] = value
+    def get_filter(self, req, resp, query, *args, **kwargs):
+        return query
+
+    def statement_cache_info(self):
+        """
+        Return the hits, misses and current size of the cache of collection
+        queries.
+        """
+        cache = getattr(self, '_statement_cache', None)
+        if cache is None:
+            return {'hits': 0, 'misses': 0, 'size': 0}
+        return {'hits': cache.hits, 'misses': cache.misses, 'size': len(cache.entries)}
+
+    def _use_statement_cache(self, kwargs):
+        """
+        Whether the collection query can be taken from the statement cache.
+        Resources that override how the query is built, or filter URL
+        arguments with functions, build it for every request instead.
+        """
+        if not getattr(self, 'statement_cache_size', 500):
+            return False
+        for name in _QUERY_HOOKS:
+            if getattr(type(self), name) is not getattr(CollectionResource, name):
+                return False
+        attr_map = getattr(self, 'attr_map', {})
+        return not any(callable(attr_map.get(key, key)) for key in kwargs)
+
+    def _cached_filters(self, req, kwargs):
+        """
+        Validate the URL arguments and filter parameters of a request.
+
+        Returns the part of the statement cache key they decide, the bound
+        parameter values for the request, and a function adding their
+        conditions to a query.
+        """
+        arg_filters = []
+        for key in sorted(kwargs):
+            mapped = getattr(self, 'attr_map', {}).get(key, key)
+            try:
+                attr = get_filter_plan(self.model)[mapped][0]
+            except KeyError:
+                self.logger.error("Programming error: {0}.attr_map['{1}'] does not exist or is not a column".format(self.model, mapped))
+                raise falcon.errors.HTTPInternalServerError('Internal Server Error', 'An internal server error occurred')
+            arg_filters.append((attr, '__arg_' + key))
+        values = dict(('__arg_' + key, kwargs[key]) for key in kwargs)
+
+        plan    = get_filter_plan(self.model)
+        filters = []
+        shape   = []
+        for filter_key in sorted(req.params):
+            if filter_key.startswith('__'):
+                # Not a filtering parameter
                 continue
             try:
-                column = mapper.columns[key]
+                attr, condition, prepare, bind = plan[filter_key]
             except KeyError:
-                if not allow_recursion:
-                    # Assume programmer has done their job of filtering out invalid
-                    # columns, and that they are going to use this field for some
-                    # custom purpose
-                    continue
-                try:
-                    relationship = mapper.relationships[key]
-                    if relationship.uselist:
-                        for entity in value:
-                            deserialized[1][key] = [self.deserialize(relationship.mapper.entity, {}, entity, False)[0] for entity in value]
-                    else:
-                        deserialized[1][key] = self.deserialize(relationship.mapper.entity, {}, value, False)[0]
-                    continue
-                except KeyError:
-                    # Assume programmer has done their job of filtering out invalid
-                    # columns, and that they are going to use this field for some
-                    # custom purpose
-                    continue
-            if isinstance(column.type, sqlalchemy.sql.sqltypes.DateTime):
-                if value is None:
-                    attributes[key] = None
-                elif key in naive_datetimes:
-                    attributes[key] = datetime.strptime(value, '%Y-%m-%dT%H:%M:%S')
-                else:
-                    attributes[key] = datetime.strptime(value, '%Y-%m-%dT%H:%M:%SZ')
-            elif isinstance(column.type, sqlalchemy.sql.sqltypes.Date):
-                attributes[key] = datetime.strptime(value, '%Y-%m-%d').date() if value is not None else None
-            elif isinstance(column.type, sqlalchemy.sql.sqltypes.Time):
-                if value is not None:
-                    hour, minute, second = value.split(':')
-                    attributes[key] = time(int(hour), int(minute), int(second))
-                else:
-                    attributes[key] = None
-            elif support_geo and isinstance(column.type, Geometry) and column.type.geometry_type == 'POINT':
-                axes    = getattr(self, 'geometry_axes', {}).get(key, ['x', 'y'])
-                point   = Point(value[axes[0]], value[axes[1]])
-                # geoalchemy2.shape.from_shape uses buffer() which causes INSERT to fail
-                attributes[key] = WKBElement(point.wkb, srid=4326)
-            elif support_geo and isinstance(column.type, Geometry) and column.type.geometry_type == 'LINESTRING':
-                axes    = getattr(self, 'geometry_axes', {}).get(key, ['x', 'y'])
-                line    = LineString([point[axes[0]], point[axes[1]]] for point in value)
-                # geoalchemy2.shape.from_shape uses buffer() which causes INSERT to fail
-                attributes[key] = WKBElement(line.wkb, srid=4326)
-            elif support_geo and isinstance(column.type, Geometry) and column.type.geometry_type == 'POLYGON':
-                axes    = getattr(self, 'geometry_axes', {}).get(key, ['x', 'y'])
-                polygon = Polygon([point[axes[0]], point[axes[1]]] for point in value)
-                # geoalchemy2.shape.from_shape uses buffer() which causes INSERT to fail
-                attributes[key] = WKBElement(polygon.wkb, srid=4326)
+                self.logger.warn('An attribute ({0}) provided for filtering is invalid'.format(filter_key.split('__')[0]))
+                raise falcon.errors.HTTPBadRequest('Invalid attribute', 'An attribute provided for filtering is invalid')
+            value = req.params[filter_key]
+            if prepare is not None:
+                value = prepare(value)
+            if bind:
+                name = '__filter_{0}'.format(len(filters))
+                values[name] = value
+                filters.append((attr, condition, bindparam(name, expanding=isinstance(value, list))))
+                shape.append((filter_key, None))
             else:
-                attributes[key] = value
-        return deserialized
+                filters.append((attr, condition, value))
+                shape.append((filter_key, value))
+
+        def apply_filters(query):
+            for attr, name in arg_filters:
+                query = query.filter(attr == bindparam(name))
+            for attr, condition, value in filters:
+                query = query.filter(condition(attr, value))
+            return query
+        return (tuple(sorted(kwargs)), tuple(shape)), values, apply_filters
+
+    def _query_collection(self, req, resp, db_session, *args, **kwargs):
+        """
+        Build the filtered, sorted and paged query for a collection GET.
 
-    def get_filter(self, req, resp, query, *args, **kwargs):
-        return query
+        Returns the query, the paging metadata for the response (or None if
+        the request is not paged), and a dictionary of paging state to be
+        filled in by _collection_items and passed to _complete_meta (or None
+        if there is nothing to complete).
 
-    @falcon.before(identify)
-    @falcon.before(authorize)
-    def on_get(self, req, resp, *args, **kwargs):
-        """
-        Return a collection of items.
+        Unless the resource changes how the query is built, the query up to
+        paging is taken from a cache keyed by the shape of the request, with
+        the request's values passed as bound parameters.
         """
-        if 'GET' not in getattr(self, 'methods', ['GET', 'POST', 'PATCH']):
-            raise falcon.errors.HTTPMethodNotAllowed(getattr(self, 'methods', ['GET', 'POST', 'PATCH']))
-
-        with session_scope(self.db_engine, sessionmaker_=self.sessionmaker, **self.sessionmaker_kwargs) as db_session:
+        cached = self._use_statement_cache(kwargs)
+        if cached:
+            filter_shape, values, apply_filters = self._cached_filters(req, kwargs)
+        else:
             resources = self.apply_arg_filter(req, resp, db_session.query(self.model), kwargs)
 
             resources = self.filter_by_params(
@@ -314,129 +459,405 @@ class CollectionResource(BaseResource):
                 req.params
             )
 
-            sort                = getattr(self, 'default_sort', None)
-            using_default_sort  = True
-            if '__sort' in req.params:
-                using_default_sort = False
-                sort = req.get_param_as_list('__sort')
-            if sort is not None:
-                order_fields = []
-                for field_name in sort:
-                    reverse = False
-                    if field_name[0] == '-':
-                        field_name = field_name[1:]
-                        reverse = True
-                    attr = getattr(self.model, field_name, None)
-                    if attr is None or not isinstance(inspect(self.model).attrs[field_name], ColumnProperty):
-                        if using_default_sort:
-                            self.logger.error("Programming error: Sort field {0}.{1} does not exist or is not a column".format(self.model, field_name))
-                            raise falcon.errors.HTTPInternalServerError('Internal Server Error', 'An internal server error occurred')
-                        else:
-                            raise falcon.errors.HTTPBadRequest('Invalid attribute', 'An attribute provided for sorting is invalid')
-                    if reverse:
-                        order_fields.append(attr.desc())
+        sort                = getattr(self, 'default_sort', None)
+        using_default_sort  = True
+        if '__sort' in req.params:
+            using_default_sort = False
+            sort = req.get_param_as_list('__sort')
+        # (key, reverse, column, order by expression) for each sort field
+        sort_plan   = get_sort_plan(self.model)
+        sort_keys   = []
+        if sort is not None:
+            for field_name in sort:
+                try:
+                    sort_keys.append(sort_plan[field_name])
+                except KeyError:
+                    if using_default_sort:
+                        self.logger.error("Programming error: Sort field {0}.{1} does not exist or is not a column".format(self.model, field_name.lstrip('-')))
+                        raise falcon.errors.HTTPInternalServerError('Internal Server Error', 'An internal server error occurred')
                     else:
-                        order_fields.append(attr)
-                resources = resources.order_by(*order_fields)
+                        raise falcon.errors.HTTPBadRequest('Invalid attribute', 'An attribute provided for sorting is invalid')
+
+        page        = req.get_param_as_int('__page')
+        page_size   = req.get_param_as_int('__page_size')
+        after       = req.get_param('__after')
+        paging      = None
+        if after is not None or (getattr(self, 'keyset_pagination', False) and page is None and page_size):
+            if page is not None:
+                raise falcon.errors.HTTPBadRequest('Invalid parameter', 'The "__after" parameter cannot be used with "__page"')
+            if not page_size:
+                raise falcon.errors.HTTPBadRequest('Invalid parameter', 'The "__page_size" parameter is required with "__after"')
+            # The primary key breaks ties, so that every row has a unique
+            # position in the sort
+            for primary_key in get_metadata(self.model).primary_key:
+                if primary_key not in [key for key, _, _, _ in sort_keys]:
+                    sort_keys.append(sort_plan[primary_key])
+            paging = {
+                'sort':         ['-' + key if reverse else key for key, reverse, _, _ in sort_keys],
+                'keys':         [key for key, _, _, _ in sort_keys],
+                'page_size':    page_size,
+            }
 
-            count = None
-            page = req.get_param_as_int('__page')
-            page_size = req.get_param_as_int('__page_size')
-            if page and page_size:
+        core_reads  = self.use_core_reads(req)
+        fields      = None
+        included    = ()
+        if not core_reads:
+            fields = self.response_fields_for(req)
+            if fields is not None and paging is not None:
+                fields = list(fields) + paging['keys']
+            included = tuple(included_paths(self, req))
+
+        after_values = None
+        if after is not None:
+            try:
+                after_sort, after_values = decode_cursor(after)
+            except ValueError:
+                raise falcon.errors.HTTPBadRequest('Invalid parameter', 'The "__after" parameter is invalid')
+            if after_sort != paging['sort'] or len(after_values) != len(sort_keys):
+                raise falcon.errors.HTTPBadRequest('Invalid parameter', 'The "__after" parameter does not match the sort order')
+
+        def shape_query(query, after_values):
+            if not core_reads:
+                query = self.load_only_fields(query, fields)
+                query = self.load_included(req, query)
+            if sort_keys:
+                query = query.order_by(*[order for _, _, _, order in sort_keys])
+            if after_values is not None:
+                query = query.filter(keyset_filter(
+                    [column for _, _, column, _ in sort_keys],
+                    [reverse for _, reverse, _, _ in sort_keys],
+                    after_values,
+                    [key in get_metadata(self.model).nullable for key, _, _, _ in sort_keys],
+                    nulls_sort_high(db_session.get_bind().dialect),
+                ))
+            return query
+
+        if cached:
+            if after_values is not None:
+                after_params = []
+                for index, ((_, _, column, _), value) in enumerate(zip(sort_keys, after_values)):
+                    if value is None:
+                        # NULLs need conditions of their own
+                        after_params.append(None)
+                        continue
+                    name = '__after_{0}'.format(index)
+                    values[name] = value
+                    after_params.append(bindparam(name, type_=column.type))
+            else:
+                after_params = None
+            key = (
+                filter_shape,
+                tuple(token for token in sort or ()),
+                paging is not None,
+                tuple(value is None for value in after_values) if after_values is not None else None,
+                core_reads,
+                tuple(fields) if fields is not None else None,
+                included,
+            )
+            statement_cache = getattr(self, '_statement_cache', None)
+            if statement_cache is None:
+                statement_cache = self._statement_cache = StatementCache(getattr(self, 'statement_cache_size', 500))
+            resources = statement_cache.get(
+                key,
+                lambda: shape_query(apply_filters(Query(self.model)), after_params)
+            )
+            resources = resources.with_session(db_session).params(values)
+        else:
+            resources = shape_query(resources, after_values)
+
+        if paging is not None:
+            return resources.limit(page_size), {'page_size': page_size, 'next': None}, paging
+
+        count       = None
+        requested   = None
+        if page and page_size:
+            strategy = requested = self._count_strategy(req)
+            if strategy == 'window':
+                # Counted along with the page by _collection_items
+                paging = {'window': True, 'page': page, 'count_query': resources}
+            else:
                 # count before filtering
-                count     = resources.count()
-                resources = resources.offset((page - 1) * page_size)
-                resources = resources.limit(page_size)
+                count, strategy = self._count(req, db_session, resources, strategy, kwargs)
+            resources = resources.offset((page - 1) * page_size)
+            resources = resources.limit(page_size)
+
+        meta = None
+        if page is not None and page_size is not None:
+            meta = {'total': count}
+            meta['page'] = page
+            meta['page_size'] = page_size
+            if requested is not None and requested != 'exact':
+                # Tell the client how the total was arrived at, since it may
+                # not be exact
+                meta['total_strategy'] = strategy
+        return resources, meta, paging
+
+    def _count_strategy(self, req):
+        """
+        The strategy used to count the total for a paged GET: the "__count"
+        parameter if given, otherwise the resource's count_strategy.
+
+        Clients may only pick the strategies in the resource's
+        allowed_count_strategies, which by default are 'exact', 'none' and
+        the resource's own count_strategy.  Cached totals are not scoped by
+        get_filter, and estimates run EXPLAIN, so neither is offered to
+        clients unless the resource opts in.
+        """
+        default  = getattr(self, 'count_strategy', 'exact')
+        strategy = req.get_param('__count')
+        if not strategy:
+            return default
+        if strategy == '0':
+            strategy = 'none'
+        allowed = getattr(self, 'allowed_count_strategies', ['exact', 'none', default])
+        if strategy not in COUNT_STRATEGIES or strategy not in allowed:
+            raise falcon.errors.HTTPBadRequest('Invalid parameter', 'The "__count" parameter is invalid')
+        return strategy
+
+    def count_cache_key(self, req, kwargs):
+        """
+        The key under which cached counts for a request are stored.  Override
+        this if get_filter narrows the collection by something other than the
+        request parameters, such as the identity of the user.
+        """
+        return (
+            tuple(sorted(
+                (key, tuple(value) if isinstance(value, list) else value)
+                for key, value in req.params.items()
+                if not key.startswith('__')
+            )),
+            tuple(sorted(kwargs.items())),
+        )
+
+    def _count(self, req, db_session, query, strategy, kwargs):
+        """
+        Count the rows matched by `query` using `strategy`, returning the
+        total and the strategy that actually produced it.
+        """
+        if strategy == 'none':
+            return None, strategy
+        if strategy == 'estimate':
+            total = estimate_count(db_session, query)
+            if total is not None:
+                return total, strategy
+            strategy = 'exact'
+        if strategy == 'cached':
+            cache = getattr(self, '_count_cache', None)
+            if cache is None:
+                cache = self._count_cache = CountCache(getattr(self, 'count_cache_ttl', 60), getattr(self, 'count_cache_size', 1000))
+            key = self.count_cache_key(req, kwargs)
+            total = cache.get(key)
+            if total is None:
+                total = query.count()
+                cache.set(key, total)
+            return total, strategy
+        return query.count(), 'exact'
+
+    def _collection_item(self, req, resource, serialize):
+        """
+        Build the response entry for one resource of a collection.
+        `serialize` is the compiled serializer for the collection's model.
+        """
+        metadata = get_metadata(resource.__class__)
+        instance = {
+            'pk':           metadata.pk(resource),
+            'type':         metadata.tablename,
+            'attributes':   serialize(resource) if resource.__class__ is self.model else self.serialize(resource, self.response_fields_for(req), getattr(self, 'geometry_axes', {}), native_types(req)),
+        }
+        add_included(self, req, resource, instance)
+        return instance
+
+    def _collection_items(self, req, db_session, resources, paging=None, chunk_size=None):
+        """
+        Generate the response entries for the resources matched by a
+        collection query, reading `chunk_size` rows at a time if given.
+
+        The number of rows is recorded in `paging` as 'count', along with the
+        sort values of the last row as 'last' for keyset paging, and the
+        total from the window function as 'total' for window counts.
+        """
+        response_fields = self.response_fields_for(req)
+        geometry_axes   = getattr(self, 'geometry_axes', {})
+        keyset          = paging is not None and 'keys' in paging
+        window          = paging is not None and paging.get('window', False)
+        count           = 0
+        last            = None
+        total           = None
+        if self.use_core_reads(req):
+            keys, serialize = self.row_serializer(self.model, response_fields, geometry_axes, native_types(req))
+            if keyset:
+                keys = keys + [key for key in paging['keys'] if key not in keys]
+                last_values = itemgetter(*[keys.index(key) for key in paging['keys']])
+            metadata = get_metadata(self.model)
+            for row in self.select_rows(db_session, resources, keys, chunk_size, [func.count().over()] if window else ()):
+                count += 1
+                last = row
+                if window:
+                    total = row[len(keys)]
+                yield {
+                    'pk':           metadata.row_pk(row),
+                    'type':         metadata.tablename,
+                    'attributes':   serialize(row),
+                }
+        else:
+            serialize = self.serializer(self.model, response_fields, geometry_axes, native_types(req))
+            if keyset:
+                last_values = attrgetter(*paging['keys'])
+            if window:
+                resources = resources.add_columns(func.count().over())
+            if chunk_size is not None:
+                resources = resources.yield_per(chunk_size)
+            for resource in resources:
+                if window:
+                    resource, total = resource
+                count += 1
+                last = resource
+                yield self._collection_item(req, resource, serialize)
+        if paging is not None:
+            paging['count'] = count
+            paging['total'] = total
+            if keyset and last is not None:
+                values = last_values(last)
+                paging['last'] = list(values) if len(paging['keys']) > 1 else [values]
+
+    def _complete_meta(self, meta, paging):
+        """
+        Fill in the parts of the paging metadata that depend on the rows read
+        by _collection_items.
+        """
+        if paging is None:
+            return
+        if 'keys' in paging:
+            # No next page if this one was not full
+            if paging['count'] < paging['page_size']:
+                meta['next'] = None
+            else:
+                meta['next'] = encode_cursor(paging['sort'], paging['last'])
+        elif paging.get('window', False):
+            if paging['count'] > 0:
+                meta['total'] = paging['total']
+            elif paging['page'] == 1:
+                meta['total'] = 0
+            else:
+                # Paged past the end, so there were no rows to count with
+                meta['total'] = paging['count_query'].count()
+                meta['total_strategy'] = 'exact'
+
+    @falcon.before(identify)
+    @falcon.before(authorize)
+    def on_get(self, req, resp, *args, **kwargs):
+        """
+        Return a collection of items.
+        """
+        dispatch = get_dispatch(self, 'GET')
+        if not dispatch.allowed:
+            raise falcon.errors.HTTPMethodNotAllowed(dispatch.methods)
+
+        if getattr(self, 'stream_results', False) and dispatch.response_schema is None:
+            stream = self._stream_collection(req, resp, *args, **kwargs)
+            # Run up to the first yield, so that bad requests are reported
+            # before the response starts
+            next(stream)
+            resp.status = falcon.HTTP_OK
+            resp.stream = stream
+            return
+
+        with self.request_session(req) as db_session:
+            resources, meta, paging = self._query_collection(req, resp, db_session, *args, **kwargs)
 
             resp.status = falcon.HTTP_OK
             result = {
-                'data': [],
+                'data': list(self._collection_items(req, db_session, resources, paging)),
             }
-            for resource in resources:
-                primary_key = identify_pk(resource.__class__)
-                instance = {
-                    'pk':           getattr(resource, primary_key),
-                    'type':         resource.__tablename__,
-                    'attributes':   self.serialize(resource, getattr(self, 'response_fields', None), getattr(self, 'geometry_axes', {})),
-                }
-                add_included(self, req, resource, instance)
-                result['data'].append(instance)
 
-            if page is not None and page_size is not None:
-                result['meta'] = {'total': count}
-                result['meta']['page'] = page
-                result['meta']['page_size'] = page_size
+            self._complete_meta(meta, paging)
+            if meta is not None:
+                result['meta'] = meta
             req.context['result'] = result
 
-            after_get = getattr(self, 'after_get', None)
+            after_get = dispatch.after
+            if after_get is not None:
+                after_get(req, resp, resources, *args, **kwargs)
+
+    def _stream_collection(self, req, resp, *args, **kwargs):
+        """
+        Generate the response body for a collection GET piece by piece, so
+        that rows are sent as they are read from the database.
+
+        The first value yielded is None, once the query has been built and
+        the after_get hook has run.  The session stays open until the
+        generator is exhausted or closed.
+        """
+        encode      = req.context.get('json_encoder', JSONEncoder()).encode
+        chunk_size  = getattr(self, 'stream_chunk_size', 100)
+        with factory_session_scope(lambda: self.open_session(req)) as db_session:
+            resources, meta, paging = self._query_collection(req, resp, db_session, *args, **kwargs)
+
+            after_get = get_dispatch(self, 'GET').after
             if after_get is not None:
                 after_get(req, resp, resources, *args, **kwargs)
 
+            yield None
+
+            chunk       = [b'{"data":[']
+            separator   = b''
+            for item in self._collection_items(req, db_session, resources, paging, chunk_size):
+                chunk.append(separator)
+                chunk.append(encode(item))
+                separator = b','
+                if len(chunk) >= 2 * chunk_size:
+                    yield b''.join(chunk)
+                    chunk = []
+            chunk.append(b']')
+            self._complete_meta(meta, paging)
+            if meta is not None:
+                chunk.append(b',"meta":')
+                chunk.append(encode(meta))
+            chunk.append(b'}')
+            yield b''.join(chunk)
+
     @falcon.before(identify)
     @falcon.before(authorize)
     def on_post(self, req, resp, *args, **kwargs):
         """
         Add an item to the collection.
         """
-        if 'POST' not in getattr(self, 'methods', ['GET', 'POST', 'PATCH']):
-            raise falcon.errors.HTTPMethodNotAllowed(getattr(self, 'methods', ['GET', 'POST', 'PATCH']))
+        dispatch = get_dispatch(self, 'POST')
+        if not dispatch.allowed:
+            raise falcon.errors.HTTPMethodNotAllowed(dispatch.methods)
+
+        if getattr(self, 'post_upsert', False):
+            return self._post_upsert(req, resp, *args, **kwargs)
+
+        if isinstance(req.context.get('doc'), list):
+            return self._post_many(req, resp, req.context['doc'], *args, **kwargs)
 
         attributes, linked = self.deserialize(self.model, kwargs, req.context['doc'] if 'doc' in req.context else None, getattr(self, 'allow_subresources', True))
 
-        with session_scope(self.db_engine, sessionmaker_=self.sessionmaker, **self.sessionmaker_kwargs) as db_session:
+        with self.request_session(req) as db_session:
             self.apply_default_attributes('post_defaults', req, resp, attributes)
 
             resource = self.model(**attributes)
 
-            before_post = getattr(self, 'before_post', None)
+            before_post = dispatch.before
             if before_post is not None:
-                self.before_post(req, resp, db_session, resource, *args, **kwargs)
+                before_post(req, resp, db_session, resource, *args, **kwargs)
 
+            # Related resources are inserted along with the resource in one
+            # flush, the rows of each model together
+            subresources = self.link_subresources(resource, linked)
             db_session.add(resource)
+            db_session.add_all([subresource for _, subresource in subresources])
             try:
-                # Begin a nested transaction to create subresources
-                db_session.begin_nested()
-
-                # Add related objects now
-                mapper = inspect(self.model)
-                subresources_created = []
-                for key, value in linked.items():
-                    relationship = mapper.relationships[key]
-                    resource_class = relationship.mapper.entity
-                    if relationship.uselist:
-                        for attributes in value:
-                            subresource = resource_class(**attributes)
-                            db_session.add(subresource)
-                            subresources_created.append((key, 'onetomany', subresource))
-                            getattr(resource, key).append(subresource)
-                    else:
-                        subresource = resource_class(**value)
-                        db_session.add(subresource)
-                        subresources_created.append((key, 'onetoone', subresource))
-                        setattr(resource, key, subresource)
+                db_session.flush()
 
-                # Inner commit (subresources)
-                db_session.commit()
+                # Serialize before committing, so that committing does not
+                # expire the instances and reload each one
+                data = self.serialize(resource, getattr(self, 'response_fields', None), getattr(self, 'geometry_axes', {}), native_types(req))
+                # Add subresources created to response
+                for relationship_key, subresource in subresources:
+                    data[relationship_key] = self.serialize(subresource, getattr(self, 'response_fields', None), getattr(self, 'geometry_axes', {}), native_types(req))
 
-                # Now that subresources have ids, assign the correct reference ids
-                for _, relationship_type, subresource in subresources_created:
-                    if relationship_type == 'onetoone':
-                        # Resource should have a referencee to subresource
-                        subresource_id = subresource.__tablename__ + '_id'
-                        if hasattr(resource, subresource_id):
-                            setattr(resource, subresource_id, getattr(subresource, subresource_id))
-                        # Subresource MAY have a reference to resource (Less likely)
-                        resource_id = resource.__tablename__ + '_id'
-                        if hasattr(subresource, resource_id):
-                            setattr(subresource, resource_id, getattr(resource, resource_id))
-                    elif relationship_type == 'onetomany':
-                        # Subresource should have a reference to resource
-                        resource_id = resource.__tablename__ + '_id'
-                        if hasattr(subresource, resource_id):
-                            setattr(subresource, resource_id, getattr(resource, resource_id))
-                        # TODO: Maybe resource has a list of subresource ids?
-
-                # Outer commit (resource)
                 db_session.commit()
             except sqlalchemy.exc.IntegrityError as err:
                 # Cases such as unallowed NULL value should have been checked
@@ -457,90 +878,468 @@ class CollectionResource(BaseResource):
 
             resp.status = falcon.HTTP_CREATED
             req.context['result'] = {
-                'data': self.serialize(resource, getattr(self, 'response_fields', None), getattr(self, 'geometry_axes', {})),
+                'data': data,
             }
-            # Add subresources created to response
-            for relationship_key, relationship_type, subresource in subresources_created:
-                req.context['result']['data'][relationship_key] = self.serialize(subresource, getattr(self, 'response_fields', None), getattr(self, 'geometry_axes', {}))
 
-            after_post = getattr(self, 'after_post', None)
+            after_post = dispatch.after
             if after_post is not None:
                 after_post(req, resp, resource)
 
+    def link_subresources(self, resource, linked):
+        """
+        Create the subresources deserialized from a POST body, and attach
+        them to `resource` through their relationships, so that they are
+        saved along with it in the same flush, with their foreign keys set by
+        the relationships.  Subresources of subresources are linked in turn.
+        Returns (key, subresource) pairs for the direct subresources.
+        """
+        relationships   = get_metadata(resource.__class__).relationships
+        subresources    = []
+        for key, value in linked.items():
+            relationship = relationships[key]
+            resource_class = relationship.mapper.entity
+            for attributes, sublinked in (value if relationship.uselist else [value]):
+                subresource = resource_class(**attributes)
+                if relationship.uselist:
+                    getattr(resource, key).append(subresource)
+                else:
+                    setattr(resource, key, subresource)
+                self.link_subresources(subresource, sublinked)
+                subresources.append((key, subresource))
+        return subresources
+
+    def _post_many(self, req, resp, docs, *args, **kwargs):
+        """
+        Add every item in an array POST body to the collection, in a single
+        transaction.  The unit of work inserts the rows for each model in
+        batches, and the response lists the items in the order given.
+        """
+        items = []
+        for index, doc in enumerate(docs):
+            if not isinstance(doc, dict):
+                raise falcon.errors.HTTPBadRequest('Invalid request body', 'Item {0} is not an object'.format(index))
+            items.append(self.deserialize(self.model, kwargs, doc, getattr(self, 'allow_subresources', True)))
+
+        with self.request_session(req) as db_session:
+            created = []
+            for attributes, linked in items:
+                self.apply_default_attributes('post_defaults', req, resp, attributes)
+
+                resource = self.model(**attributes)
+
+                before_post = get_dispatch(self, 'POST').before
+                if before_post is not None:
+                    before_post(req, resp, db_session, resource, *args, **kwargs)
+
+                subresources = self.link_subresources(resource, linked)
+                db_session.add(resource)
+                db_session.add_all([subresource for _, subresource in subresources])
+                created.append((resource, subresources))
+
+            try:
+                db_session.flush()
+
+                # Serialize before committing, so that committing does not
+                # expire every instance and reload each one
+                data = []
+                for resource, subresources in created:
+                    item = self.serialize(resource, getattr(self, 'response_fields', None), getattr(self, 'geometry_axes', {}), native_types(req))
+                    for relationship_key, subresource in subresources:
+                        item[relationship_key] = self.serialize(subresource, getattr(self, 'response_fields', None), getattr(self, 'geometry_axes', {}), native_types(req))
+                    data.append(item)
+
+                db_session.commit()
+            except sqlalchemy.exc.IntegrityError as err:
+                # Cases such as unallowed NULL value should have been checked
+                # before we got here (e.g. validate against schema
+                # using the middleware) - therefore assume this is a UNIQUE
+                # constraint violation
+                db_session.rollback()
+                raise falcon.errors.HTTPConflict('Conflict', 'Unique constraint violated')
+            except sqlalchemy.exc.ProgrammingError as err:
+                db_session.rollback()
+                if err.orig.args[1] == '23505':
+                    raise falcon.errors.HTTPConflict('Conflict', 'Unique constraint violated')
+                else:
+                    raise
+            except:
+                db_session.rollback()
+                raise
+
+            resp.status = falcon.HTTP_CREATED
+            req.context['result'] = {
+                'data': data,
+            }
+
+            after_post = get_dispatch(self, 'POST').after
+            if after_post is not None:
+                for resource, _ in created:
+                    after_post(req, resp, resource)
+
+    def upsert_target(self, model):
+        """
+        The attributes whose values identify an existing row of `model` to
+        update when upserting: the resource's conflict_target (which may be a
+        dictionary of them by model), or else the primary key.
+        """
+        target = getattr(self, 'conflict_target', None)
+        if isinstance(target, dict):
+            target = target.get(model)
+        if target is None:
+            target = get_metadata(model).primary_key
+        return target
+
+    def _post_upsert(self, req, resp, *args, **kwargs):
+        """
+        Add the item, or items, in a POST body to the collection, updating
+        existing rows with the same values of the conflict target instead.
+        """
+        doc     = req.context['doc'] if 'doc' in req.context else None
+        docs    = doc if isinstance(doc, list) else [doc]
+        target  = self.upsert_target(self.model)
+        rows    = []
+        for index, item in enumerate(docs):
+            if not isinstance(item, dict):
+                raise falcon.errors.HTTPBadRequest('Invalid request body', 'Item {0} is not an object'.format(index))
+            # Rows are written without the ORM, so there is nothing to link
+            # related resources to
+            if any(key in get_metadata(self.model).relationships for key in item):
+                raise falcon.errors.HTTPBadRequest('Invalid request body', 'Item {0} has linked resources, which can\'t be upserted'.format(index))
+            attributes, _ = self.deserialize(self.model, kwargs, item, False)
+            self.apply_default_attributes('post_defaults', req, resp, attributes)
+            if any(key not in attributes for key in target):
+                raise falcon.errors.HTTPBadRequest('Invalid request body', 'Item {0} does not have the attributes to upsert on'.format(index))
+            rows.append(attributes)
+
+        keys, serialize = self.row_serializer(self.model, getattr(self, 'response_fields', None), getattr(self, 'geometry_axes', {}), native_types(req))
+        with self.request_session(req) as db_session:
+            try:
+                self.check_upsert_targets(req, resp, db_session, self.model, rows, target, args, kwargs)
+                results = upsert(db_session, self.model, rows, target, keys, getattr(self, 'patch_chunk_size', 500))
+                db_session.commit()
+            except sqlalchemy.exc.IntegrityError as err:
+                # The conflict target is taken care of, so this is another
+                # UNIQUE constraint
+                db_session.rollback()
+                raise falcon.errors.HTTPConflict('Conflict', 'Unique constraint violated')
+            except sqlalchemy.exc.ProgrammingError as err:
+                db_session.rollback()
+                if err.orig.args[1] == '23505':
+                    raise falcon.errors.HTTPConflict('Conflict', 'Unique constraint violated')
+                else:
+                    raise
+            except:
+                db_session.rollback()
+                raise
+
+        data        = [serialize(values) for values, _ in results]
+        upserted    = ['inserted' if inserted else 'updated' for _, inserted in results]
+        resp.status = falcon.HTTP_CREATED if 'inserted' in upserted else falcon.HTTP_OK
+        if isinstance(doc, list):
+            req.context['result'] = {'data': data, 'meta': {'upserted': upserted}}
+        else:
+            req.context['result'] = {'data': data[0], 'meta': {'upserted': upserted[0]}}
+
+    def check_upsert_targets(self, req, resp, db_session, model, rows, target, args, kwargs):
+        """
+        Refuse to upsert rows that would update an existing row the resource
+        cannot reach: one outside the URL arguments, or hidden by
+        get_patch_filter.  Like replace and remove, upserts must not touch rows
+        a GET would not return.
+        """
+        columns     = [getattr(model, key) for key in target]
+        targets     = list(set(tuple(row[key] for key in target) for row in rows))
+        chunk_size  = getattr(self, 'patch_chunk_size', 500)
+        for start in range(0, len(targets), chunk_size):
+            condition   = target_condition(columns, targets[start:start + chunk_size])
+            existing    = set(tuple(row) for row in db_session.query(*columns).filter(condition))
+            if not existing:
+                continue
+            reachable   = set(
+                tuple(row)
+                for row in self._patch_query(req, resp, db_session, model, [condition], args, kwargs).with_entities(*columns)
+            )
+            if existing - reachable:
+                raise falcon.errors.HTTPConflict('Conflict', 'Resource found but conditions violated')
+
+    def _path_attributes(self, model, kwargs):
+        """
+        The attributes of `model` set from the URL arguments.
+        """
+        attributes = {}
+        for key, value in kwargs.items():
+            key = getattr(self, 'attr_map', {}).get(key, key)
+            if get_metadata(model).column(key) is None:
+                self.logger.error("Programming error: {0}.attr_map['{1}'] does not exist or is not a column".format(model, key))
+                raise falcon.errors.HTTPInternalServerError('Internal Server Error', 'An internal server error occurred')
+            attributes[key] = value
+        return attributes
+
+    def bulk_insert(self, db_session, model, rows, return_pks=False):
+        """
+        Insert rows of attribute values for `model`, as batched INSERTs.  If
+        `return_pks` is set, generated primary keys are set in the rows.
+
+        Models using inheritance are added through the ORM instead, so that
+        every table they span gets its row.
+        """
+        mapper = get_metadata(model).mapper
+        if mapper.inherits is not None or mapper.polymorphic_on is not None:
+            resources = [model(**row) for row in rows]
+            db_session.add_all(resources)
+            if return_pks:
+                db_session.flush()
+                for row, resource in zip(rows, resources):
+                    for primary_key in get_metadata(model).primary_key:
+                        row[primary_key] = getattr(resource, primary_key)
+            return
+        db_session.bulk_insert_mappings(model, rows, return_defaults=return_pks)
+
+    def _patch_target(self, index, patch, model):
+        """
+        The conditions selecting the rows a replace or remove patch applies
+        to, and the primary keys it lists, if it targets rows that way.
+        """
+        if 'pks' in patch and 'filter' not in patch:
+            pks = patch['pks']
+            if not isinstance(pks, list) or len(pks) == 0 or any(get_metadata(model).pk_values(pk) is None for pk in pks):
+                raise falcon.errors.HTTPBadRequest('Invalid patch', 'Patch {0} is not valid for op {1}'.format(index, patch['op']))
+            return None, pks
+        # An empty filter would match every row
+        if 'filter' in patch and 'pks' not in patch and isinstance(patch['filter'], dict) and patch['filter']:
+            plan        = get_filter_plan(model)
+            conditions  = []
+            for filter_key, value in patch['filter'].items():
+                try:
+                    attr, condition, prepare, _ = plan[filter_key]
+                except KeyError:
+                    raise falcon.errors.HTTPBadRequest('Invalid patch', 'Patch {0} is not valid for op {1}'.format(index, patch['op']))
+                conditions.append(condition(attr, prepare(value) if prepare is not None else value))
+            return conditions, None
+        raise falcon.errors.HTTPBadRequest('Invalid patch', 'Patch {0} is not valid for op {1}'.format(index, patch['op']))
+
+    def get_patch_filter(self, req, resp, query, model, *args, **kwargs):
+        """
+        Filter the rows of `model` that replace, remove and upsert patches may
+        reach.  For the resource's own model, this is get_filter.  Resources
+        with other models in patch_paths override it to allow those ops on
+        them.
+        """
+        if model is getattr(self, 'model', None):
+            return self.get_filter(req, resp, query, *args, **kwargs)
+        return query
+
+    def _patch_filtered(self, model):
+        """
+        Whether the rows of `model` that patches may change are filtered by
+        the resource: it is the resource's own model, or the resource
+        overrides get_patch_filter.
+        """
+        if model is getattr(self, 'model', None):
+            return True
+        return type(self).get_patch_filter is not CollectionResource.get_patch_filter
+
+    def _patch_query(self, req, resp, db_session, model, conditions, args, kwargs):
+        """
+        Query the rows of `model` that match `conditions` and the URL
+        arguments, and pass get_patch_filter.
+        """
+        query = db_session.query(model)
+        for key, value in self._path_attributes(model, kwargs).items():
+            query = query.filter(getattr(model, key) == value)
+        query = self.get_patch_filter(req, resp, query, model, *args, **kwargs)
+        return query.filter(*conditions)
+
+    def _patch_chunks(self, model, pks):
+        """
+        Conditions selecting the rows with primary keys in `pks`, a chunk at
+        a time, so that no statement has too many parameters.
+        """
+        metadata    = get_metadata(model)
+        chunk_size  = getattr(self, 'patch_chunk_size', 500)
+        for start in range(0, len(pks), chunk_size):
+            yield [metadata.pk_condition(pks[start:start + chunk_size])]
+
+    def bulk_remove(self, req, resp, query, *args, **kwargs):
+        """
+        Remove the rows matched by `query`.
+
+        If the resource defines mark_deleted_values, returning the attribute
+        values that mark a row as deleted, the rows are updated with those
+        instead.  A mark_deleted method, as on a SingleResource, is called for
+        each matching instance, which is much slower.
+        """
+        dispatch            = get_dispatch(self, req.method)
+        mark_deleted_values = dispatch.mark_deleted_values
+        if mark_deleted_values is not None:
+            return query.update(mark_deleted_values(req, resp, *args, **kwargs), synchronize_session=False)
+        mark_deleted = dispatch.mark_deleted
+        if mark_deleted is not None:
+            count = 0
+            for resource in query:
+                mark_deleted(req, resp, resource, *args, **kwargs)
+                count += 1
+            return count
+        return query.delete(synchronize_session=False)
+
     @falcon.before(identify)
     @falcon.before(authorize)
     def on_patch(self, req, resp, *args, **kwargs):
         """
         Update a collection.
 
-        For now, it only supports adding entities to the collection, like this:
+        Entities can be added or upserted (added, or updated if they match an
+        existing entity on the conflict target) to the collection, and
+        replaced or removed by primary key or filter, like this:
 
         {
             'patches': [
                 {'op': 'add', 'path': '/', 'value': {'name': 'Jim', 'age', 25}},
-                {'op': 'add', 'path': '/', 'value': {'name': 'Bob', 'age', 28}}
+                {'op': 'add', 'path': '/', 'value': {'name': 'Bob', 'age', 28}},
+                {'op': 'upsert', 'path': '/', 'value': {'name': 'Sue', 'age', 32}},
+                {'op': 'replace', 'path': '/', 'pks': [1, 2], 'value': {'age': 30}},
+                {'op': 'remove', 'path': '/', 'filter': {'age__gt': 60}}
             ]
         }
 
+        Adds are done first, then upserts, then replaces, then removes.
+        Replaces of the same values and removes by primary key are each done
+        together as a single UPDATE or DELETE for each model.
+
+        Only adds are allowed unless the resource lists the other ops in
+        allowed_patch_ops.
         """
-        if 'PATCH' not in getattr(self, 'methods', ['GET', 'POST', 'PATCH']):
-            raise falcon.errors.HTTPMethodNotAllowed(getattr(self, 'methods', ['GET', 'POST', 'PATCH']))
+        dispatch = get_dispatch(self, 'PATCH')
+        if not dispatch.allowed:
+            raise falcon.errors.HTTPMethodNotAllowed(dispatch.methods)
 
         patch_paths = getattr(self, 'patch_paths', {})
         if len(patch_paths) == 0:
             patch_paths['/'] = self.model
-        patch_lookups = {
-            path: {
-                'model':    model,
-                'mapper':   inspect(model),
-            } for path, model in patch_paths.items()
-        }
-        patches = req.context['doc']['patches']
-
-        with session_scope(self.db_engine, sessionmaker_=self.sessionmaker, **self.sessionmaker_kwargs) as db_session:
-            for index, patch in enumerate(patches):
-                # Only support adding entities in a collection patch, for now
-                if 'op' not in patch or patch['op'] not in ['add']:
-                    raise falcon.errors.HTTPBadRequest('Invalid patch', 'Patch {0} is not valid'.format(index))
-                if patch['op'] == 'add':
-                    if 'path' not in patch or patch['path'] not in patch_paths:
-                        raise falcon.errors.HTTPBadRequest('Invalid patch', 'Patch {0} is not valid for op {1}'.format(index, patch['op']))
-
-                    model   = patch_lookups[patch['path']]['model']
-                    mapper  = patch_lookups[patch['path']]['mapper']
-
-                    try:
-                        patch_value = patch['value']
-                    except KeyError:
-                        raise falcon.errors.HTTPBadRequest('Invalid patch', 'Patch {0} is not valid for op {1}'.format(index, patch['op']))
-                    args = {}
-                    for key, value in kwargs.items():
-                        key = getattr(self, 'attr_map', {}).get(key, key)
-                        if getattr(model, key, None) is None or not isinstance(inspect(model).attrs[key], ColumnProperty):
-                            self.logger.error("Programming error: {0}.attr_map['{1}'] does not exist or is not a column".format(model, key))
-                            raise falcon.errors.HTTPInternalServerError('Internal Server Error', 'An internal server error occurred')
-                        args[key] = value
-                    for key, value in patch_value.items():
-                        if isinstance(mapper.columns[key].type, sqlalchemy.sql.sqltypes.DateTime):
-                            args[key] = datetime.strptime(value, '%Y-%m-%dT%H:%M:%SZ')
-                        else:
-                            args[key] = value
-                    resource = model(**args)
-                    db_session.add(resource)
+        patches     = req.context['doc']['patches']
+        allowed_ops = getattr(self, 'allowed_patch_ops', ['add'])
+
+        # Rows to insert for each model, in the order the models first appear
+        inserts         = {}
+        added           = []
+        # Primary keys to update with each set of values, and to remove, by model
+        replaced_pks    = {}
+        removed_pks     = {}
+        # Replaces and removes of the rows matching a filter
+        filtered        = []
+        # Rows to upsert for each model, and the patches they came from
+        upserts         = {}
+        for index, patch in enumerate(patches):
+            if 'op' not in patch or patch['op'] not in ['add', 'upsert', 'replace', 'remove']:
+                raise falcon.errors.HTTPBadRequest('Invalid patch', 'Patch {0} is not valid'.format(index))
+            if patch['op'] not in allowed_ops:
+                raise falcon.errors.HTTPBadRequest('Invalid patch', 'Patch {0} is not valid'.format(index))
+            if 'path' not in patch or patch['path'] not in patch_paths:
+                raise falcon.errors.HTTPBadRequest('Invalid patch', 'Patch {0} is not valid for op {1}'.format(index, patch['op']))
+            model = patch_paths[patch['path']]
+            # Only rows the resource filters can be changed or removed
+            if patch['op'] != 'add' and not self._patch_filtered(model):
+                raise falcon.errors.HTTPBadRequest('Invalid patch', 'Patch {0} is not valid for op {1}'.format(index, patch['op']))
+
+            if patch['op'] == 'remove':
+                conditions, pks = self._patch_target(index, patch, model)
+                if pks is not None:
+                    removed_pks.setdefault(model, []).extend(pks)
+                else:
+                    filtered.append(('remove', model, conditions, None))
+                continue
+
+            try:
+                patch_value = patch['value']
+            except KeyError:
+                raise falcon.errors.HTTPBadRequest('Invalid patch', 'Patch {0} is not valid for op {1}'.format(index, patch['op']))
+            parsers = self.deserializer(model)
+            columns = get_metadata(model).columns
+            values  = {}
+            for key, value in patch_value.items():
+                # Rows are written without the ORM, so properties can't be set
+                if key not in columns:
+                    raise falcon.errors.HTTPBadRequest('Invalid patch', 'Patch {0} is not valid for op {1}'.format(index, patch['op']))
+                parse = parsers[key]
+                values[key] = parse(value) if parse is not None and value is not None else value
+
+            if patch['op'] == 'add':
+                if model not in inserts:
+                    inserts[model] = (self._path_attributes(model, kwargs), [])
+                path_attributes, rows = inserts[model]
+                row = dict(path_attributes)
+                row.update(values)
+                rows.append(row)
+                added.append((model, row))
+            elif patch['op'] == 'upsert':
+                row = self._path_attributes(model, kwargs)
+                row.update(values)
+                if any(key not in row for key in self.upsert_target(model)):
+                    raise falcon.errors.HTTPBadRequest('Invalid patch', 'Patch {0} is not valid for op {1}'.format(index, patch['op']))
+                rows, indexes = upserts.setdefault(model, ([], []))
+                rows.append(row)
+                indexes.append(index)
+            else:
+                # Replaces can't move rows to other keys or out of the URL arguments
+                fixed = set(get_metadata(model).primary_key) | set(self._path_attributes(model, kwargs))
+                if len(values) == 0 or any(key in fixed for key in values):
+                    raise falcon.errors.HTTPBadRequest('Invalid patch', 'Patch {0} is not valid for op {1}'.format(index, patch['op']))
+                conditions, pks = self._patch_target(index, patch, model)
+                if pks is not None:
+                    # Group by the values set, in a form that can be a key
+                    group = (model, json.dumps(patch_value, sort_keys=True))
+                    replaced_pks.setdefault(group, (values, []))[1].extend(pks)
+                else:
+                    filtered.append(('replace', model, conditions, values))
 
+        return_pks = getattr(self, 'patch_return_pks', False)
+        with self.request_session(req) as db_session:
+            removing = False
             try:
+                for model, (_, rows) in inserts.items():
+                    self.bulk_insert(db_session, model, rows, return_pks)
+                upserted = []
+                for model, (rows, indexes) in upserts.items():
+                    metadata    = get_metadata(model)
+                    self.check_upsert_targets(req, resp, db_session, model, rows, self.upsert_target(model), args, kwargs)
+                    results     = upsert(db_session, model, rows, self.upsert_target(model), metadata.primary_key, getattr(self, 'patch_chunk_size', 500))
+                    for index, (pk, inserted) in zip(indexes, results):
+                        upserted.append((index, {
+                            'pk':       metadata.row_pk(pk),
+                            'type':     metadata.tablename,
+                            'upserted': 'inserted' if inserted else 'updated',
+                        }))
+                for (model, _), (values, pks) in replaced_pks.items():
+                    for conditions in self._patch_chunks(model, pks):
+                        self._patch_query(req, resp, db_session, model, conditions, args, kwargs).update(values, synchronize_session=False)
+                for op, model, conditions, values in filtered:
+                    if op == 'replace':
+                        self._patch_query(req, resp, db_session, model, conditions, args, kwargs).update(values, synchronize_session=False)
+                # Integrity errors from here on come from rows linked to
+                # those being removed
+                removing = True
+                for model, pks in removed_pks.items():
+                    for conditions in self._patch_chunks(model, pks):
+                        self.bulk_remove(req, resp, self._patch_query(req, resp, db_session, model, conditions, args, kwargs), *args, **kwargs)
+                for op, model, conditions, values in filtered:
+                    if op == 'remove':
+                        self.bulk_remove(req, resp, self._patch_query(req, resp, db_session, model, conditions, args, kwargs), *args, **kwargs)
                 db_session.commit()
             except sqlalchemy.exc.IntegrityError as err:
+                db_session.rollback()
+                if removing:
+                    raise falcon.errors.HTTPConflict('Conflict', 'Other content links to this')
                 # Cases such as unallowed NULL value should have been checked
                 # before we got here (e.g. validate against schema
                 # using the middleware) - therefore assume this is a UNIQUE
                 # constraint violation
-                db_session.rollback()
                 raise falcon.errors.HTTPConflict('Conflict', 'Unique constraint violated')
             except sqlalchemy.exc.ProgrammingError as err:
                 db_session.rollback()
                 if err.orig.args[1] == '23505':
                     raise falcon.errors.HTTPConflict('Conflict', 'Unique constraint violated')
+                elif err.orig.args[1] == '23503':
+                    raise falcon.errors.HTTPConflict('Conflict', 'Other content links to this')
                 else:
                     raise
             except:
@@ -549,89 +1348,39 @@ class CollectionResource(BaseResource):
 
         resp.status = falcon.HTTP_OK
         req.context['result'] = {}
+        if return_pks or upserted:
+            # Upserted rows are always reported, as the client can't tell
+            # whether each was inserted or updated otherwise
+            req.context['result']['data'] = [
+                {
+                    'pk':   get_metadata(model).attributes_pk(row),
+                    'type': get_metadata(model).tablename,
+                }
+                for model, row in added
+            ] if return_pks else []
+            req.context['result']['data'].extend(entry for _, entry in sorted(upserted, key=lambda item: item[0]))
 
-        after_patch = getattr(self, 'after_patch', None)
+        after_patch = dispatch.after
         if after_patch is not None:
             after_patch(req, resp, *args, **kwargs)
 
 
+# CollectionResource methods that build the collection query.  Resources
+# overriding any of them do not use the statement cache.
+_QUERY_HOOKS = ['get_filter', 'apply_arg_filter', 'filter_by_params', 'load_only_fields', 'load_included']
+
+
 class SingleResource(BaseResource):
     """
     Provides CRUD facilities for a single resource.
     """
+    default_methods = ['GET', 'PUT', 'PATCH', 'DELETE']
+
     def deserialize(self, data, allow_recursion=False, model=None):
         if model is None:
             model = self.model
-        mapper          = inspect(model)
-        attributes      = {}
-        naive_datetimes = getattr(self, 'naive_datetimes', [])
-
-        deserialized = [attributes, {}]
-
-        for key, value in data.items():
-            # Explicitly allow deserialization of an PK (primary key) field
-            if key == "pk":
-                attributes[key] = value
-                continue
-            if isinstance(getattr(self.model, key, None), property):
-                # Value is set using a function, so we cannot tell what type it will be
-                attributes[key] = value
-                continue
-            try:
-                column = mapper.columns[key]
-            except KeyError:
-                if not allow_recursion:
-                    # Assume programmer has done their job of filtering out invalid
-                    # columns, and that they are going to use this field for some
-                    # custom purpose
-                    continue
-                try:
-                    relationship = mapper.relationships[key]
-                    if relationship.uselist:
-                        for entity in value:
-                            deserialized[1][key] = [self.deserialize(entity, False, relationship.mapper.entity)[0] for entity in value]
-                    else:
-                        deserialized[1][key] = self.deserialize(value, False, relationship.mapper.entity)[0]
-                    continue
-                except KeyError:
-                    # Assume programmer has done their job of filtering out invalid
-                    # columns, and that they are going to use this field for some
-                    # custom purpose
-                    continue
-            if isinstance(column.type, sqlalchemy.sql.sqltypes.DateTime):
-                if value is None:
-                    attributes[key] = None
-                elif key in naive_datetimes:
-                    attributes[key] = datetime.strptime(value, '%Y-%m-%dT%H:%M:%S')
-                else:
-                    attributes[key] = datetime.strptime(value, '%Y-%m-%dT%H:%M:%SZ')
-            elif isinstance(column.type, sqlalchemy.sql.sqltypes.Date):
-                attributes[key] = datetime.strptime(value, '%Y-%m-%d').date() if value is not None else None
-            elif isinstance(column.type, sqlalchemy.sql.sqltypes.Time):
-                if value is not None:
-                    hour, minute, second = value.split(':')
-                    attributes[key] = time(int(hour), int(minute), int(second))
-                else:
-                    attributes[key] = None
-            elif support_geo and isinstance(column.type, Geometry) and column.type.geometry_type == 'POINT':
-                axes    = getattr(self, 'geometry_axes', {}).get(key, ['x', 'y'])
-                point   = Point(value[axes[0]], value[axes[1]])
-                # geoalchemy2.shape.from_shape uses buffer() which causes INSERT to fail
-                attributes[key] = WKBElement(point.wkb, srid=4326)
-            elif support_geo and isinstance(column.type, Geometry) and column.type.geometry_type == 'LINESTRING':
-                axes    = getattr(self, 'geometry_axes', {}).get(key, ['x', 'y'])
-                line    = LineString([point[axes[0]], point[axes[1]]] for point in value)
-                # geoalchemy2.shape.from_shape uses buffer() which causes INSERT to fail
-                attributes[key] = WKBElement(line.wkb, srid=4326)
-            elif support_geo and isinstance(column.type, Geometry) and column.type.geometry_type == 'POLYGON':
-                axes    = getattr(self, 'geometry_axes', {}).get(key, ['x', 'y'])
-                polygon = Polygon([point[axes[0]], point[axes[1]]] for point in value)
-                # geoalchemy2.shape.from_shape uses buffer() which causes INSERT to fail
-                attributes[key] = WKBElement(polygon.wkb, srid=4326)
-            else:
-                attributes[key] = value
-
-        return deserialized
+        # Explicitly allow deserialization of an PK (primary key) field
+        return self.deserialize_body(model, data, allow_recursion, passthrough=('pk',))
 
     def get_filter(self, req, resp, query, *args, **kwargs):
         return query
@@ -642,14 +1391,37 @@ class SingleResource(BaseResource):
         """
         Return a single item.
         """
-        if 'GET' not in getattr(self, 'methods', ['GET', 'PUT', 'PATCH', 'DELETE']):
-            raise falcon.errors.HTTPMethodNotAllowed(getattr(self, 'methods', ['GET', 'PUT', 'PATCH', 'DELETE']))
+        dispatch = get_dispatch(self, 'GET')
+        if not dispatch.allowed:
+            raise falcon.errors.HTTPMethodNotAllowed(dispatch.methods)
 
-        with session_scope(self.db_engine, sessionmaker_=self.sessionmaker, **self.sessionmaker_kwargs) as db_session:
+        with self.request_session(req) as db_session:
             resources = self.apply_arg_filter(req, resp, db_session.query(self.model), kwargs)
 
             resources = self.get_filter(req, resp, resources, *args, **kwargs)
 
+            response_fields = self.response_fields_for(req)
+            if self.use_core_reads(req):
+                keys, serialize = self.row_serializer(self.model, response_fields, getattr(self, 'geometry_axes', {}), native_types(req))
+                rows = self.select_rows(db_session, resources.limit(2), keys).fetchall()
+                if len(rows) == 0:
+                    raise falcon.errors.HTTPNotFound()
+                elif len(rows) > 1:
+                    self.logger.error('Programming error: multiple results found for get of model {0}'.format(self.model))
+                    raise falcon.errors.HTTPInternalServerError('Internal Server Error', 'An internal server error occurred')
+                resp.status = falcon.HTTP_OK
+                req.context['result'] = {
+                    'data': {
+                        'pk':           get_metadata(self.model).row_pk(rows[0]),
+                        'type':         get_metadata(self.model).tablename,
+                        'attributes':   serialize(rows[0]),
+                    }
+                }
+                return
+
+            resources = self.load_only_fields(resources, response_fields)
+            resources = self.load_included(req, resources)
+
             try:
                 resource = resources.one()
             except sqlalchemy.orm.exc.NoResultFound:
@@ -659,18 +1431,18 @@ class SingleResource(BaseResource):
                 raise falcon.errors.HTTPInternalServerError('Internal Server Error', 'An internal server error occurred')
 
             resp.status = falcon.HTTP_OK
-            primary_key = identify_pk(resource.__class__)
+            metadata = get_metadata(resource.__class__)
             result = {
                 'data': {
-                    'pk':           getattr(resource, primary_key),
-                    'type':         resource.__tablename__,
-                    'attributes':   self.serialize(resource, getattr(self, 'response_fields', None), getattr(self, 'geometry_axes', {})),
+                    'pk':           metadata.pk(resource),
+                    'type':         metadata.tablename,
+                    'attributes':   self.serialize(resource, response_fields, getattr(self, 'geometry_axes', {}), native_types(req)),
                 }
             }
             add_included(self, req, resource, result['data'])
             req.context['result'] = result
 
-            after_get = getattr(self, 'after_get', None)
+            after_get = dispatch.after
             if after_get is not None:
                 after_get(req, resp, resource, *args, **kwargs)
 
@@ -683,12 +1455,29 @@ class SingleResource(BaseResource):
         """
         Delete a single item.
         """
-        if 'DELETE' not in getattr(self, 'methods', ['GET', 'PUT', 'PATCH', 'DELETE']):
-            raise falcon.errors.HTTPMethodNotAllowed(getattr(self, 'methods', ['GET', 'PUT', 'PATCH', 'DELETE']))
+        dispatch = get_dispatch(self, 'DELETE')
+        if not dispatch.allowed:
+            raise falcon.errors.HTTPMethodNotAllowed(dispatch.methods)
 
-        with session_scope(self.db_engine, sessionmaker_=self.sessionmaker, **self.sessionmaker_kwargs) as db_session:
+        with self.request_session(req) as db_session:
             resources = self.apply_arg_filter(req, resp, db_session.query(self.model), kwargs)
 
+            query = self.delete_precondition(
+                req, resp,
+                self.filter_by_params(resources, req.params),
+                *args, **kwargs
+            )
+
+            if self.use_delete_statement(db_session, query):
+                mark_deleted_values = dispatch.mark_deleted_values
+                if mark_deleted_values is not None:
+                    statement = sqlalchemy.update(self.model).values(mark_deleted_values(req, resp, *args, **kwargs))
+                else:
+                    statement = sqlalchemy.delete(self.model)
+                # As far we I know, an IntegrityError should only be caused by
+                # a foreign key constraint being violated
+                return self._execute_returning(req, resp, db_session, resources, statement.where(query.whereclause), 'delete', 'Other content links to this', '23503')
+
             try:
                 resource = resources.one()
             except sqlalchemy.orm.exc.NoResultFound:
@@ -697,11 +1486,7 @@ class SingleResource(BaseResource):
                 self.logger.error('Programming error: multiple results found for patch of model {0}'.format(self.model))
                 raise falcon.errors.HTTPInternalServerError('Internal Server Error', 'An internal server error occurred')
 
-            resources = self.delete_precondition(
-                req, resp,
-                self.filter_by_params(resources, req.params),
-                *args, **kwargs
-            )
+            resources = query
 
             try:
                 resource = resources.one()
@@ -712,13 +1497,19 @@ class SingleResource(BaseResource):
                 raise falcon.errors.HTTPInternalServerError('Internal Server Error', 'An internal server error occurred')
 
             try:
-                mark_deleted = getattr(self, 'mark_deleted', None)
-                if mark_deleted is not None:
+                mark_deleted_values = dispatch.mark_deleted_values
+                mark_deleted        = dispatch.mark_deleted
+                if mark_deleted_values is not None:
+                    update_resource(resource, mark_deleted_values(req, resp, *args, **kwargs))
+                    db_session.flush()
+                elif mark_deleted is not None:
                     mark_deleted(req, resp, resource, *args, **kwargs)
                     db_session.add(resource)
+                    db_session.flush()
                 else:
                     make_transient(resource)
                     resources.delete()
+                data = self.serialize(resource, getattr(self, 'response_fields', None), getattr(self, 'geometry_axes', {}), native_types(req))
                 db_session.commit()
             except sqlalchemy.exc.IntegrityError as err:
                 # As far we I know, this should only be caused by foreign key constraint being violated
@@ -733,10 +1524,10 @@ class SingleResource(BaseResource):
 
             resp.status = falcon.HTTP_OK
             req.context['result'] = {
-                'data': self.serialize(resource, getattr(self, 'response_fields', None), getattr(self, 'geometry_axes', {})),
+                'data': data,
             }
 
-            after_delete = getattr(self, 'after_delete', None)
+            after_delete = dispatch.after
             if after_delete is not None:
                 after_delete(req, resp, resource, *args, **kwargs)
 
@@ -747,10 +1538,11 @@ class SingleResource(BaseResource):
         """
         Update an item in the collection.
         """
-        if 'PUT' not in getattr(self, 'methods', ['GET', 'PUT', 'PATCH', 'DELETE']):
-            raise falcon.errors.HTTPMethodNotAllowed(getattr(self, 'methods', ['GET', 'PUT', 'PATCH', 'DELETE']))
+        dispatch = get_dispatch(self, 'PUT')
+        if not dispatch.allowed:
+            raise falcon.errors.HTTPMethodNotAllowed(dispatch.methods)
 
-        with session_scope(self.db_engine, sessionmaker_=self.sessionmaker, **self.sessionmaker_kwargs) as db_session:
+        with self.request_session(req) as db_session:
             resources = self.apply_arg_filter(req, resp, db_session.query(self.model), kwargs)
 
             try:
@@ -761,7 +1553,7 @@ class SingleResource(BaseResource):
                 self.logger.error('Programming error: multiple results found for put of model {0}'.format(self.model))
                 raise falcon.errors.HTTPInternalServerError('Internal Server Error', 'An internal server error occurred')
 
-            attributes = self.deserialize(req.context['doc'])
+            attributes, _ = self.deserialize(req.context['doc'])
 
             self.apply_default_attributes('put_defaults', req, resp, attributes)
 
@@ -770,6 +1562,10 @@ class SingleResource(BaseResource):
 
             db_session.add(resource)
             try:
+                db_session.flush()
+                # Serialize before committing, so that committing does not
+                # expire the instance and reload it
+                data = self.serialize(resource, getattr(self, 'response_fields', None), getattr(self, 'geometry_axes', {}), native_types(req))
                 db_session.commit()
             except sqlalchemy.exc.IntegrityError as err:
                 # Cases such as unallowed NULL value should have been checked
@@ -790,10 +1586,10 @@ class SingleResource(BaseResource):
 
             resp.status = falcon.HTTP_OK
             req.context['result'] = {
-                'data': self.serialize(resource, getattr(self, 'response_fields', None), getattr(self, 'geometry_axes', {})),
+                'data': data,
             }
 
-            after_put = getattr(self, 'after_put', None)
+            after_put = dispatch.after
             if after_put is not None:
                 after_put(req, resp, resource, *args, **kwargs)
 
@@ -803,18 +1599,146 @@ class SingleResource(BaseResource):
     def modify_patch(self, req, resp, resource, *args, **kwargs):
         pass
 
+    def use_patch_statement(self, db_session, query, attributes, linked):
+        """
+        Whether a PATCH can be done as one UPDATE ... RETURNING, rather than
+        by loading the item, setting its attributes and flushing it.  Hooks
+        given the instance, subresources, attributes set through properties,
+        and inherited or versioned models need the ORM, as do models with
+        validators or update events, which the statement would skip.
+        """
+        columns = get_metadata(self.model).columns
+        return (
+            getattr(self, 'patch_statement', True)
+            and attributes
+            and not linked
+            and all(key in columns for key in attributes)
+            and get_dispatch(self, 'PATCH').before is None
+            and get_dispatch(self, 'PATCH').after is None
+            and type(self).modify_patch is SingleResource.modify_patch
+            and self._single_table_statement(db_session, query, 'update')
+        )
+
+    def use_delete_statement(self, db_session, query):
+        """
+        Whether a DELETE can be done as one DELETE ... RETURNING, or, for
+        resources with mark_deleted_values, one UPDATE ... RETURNING.  A
+        mark_deleted or after_delete method needs the instance.
+        """
+        dispatch = get_dispatch(self, 'DELETE')
+        if dispatch.mark_deleted_values is not None:
+            kind = 'update'
+        elif dispatch.mark_deleted is None:
+            kind = 'delete'
+        else:
+            return False
+        return (
+            getattr(self, 'delete_statement', True)
+            and dispatch.after is None
+            and self._single_table_statement(db_session, query, kind)
+        )
+
+    def _single_table_statement(self, db_session, query, kind):
+        """
+        Whether `query` can become the WHERE clause of a `kind` statement
+        with RETURNING for the model's table alone, and the model has no
+        validators or mapper events for `kind` that the ORM would run.
+        """
+        mapper = get_metadata(self.model).mapper
+        if kind == 'update':
+            orm_only = mapper.validators or mapper.dispatch.before_update or mapper.dispatch.after_update
+        else:
+            orm_only = mapper.dispatch.before_delete or mapper.dispatch.after_delete
+        return (
+            not orm_only
+            and mapper.inherits is None
+            and mapper.polymorphic_on is None
+            and mapper.version_id_col is None
+            and supports_returning(db_session.get_bind().dialect, kind)
+            and query.whereclause is not None
+            and query.statement.get_final_froms() == [mapper.local_table]
+        )
+
+    def _execute_returning(self, req, resp, db_session, resources, statement, method, conflict_description, conflict_code):
+        """
+        Execute an UPDATE or DELETE `statement` of the single item, returning
+        the columns to serialize, and respond with that row.  Only if nothing
+        matched is the item looked up again, to tell a missing item from
+        failed preconditions.
+        """
+        keys, serialize = self.row_serializer(self.model, getattr(self, 'response_fields', None), getattr(self, 'geometry_axes', {}), native_types(req))
+        statement = (
+            statement
+            .returning(*[getattr(self.model, key) for key in keys])
+            .execution_options(synchronize_session=False)
+        )
+        try:
+            rows = db_session.execute(statement).fetchall()
+            if len(rows) == 1:
+                db_session.commit()
+        except sqlalchemy.exc.IntegrityError as err:
+            db_session.rollback()
+            raise falcon.errors.HTTPConflict('Conflict', conflict_description)
+        except sqlalchemy.exc.ProgrammingError as err:
+            db_session.rollback()
+            if err.orig.args[1] == conflict_code:
+                raise falcon.errors.HTTPConflict('Conflict', conflict_description)
+            else:
+                raise
+        except:
+            db_session.rollback()
+            raise
+
+        if len(rows) == 0:
+            db_session.rollback()
+            if db_session.query(resources.exists()).scalar():
+                raise falcon.errors.HTTPConflict('Conflict', 'Resource found but conditions violated')
+            raise falcon.errors.HTTPNotFound()
+        elif len(rows) > 1:
+            db_session.rollback()
+            self.logger.error('Programming error: multiple results found for {0} of model {1}'.format(method, self.model))
+            raise falcon.errors.HTTPInternalServerError('Internal Server Error', 'An internal server error occurred')
+
+        resp.status = falcon.HTTP_OK
+        req.context['result'] = {
+            'data': serialize(rows[0]),
+        }
+
     @falcon.before(identify)
     @falcon.before(authorize)
     def on_patch(self, req, resp, *args, **kwargs):
         """
         Update part of an item in the collection.
         """
-        if 'PATCH' not in getattr(self, 'methods', ['GET', 'PUT', 'PATCH', 'DELETE']):
-            raise falcon.errors.HTTPMethodNotAllowed(getattr(self, 'methods', ['GET', 'PUT', 'PATCH', 'DELETE']))
+        dispatch = get_dispatch(self, 'PATCH')
+        if not dispatch.allowed:
+            raise falcon.errors.HTTPMethodNotAllowed(dispatch.methods)
 
-        with session_scope(self.db_engine, sessionmaker_=self.sessionmaker, **self.sessionmaker_kwargs) as db_session:
+        with self.request_session(req) as db_session:
             resources = self.apply_arg_filter(req, resp, db_session.query(self.model), kwargs)
 
+            attributes, linked = self.deserialize(req.context['doc'], allow_recursion=getattr(self, 'allow_subresources', True))
+
+            self.apply_default_attributes('patch_defaults', req, resp, attributes)
+
+            query = self.patch_precondition(
+                req, resp,
+                self.filter_by_params(resources, req.params),
+                *args, **kwargs
+            )
+
+            if self.use_patch_statement(db_session, query, attributes, linked):
+                statement = (
+                    sqlalchemy.update(self.model)
+                    .where(query.whereclause)
+                    .values(dict((getattr(self.model, key), value) for key, value in attributes.items()))
+                )
+                # Cases such as unallowed NULL value should have been checked
+                # before we got here (e.g. validate against schema using the
+                # middleware) - therefore assume an IntegrityError is a UNIQUE
+                # constraint violation
+                return self._execute_returning(req, resp, db_session, resources, statement, 'patch', 'Unique constraint violated', '23505')
+
             try:
                 resource = resources.one()
             except sqlalchemy.orm.exc.NoResultFound:
@@ -823,58 +1747,71 @@ class SingleResource(BaseResource):
                 self.logger.error('Programming error: multiple results found for patch of model {0}'.format(self.model))
                 raise falcon.errors.HTTPInternalServerError('Internal Server Error', 'An internal server error occurred')
 
-            resources = self.patch_precondition(
-                req, resp,
-                self.filter_by_params(resources, req.params),
-                *args, **kwargs
-            )
-
             try:
-                resource = resources.one()
+                resource = query.one()
             except sqlalchemy.orm.exc.NoResultFound:
                 raise falcon.errors.HTTPConflict('Conflict', 'Resource found but conditions violated')
 
-            attributes, linked = self.deserialize(req.context['doc'], allow_recursion=getattr(self, 'allow_subresources', True))
-
-            self.apply_default_attributes('patch_defaults', req, resp, attributes)
-
             update_resource(resource, attributes)
 
             self.modify_patch(req, resp, resource, *args, **kwargs)
 
-            before_patch = getattr(self, 'before_patch', None)
+            before_patch = dispatch.before
             if before_patch is not None:
-                self.before_patch(req, resp, db_session, resource, *args, **kwargs)
+                before_patch(req, resp, db_session, resource, *args, **kwargs)
 
             db_session.add(resource)
             # Patch related
-            mapper = inspect(self.model)
+            relationships = get_metadata(self.model).relationships
             # Store updated subresources to return in the response
             updated_subresources = {}
             for key, value in linked.items():
-                relationship = mapper.relationships[key]
+                relationship = relationships[key]
                 resource_class = relationship.mapper.entity
-                subresource_pk = identify_pk(resource_class)
+                submetadata = get_metadata(resource_class)
                 if relationship.uselist:
-                    subresources = getattr(resource, key)
-                    subresources_pks = [getattr(sr, subresource_pk) for sr in subresources]
+                    lookup_pks = [get_pk(attributes, submetadata) for attributes in value]
+                    # Load only the related resources being changed, rather
+                    # than the whole collection
+                    with db_session.no_autoflush:
+                        subresources = dict(
+                            (submetadata.pk_key(subresource), subresource)
+                            for subresource in db_session.query(resource_class).filter(
+                                with_parent(resource, getattr(self.model, key)),
+                                submetadata.pk_condition(set(lookup_pks)),
+                            )
+                        )
+                    missing = [lookup_pk for lookup_pk in lookup_pks if lookup_pk not in subresources]
+                    if missing:
+                        raise falcon.errors.HTTPBadRequest('Invalid request', 'Primary keys {0} not found in related resources.'.format(', '.join(str(lookup_pk) for lookup_pk in missing)))
                     updated_subresources[key] = []
-                    for attributes in value:
-                        lookup_pk = get_pk(attributes)
-                        if lookup_pk not in subresources_pks:
-                            raise falcon.errors.HTTPBadRequest('Invalid request', 'Primary key not found in related resources.')
+                    for lookup_pk, attributes in zip(lookup_pks, value):
+                        subresource = subresources[lookup_pk]
                         update_resource(subresource, attributes)
                         updated_subresources[key].append(subresource)
                 else:
                     subresource = getattr(resource, key)
                     if subresource is None:
                         raise falcon.errors.HTTPBadRequest('Invalid request', 'Related resource does not exist.')
-                    lookup_pk = get_pk(value)
-                    if lookup_pk != getattr(subresource, subresource_pk):
+                    lookup_pk = get_pk(value, submetadata)
+                    if lookup_pk != submetadata.pk_key(subresource):
                         raise falcon.errors.HTTPBadRequest('Invalid request', 'Primary key does not match related resource.')
                     update_resource(subresource, value)
                     updated_subresources[key] = subresource
             try:
+                db_session.flush()
+                # Serialize before committing, so that committing does not
+                # expire the instances and reload each one
+                data = self.serialize(resource, getattr(self, 'response_fields', None), getattr(self, 'geometry_axes', {}), native_types(req))
+                for key, value in updated_subresources.items():
+                    if isinstance(value, list):
+                        data[key] = [
+                            self.serialize(subresource, getattr(self, 'response_fields', None), getattr(self, 'geometry_axes', {}), native_types(req))
+                            for subresource in
+                            value
+                        ]
+                    else:
+                        data[key] = self.serialize(value, getattr(self, 'response_fields', None), getattr(self, 'geometry_axes', {}), native_types(req))
                 db_session.commit()
             except sqlalchemy.exc.IntegrityError as err:
                 # Cases such as unallowed NULL value should have been checked
@@ -895,18 +1832,9 @@ class SingleResource(BaseResource):
 
             resp.status = falcon.HTTP_OK
             req.context['result'] = {
-                'data': self.serialize(resource, getattr(self, 'response_fields', None), getattr(self, 'geometry_axes', {})),
+                'data': data,
             }
-            for key, value in updated_subresources.items():
-                if isinstance(value, list):
-                    req.context['result']['data'][key] = [
-                        self.serialize(resource, getattr(self, 'response_fields', None), getattr(self, 'geometry_axes', {}))
-                        for resource in
-                        value
-                    ]
-                else:
-                    req.context['result']['data'][key] = self.serialize(value, getattr(self, 'response_fields', None), getattr(self, 'geometry_axes', {}))
 
-            after_patch = getattr(self, 'after_patch', None)
+            after_patch = dispatch.after
             if after_patch is not None:
                 after_patch(req, resp, resource, *args, **kwargs)
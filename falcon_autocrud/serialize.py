@@ -0,0 +1,204 @@
+from datetime import date, datetime, time
+from decimal import Decimal
+from operator import attrgetter, itemgetter
+import sqlalchemy.sql.sqltypes
+import sqlalchemy.types
+import uuid
+
+from .metadata import get_metadata
+
+
+class UnsupportedGeometryType(Exception):
+    pass
+
+try:
+    import geoalchemy2.shape
+    from geoalchemy2.elements import WKBElement
+    from geoalchemy2.types import Geometry
+    from shapely.geometry import Point, LineString, Polygon
+    support_geo = True
+except ImportError:
+    support_geo = False
+
+
+# Column types whose python values are already JSON-friendly
+_PASSTHROUGH_TYPES = (
+    sqlalchemy.sql.sqltypes.String,
+    sqlalchemy.sql.sqltypes.Integer,
+    sqlalchemy.sql.sqltypes.Boolean,
+)
+
+_serializers        = {}
+_row_serializers    = {}
+
+
+def _serialize_geometry(value, axes):
+    value = geoalchemy2.shape.to_shape(value)
+    if isinstance(value, Point):
+        return {axes[0]: value.x, axes[1]: value.y}
+    elif isinstance(value, LineString):
+        return [
+            {axes[0]: point[0], axes[1]: point[1]}
+            for point in list(value.coords)
+        ]
+    elif isinstance(value, Polygon):
+        return [
+            {axes[0]: point[0], axes[1]: point[1]}
+            for point in list(value.boundary.coords)
+        ]
+    else:
+        raise UnsupportedGeometryType('Unsupported geometry type {0}'.format(value.geometryType()))
+
+
+def serialize_value(name, value, geometry_axes=None, naive_datetimes=(), native_types=()):
+    """
+    Serialize a single value by inspecting its python type.
+
+    This is the slow path, used for columns whose type does not tell us what
+    kind of value will come back from the database.  Values of types in
+    `native_types` are left for the JSON encoder.
+    """
+    if isinstance(value, uuid.UUID):
+        return value if uuid.UUID in native_types else value.hex
+    if isinstance(value, datetime):
+        if name in naive_datetimes:
+            return value.strftime('%Y-%m-%dT%H:%M:%S')
+        elif datetime in native_types and value.tzinfo is None:
+            return value
+        else:
+            return value.strftime('%Y-%m-%dT%H:%M:%SZ')
+    elif isinstance(value, date):
+        return value.strftime('%Y-%m-%d')
+    elif isinstance(value, time):
+        return value.isoformat()
+    elif isinstance(value, Decimal):
+        return value if Decimal in native_types else float(value)
+    elif support_geo and isinstance(value, WKBElement):
+        return _serialize_geometry(value, (geometry_axes or {}).get(name, ['x', 'y']))
+    else:
+        return value
+
+
+def _value_converter(name, column_type, geometry_axes, naive_datetimes, native_types):
+    """
+    Pick the function used to convert values of a column, or None if values
+    can be passed through untouched.  Converters are never called with None.
+    """
+    if isinstance(column_type, sqlalchemy.types.TypeDecorator):
+        # The decorator may return anything, so check each value
+        pass
+    elif isinstance(column_type, sqlalchemy.sql.sqltypes.DateTime):
+        if name in naive_datetimes:
+            return lambda value: value.strftime('%Y-%m-%dT%H:%M:%S')
+        if datetime in native_types and not column_type.timezone:
+            return None
+        return lambda value: value.strftime('%Y-%m-%dT%H:%M:%SZ')
+    elif isinstance(column_type, sqlalchemy.sql.sqltypes.Date):
+        return lambda value: value.strftime('%Y-%m-%d')
+    elif isinstance(column_type, sqlalchemy.sql.sqltypes.Time):
+        return time.isoformat
+    elif isinstance(column_type, sqlalchemy.sql.sqltypes.Float) and not column_type.asdecimal:
+        return None
+    elif isinstance(column_type, sqlalchemy.sql.sqltypes.Numeric):
+        return None if Decimal in native_types else float
+    elif isinstance(column_type, _PASSTHROUGH_TYPES):
+        return None
+    elif support_geo and isinstance(column_type, Geometry):
+        axes = (geometry_axes or {}).get(name, ['x', 'y'])
+        return lambda value: _serialize_geometry(value, axes)
+    return lambda value: serialize_value(name, value, geometry_axes, naive_datetimes, native_types)
+
+
+def compile_plan(model, response_fields=None, geometry_axes=None, naive_datetimes=(), native_types=()):
+    """
+    Work out the (key, converter) pairs needed to serialize instances of
+    `model`.  Fields that are not columns are skipped.
+    """
+    column_types = get_metadata(model).column_types
+    if response_fields is None:
+        response_fields = column_types.keys()
+    return [
+        (key, _value_converter(key, column_types[key], geometry_axes, naive_datetimes, native_types))
+        for key in response_fields
+        if key in column_types
+    ]
+
+
+def compile_serializer(model, response_fields=None, geometry_axes=None, naive_datetimes=(), native_types=()):
+    """
+    Build a function that serializes an instance of `model` to a dictionary.
+    """
+    plan = [
+        (key, attrgetter(key), converter)
+        for key, converter in compile_plan(model, response_fields, geometry_axes, naive_datetimes, native_types)
+    ]
+    def serialize(resource):
+        data = {}
+        for key, getter, converter in plan:
+            value = getter(resource)
+            if converter is not None and value is not None:
+                value = converter(value)
+            data[key] = value
+        return data
+    return serialize
+
+
+def compile_row_serializer(model, response_fields=None, geometry_axes=None, naive_datetimes=(), native_types=()):
+    """
+    Build a function that serializes a row of selected columns, rather than
+    an instance, to a dictionary.
+
+    Returns the keys of the attributes to select, primary key first, and the
+    function, which expects rows with the columns in that order.
+    """
+    keys    = list(get_metadata(model).primary_key)
+    plan    = []
+    for key, converter in compile_plan(model, response_fields, geometry_axes, naive_datetimes, native_types):
+        if key not in keys:
+            keys.append(key)
+        plan.append((key, itemgetter(keys.index(key)), converter))
+    def serialize(row):
+        data = {}
+        for key, getter, converter in plan:
+            value = getter(row)
+            if converter is not None and value is not None:
+                value = converter(value)
+            data[key] = value
+        return data
+    return keys, serialize
+
+
+def _cache_key(model, response_fields, geometry_axes, naive_datetimes, native_types):
+    return (
+        model,
+        tuple(response_fields) if response_fields is not None else None,
+        tuple(sorted((name, tuple(axes)) for name, axes in (geometry_axes or {}).items())),
+        frozenset(naive_datetimes),
+        frozenset(native_types),
+    )
+
+
+def get_serializer(model, response_fields=None, geometry_axes=None, naive_datetimes=(), native_types=()):
+    """
+    Return the compiled serializer for the given options, compiling it on
+    first use.
+    """
+    key = _cache_key(model, response_fields, geometry_axes, naive_datetimes, native_types)
+    try:
+        return _serializers[key]
+    except KeyError:
+        serializer = _serializers[key] = compile_serializer(model, response_fields, geometry_axes, naive_datetimes, native_types)
+        return serializer
+
+
+def get_row_serializer(model, response_fields=None, geometry_axes=None, naive_datetimes=(), native_types=()):
+    """
+    Return the compiled row serializer for the given options, compiling it on
+    first use.
+    """
+    key = _cache_key(model, response_fields, geometry_axes, naive_datetimes, native_types)
+    try:
+        return _row_serializers[key]
+    except KeyError:
+        serializer = _row_serializers[key] = compile_row_serializer(model, response_fields, geometry_axes, naive_datetimes, native_types)
+        return serializer
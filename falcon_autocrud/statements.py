@@ -0,0 +1,136 @@
+from sqlalchemy import insert, literal_column, select, tuple_, update
+
+from .metadata import get_metadata
+
+
+def supports_returning(dialect, kind):
+    '''Whether `dialect` supports RETURNING for `kind` ('insert', 'update' or 'delete') statements.'''
+    return getattr(dialect, kind + '_returning', getattr(dialect, 'full_returning', False))
+
+
+def _dialect_insert(dialect):
+    '''The INSERT construct with ON CONFLICT support for `dialect`, if it has one.'''
+    if dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+        return postgresql_insert
+    if dialect.name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        return sqlite_insert
+    return None
+
+
+def target_condition(target_columns, targets):
+    '''A condition selecting the rows whose `target_columns` have any of the `targets` values.'''
+    if len(target_columns) == 1:
+        return target_columns[0].in_([target[0] for target in targets])
+    return tuple_(*target_columns).in_(targets)
+
+
+def _chunks(rows, target, chunk_size):
+    '''
+    Split rows into chunks of rows with the same attributes, none of which
+    has the same target values as another in its chunk.
+    '''
+    groups = {}
+    for index, row in enumerate(rows):
+        groups.setdefault(frozenset(row), []).append(index)
+    for indexes in groups.values():
+        chunk   = []
+        seen    = set()
+        for index in indexes:
+            values = tuple(rows[index][key] for key in target)
+            if values in seen or len(chunk) >= chunk_size:
+                yield chunk
+                chunk   = []
+                seen    = set()
+            chunk.append(index)
+            seen.add(values)
+        if chunk:
+            yield chunk
+
+
+def upsert(db_session, model, rows, target, keys, chunk_size=500):
+    """
+    Insert rows of attribute values for `model`, updating the existing rows
+    with the same values of the `target` attributes instead where there are
+    any.  The target attributes must have a unique constraint, and every row
+    must have values for them.
+
+    Returns, for each row in order, the values of the attributes in `keys`
+    as stored, and whether the row was inserted (rather than updated).
+
+    PostgreSQL and SQLite do this with INSERT ... ON CONFLICT DO UPDATE.
+    Other databases are sent an UPDATE for each existing row, and batched
+    INSERTs for the rest.
+    """
+    mapper          = get_metadata(model).mapper
+    table           = mapper.local_table
+    dialect         = db_session.get_bind().dialect
+    dialect_insert  = _dialect_insert(dialect)
+    returning       = supports_returning(dialect, 'insert')
+    connection      = db_session.connection()
+    target_columns  = [mapper.columns[key] for key in target]
+    key_columns     = [mapper.columns[key] for key in keys]
+    results         = [None] * len(rows)
+
+    for chunk in _chunks(rows, target, chunk_size):
+        targets = [tuple(rows[index][key] for key in target) for index in chunk]
+        values  = [
+            dict((mapper.columns[key].key, value) for key, value in rows[index].items())
+            for index in chunk
+        ]
+
+        if dialect.name == 'postgresql':
+            # xmax is zero for a row version that no transaction has replaced,
+            # i.e. one that was just inserted
+            existing = None
+        else:
+            existing = set(
+                tuple(row)
+                for row in connection.execute(select(*target_columns).where(target_condition(target_columns, targets)))
+            )
+
+        if dialect_insert is not None:
+            statement   = dialect_insert(table).values(values)
+            target_keys = set(column.key for column in target_columns)
+            updated     = [
+                column for column in table.columns
+                if column.key in values[0] and column.key not in target_keys
+            ] or target_columns[:1]
+            statement   = statement.on_conflict_do_update(
+                index_elements=target_columns,
+                set_=dict((column.key, statement.excluded[column.key]) for column in updated),
+            )
+            if returning:
+                returned_columns = key_columns + target_columns
+                if existing is None:
+                    returned_columns = returned_columns + [literal_column('xmax = 0')]
+                returned = connection.execute(statement.returning(*returned_columns)).fetchall()
+            else:
+                connection.execute(statement)
+        else:
+            for target_values, row in zip(targets, values):
+                if target_values in existing:
+                    connection.execute(
+                        update(table)
+                        .where(*[column == value for column, value in zip(target_columns, target_values)])
+                        .values(row)
+                    )
+            inserts = [row for target_values, row in zip(targets, values) if target_values not in existing]
+            if inserts:
+                connection.execute(insert(table), inserts)
+
+        if dialect_insert is None or not returning:
+            returned = connection.execute(
+                select(*(key_columns + target_columns)).where(target_condition(target_columns, targets))
+            ).fetchall()
+
+        # Rows may come back in any order, so match them up by target values
+        by_target = {}
+        for row in returned:
+            by_target[tuple(row[len(keys):len(keys) + len(target)])] = row
+        for index, target_values in zip(chunk, targets):
+            row = by_target[target_values]
+            inserted = row[-1] if existing is None else target_values not in existing
+            results[index] = (tuple(row[:len(keys)]), bool(inserted))
+    return results
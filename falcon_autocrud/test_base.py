@@ -1,10 +1,11 @@
+from contextlib import contextmanager
 import falcon
 import falcon.testing
 from .middleware import Middleware
 import json
 from sqlalchemy.orm.session import sessionmaker
 from sqlalchemy import create_engine
-from sqlalchemy.event import listen
+from sqlalchemy.event import listen, remove
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.pool import Pool
 import os
@@ -82,6 +83,20 @@ class BaseTestCase(unittest.TestCase):
     def create_common_fixtures(self):
         pass
 
+    @contextmanager
+    def capture_queries(self):
+        """
+        Collect the SQL statements executed against the test database.
+        """
+        statements = []
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        listen(self.db_engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            remove(self.db_engine, 'before_cursor_execute', before_cursor_execute)
+
     def simulate_request(self, path, *args, **kwargs):
         env = falcon.testing.create_environ(path=path, **kwargs)
         return self.app(env, self.srmock)
@@ -1,5 +1,5 @@
 from .test_base import Base, BaseTestCase
-from .test_fixtures import Account, Company
+from .test_fixtures import Account, Character, Company, Employee
 
 from datetime import datetime
 from falcon.errors import HTTPUnauthorized, HTTPForbidden
@@ -10,21 +10,91 @@ from sqlalchemy import Column, DateTime
 from .resource import CollectionResource, SingleResource
 
 class RootResource(CollectionResource):
-    methods     = ['PATCH']
-    patch_paths = {
+    methods             = ['PATCH']
+    allowed_patch_ops   = ['add', 'remove']
+    patch_paths         = {
         '/accounts':    Account,
         '/companies':   Company,
     }
 
+    def get_patch_filter(self, req, resp, query, model, *args, **kwargs):
+        if model is Company:
+            return query
+        return query.filter(Account.owner != None)
+
+class OpenRootResource(CollectionResource):
+    methods             = ['PATCH']
+    allowed_patch_ops   = ['add', 'remove']
+    patch_paths         = {
+        '/accounts':    Account,
+    }
+
+class CharacterCollectionResource(CollectionResource):
+    model               = Character
+    allowed_patch_ops   = ['add', 'upsert', 'replace']
+
 class AccountCollectionResource(CollectionResource):
     model   = Account
     methods = ['PATCH']
 
 
+class CompanyEmployeeCollectionResource(CollectionResource):
+    model               = Employee
+    methods             = ['PATCH']
+    allowed_patch_ops   = ['add', 'replace']
+    patch_return_pks    = True
+
+
+class AddEmployeeCollectionResource(CollectionResource):
+    model   = Employee
+    methods = ['PATCH']
+
+class EmployeeCollectionResource(CollectionResource):
+    model               = Employee
+    methods             = ['PATCH']
+    allowed_patch_ops   = ['add', 'replace', 'remove']
+
+    def get_filter(self, req, resp, query, *args, **kwargs):
+        # Employees of company 3 are hidden
+        return query.filter((Employee.company_id == None) | (Employee.company_id != 3))
+
+class RetiringEmployeeCollectionResource(CollectionResource):
+    model               = Employee
+    methods             = ['PATCH']
+    allowed_patch_ops   = ['add', 'remove']
+
+    def mark_deleted_values(self, req, resp, *args, **kwargs):
+        return {'left': datetime(2017, 1, 1)}
+
+
 class CollectionPatchTest(BaseTestCase):
     def create_test_resources(self):
         self.app.add_route('/', RootResource(self.db_engine))
+        self.app.add_route('/open', OpenRootResource(self.db_engine))
+        self.app.add_route('/add-employees', AddEmployeeCollectionResource(self.db_engine))
         self.app.add_route('/accounts', AccountCollectionResource(self.db_engine))
+        self.app.add_route('/characters', CharacterCollectionResource(self.db_engine))
+        self.app.add_route('/companies/{company_id}/employees', CompanyEmployeeCollectionResource(self.db_engine))
+        self.app.add_route('/employees', EmployeeCollectionResource(self.db_engine))
+        self.app.add_route('/retiring-employees', RetiringEmployeeCollectionResource(self.db_engine))
+
+    def add_employees(self):
+        for company_id in [1, 2, 3]:
+            self.db_session.add(Company(id=company_id, name='Company {0}'.format(company_id)))
+        for index in range(1, 10):
+            self.db_session.add(Employee(id=index, name='Employee {0}'.format(index), company_id=index % 3 + 1))
+        self.db_session.commit()
+
+    def employees(self):
+        self.db_session.expire_all()
+        return [
+            (employee.id, employee.name, employee.left)
+            for employee in self.db_session.query(Employee).order_by(Employee.id)
+        ]
+
+    def patch(self, path, patches):
+        response, = self.simulate_request(path, method='PATCH', body=json.dumps({'patches': patches}), headers={'Accept': 'application/json', 'Content-Type': 'application/json'})
+        return response
 
     def test_paths_patch(self):
         patches = {
@@ -94,3 +164,165 @@ class CollectionPatchTest(BaseTestCase):
                 {'id': 1, 'name': 'Initech Sales', 'owner': 'Jim'},
             ],
         )
+
+    def test_batched_insert(self):
+        with self.capture_queries() as queries:
+            response = self.patch('/accounts', [
+                {'op': 'add', 'path': '/', 'value': {'id': index, 'name': 'Account {0}'.format(index), 'owner': 'Owner {0}'.format(index)}}
+                for index in range(1, 101)
+            ])
+        self.assertOK(response, {})
+        self.assertEqual(len([query for query in queries if query.startswith('INSERT')]), 1)
+        self.assertEqual(self.db_session.query(Account).count(), 100)
+
+    def test_returned_pks(self):
+        self.db_session.add(Company(id=1, name='Initech'))
+        self.db_session.commit()
+        response = self.patch('/companies/1/employees', [
+            {'op': 'add', 'path': '/', 'value': {'name': 'Jim', 'joined': '2016-10-01T13:00:00Z'}},
+            {'op': 'add', 'path': '/', 'value': {'name': 'Bob', 'joined': None}},
+        ])
+        self.assertOK(response, {
+            'data': [
+                {'pk': 1, 'type': 'employees'},
+                {'pk': 2, 'type': 'employees'},
+            ],
+        })
+        employees = self.db_session.query(Employee).order_by(Employee.id).all()
+        self.assertEqual(
+            [(employee.name, employee.company_id, employee.joined) for employee in employees],
+            [('Jim', 1, datetime(2016, 10, 1, 13, 0, 0)), ('Bob', 1, None)],
+        )
+
+    def test_conflict(self):
+        response = self.patch('/accounts', [
+            {'op': 'add', 'path': '/', 'value': {'id': 1, 'name': 'Initech Sales', 'owner': 'Jim'}},
+            {'op': 'add', 'path': '/', 'value': {'id': 2, 'name': 'Initech Sales', 'owner': 'Bob'}},
+        ])
+        self.assertConflict(response)
+        self.assertEqual(self.db_session.query(Account).count(), 0)
+
+    def test_invalid_attribute(self):
+        response = self.patch('/accounts', [
+            {'op': 'add', 'path': '/', 'value': {'id': 1, 'name': 'Initech Sales', 'owner': 'Jim'}},
+            {'op': 'add', 'path': '/', 'value': {'id': 2, 'nonexistent': 'Bob'}},
+        ])
+        self.assertBadRequest(response, 'Invalid patch', 'Patch 1 is not valid for op add')
+        self.assertEqual(self.db_session.query(Account).count(), 0)
+
+    def test_property_attribute(self):
+        # Properties can only be set on instances
+        self.db_session.add(Character(id=1, name='Oliver'))
+        self.db_session.commit()
+        for patch in [
+            {'op': 'add', 'path': '/', 'value': {'id': 2, 'indirect_name': 'Oliver'}},
+            {'op': 'upsert', 'path': '/', 'value': {'id': 2, 'indirect_name': 'Oliver'}},
+            {'op': 'replace', 'path': '/', 'pks': [1], 'value': {'indirect_name': 'Ollie'}},
+        ]:
+            response = self.patch('/characters', [patch])
+            self.assertBadRequest(response, 'Invalid patch', 'Patch 0 is not valid for op {0}'.format(patch['op']))
+        self.assertEqual([character.name for character in self.db_session.query(Character)], ['Oliver'])
+
+    def test_replace(self):
+        self.add_employees()
+        with self.capture_queries() as queries:
+            response = self.patch('/employees', [
+                {'op': 'replace', 'path': '/', 'pks': [1, 4], 'value': {'left': '2016-12-31T00:00:00Z'}},
+                {'op': 'replace', 'path': '/', 'pks': [1], 'value': {'name': 'Jim'}},
+                {'op': 'replace', 'path': '/', 'pks': [7], 'value': {'left': '2016-12-31T00:00:00Z'}},
+                # Employee 2 is hidden by get_filter
+                {'op': 'replace', 'path': '/', 'filter': {'id__in': [2, 3]}, 'value': {'name': 'Bob'}},
+            ])
+        self.assertOK(response, {})
+        # Patches setting the same values share an UPDATE
+        self.assertEqual(len([query for query in queries if query.startswith('UPDATE')]), 3)
+        left = datetime(2016, 12, 31)
+        self.assertEqual(self.employees(), [
+            (1, 'Jim', left),
+            (2, 'Employee 2', None),
+            (3, 'Bob', None),
+            (4, 'Employee 4', left),
+            (5, 'Employee 5', None),
+            (6, 'Employee 6', None),
+            (7, 'Employee 7', left),
+            (8, 'Employee 8', None),
+            (9, 'Employee 9', None),
+        ])
+
+    def test_remove(self):
+        self.add_employees()
+        with self.capture_queries() as queries:
+            response = self.patch('/employees', [
+                {'op': 'remove', 'path': '/', 'pks': [1, 2]},
+                {'op': 'remove', 'path': '/', 'pks': [3]},
+                {'op': 'remove', 'path': '/', 'filter': {'name__in': ['Employee 5', 'Employee 8', 'Employee 9']}},
+            ])
+        self.assertOK(response, {})
+        self.assertEqual(len([query for query in queries if query.startswith('DELETE')]), 2)
+        self.assertEqual([employee[0] for employee in self.employees()], [2, 4, 5, 6, 7, 8])
+
+    def test_mark_deleted(self):
+        self.add_employees()
+        with self.capture_queries() as queries:
+            response = self.patch('/retiring-employees', [
+                {'op': 'remove', 'path': '/', 'pks': [1, 2, 3]},
+            ])
+        self.assertOK(response, {})
+        self.assertFalse([query for query in queries if query.startswith('DELETE')])
+        self.assertEqual(
+            [employee[2] for employee in self.employees()],
+            [datetime(2017, 1, 1)] * 3 + [None] * 6,
+        )
+
+    def test_remove_linked(self):
+        self.add_employees()
+        response = self.patch('/', [
+            {'op': 'add', 'path': '/accounts', 'value': {'id': 1, 'name': 'Initech Sales', 'owner': 'Jim'}},
+            {'op': 'remove', 'path': '/companies', 'pks': [1]},
+        ])
+        self.assertConflict(response, 'Other content links to this')
+        self.assertEqual(self.db_session.query(Account).count(), 0)
+
+    def test_invalid_target(self):
+        self.add_employees()
+        for patch in [
+            {'op': 'remove', 'path': '/'},
+            {'op': 'remove', 'path': '/', 'pks': []},
+            {'op': 'remove', 'path': '/', 'pks': [1], 'filter': {'id': 2}},
+            {'op': 'remove', 'path': '/', 'filter': {'nonexistent': 2}},
+            {'op': 'replace', 'path': '/', 'pks': [1]},
+            {'op': 'replace', 'path': '/', 'pks': [1], 'value': {}},
+            {'op': 'remove', 'path': '/', 'filter': {}},
+            {'op': 'replace', 'path': '/', 'filter': {}, 'value': {'name': 'Bob'}},
+            {'op': 'replace', 'path': '/', 'pks': [1], 'value': {'id': 99}},
+        ]:
+            response = self.patch('/employees', [patch])
+            self.assertBadRequest(response, 'Invalid patch', 'Patch 0 is not valid for op {0}'.format(patch['op']))
+        self.assertEqual(len(self.employees()), 9)
+
+    def test_ops_not_allowed(self):
+        self.add_employees()
+        for patch in [
+            {'op': 'remove', 'path': '/', 'filter': {'id__in': [1, 2]}},
+            {'op': 'replace', 'path': '/', 'pks': [1], 'value': {'name': 'Jim'}},
+            {'op': 'upsert', 'path': '/', 'value': {'id': 1, 'name': 'Jim'}},
+        ]:
+            response = self.patch('/add-employees', [patch])
+            self.assertBadRequest(response, 'Invalid patch', 'Patch 0 is not valid')
+        self.assertEqual(self.employees(), [(index, 'Employee {0}'.format(index), None) for index in range(1, 10)])
+
+    def test_unfiltered_path(self):
+        # Rows of other models can only be removed if the resource filters them
+        self.db_session.add(Account(id=1, name='Initech Sales', owner='Jim'))
+        self.db_session.add(Account(id=2, name='ACME Sales'))
+        self.db_session.commit()
+        response = self.patch('/open', [{'op': 'remove', 'path': '/accounts', 'pks': [1]}])
+        self.assertBadRequest(response, 'Invalid patch', 'Patch 0 is not valid for op remove')
+        response = self.patch('/', [{'op': 'remove', 'path': '/accounts', 'pks': [1, 2]}])
+        self.assertOK(response, {})
+        self.assertEqual([account.id for account in self.db_session.query(Account)], [2])
+
+    def test_replace_path_attributes(self):
+        self.add_employees()
+        response = self.patch('/companies/1/employees', [{'op': 'replace', 'path': '/', 'pks': [3], 'value': {'company_id': 2}}])
+        self.assertBadRequest(response, 'Invalid patch', 'Patch 0 is not valid for op replace')
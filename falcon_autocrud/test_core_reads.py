@@ -0,0 +1,96 @@
+from datetime import datetime
+from decimal import Decimal
+import json
+from sqlalchemy.event import listen, remove
+
+from .resource import CollectionResource, SingleResource
+from .test_base import BaseTestCase
+from .test_fixtures import Company, Employee
+
+
+class EmployeeCollectionResource(CollectionResource):
+    model = Employee
+
+class EmployeeResource(SingleResource):
+    model = Employee
+
+class CoreEmployeeCollectionResource(CollectionResource):
+    model           = Employee
+    core_reads      = True
+    allowed_included = ['company']
+
+class CoreEmployeeResource(SingleResource):
+    model           = Employee
+    core_reads      = True
+    response_fields = ['name', 'joined', 'pay_rate']
+    naive_datetimes = ['joined']
+
+class StreamedCoreEmployeeCollectionResource(CoreEmployeeCollectionResource):
+    stream_results  = True
+
+class HookedCoreEmployeeResource(SingleResource):
+    model           = Employee
+    core_reads      = True
+
+    def after_get(self, req, resp, item, *args, **kwargs):
+        req.context['result']['data']['attributes']['hooked'] = item.name
+
+
+class CoreReadsTest(BaseTestCase):
+    def create_test_resources(self):
+        self.app.add_route('/employees', EmployeeCollectionResource(self.db_engine))
+        self.app.add_route('/employees/{id}', EmployeeResource(self.db_engine))
+        self.app.add_route('/core-employees', CoreEmployeeCollectionResource(self.db_engine))
+        self.app.add_route('/core-employees/{id}', CoreEmployeeResource(self.db_engine))
+        self.app.add_route('/streamed-employees', StreamedCoreEmployeeCollectionResource(self.db_engine))
+        self.app.add_route('/hooked-employees/{id}', HookedCoreEmployeeResource(self.db_engine))
+
+    def create_common_fixtures(self):
+        self.db_session.add(Company(id=1, name='Initech'))
+        self.db_session.add(Employee(id=1, name='Jim', company_id=1, joined=datetime(2016, 10, 1, 13, 0, 0), pay_rate=Decimal('25.40')))
+        self.db_session.add(Employee(id=2, name='Bob', company_id=1, joined=datetime(2016, 10, 2, 13, 0, 0)))
+        self.db_session.add(Employee(id=3, name='Jack'))
+        self.db_session.commit()
+
+        self.loaded = []
+        listen(Employee, 'load', self.on_load)
+
+    def tearDown(self):
+        remove(Employee, 'load', self.on_load)
+        super(CoreReadsTest, self).tearDown()
+
+    def on_load(self, target, context):
+        self.loaded.append(target)
+
+    def get(self, path, query_string=''):
+        response = self.simulate_request(path, method='GET', query_string=query_string, headers={'Accept': 'application/json'})
+        self.assertOK(None)
+        return json.loads(b''.join(response).decode('utf-8'))
+
+    def test_collection(self):
+        for query_string in ['', 'company_id=1&__sort=-name', '__sort=id&__page=2&__page_size=2', '__fields=name&__sort=id']:
+            expected = self.get('/employees', query_string)
+            self.loaded = []
+            self.assertEqual(self.get('/core-employees', query_string), expected)
+            self.assertEqual(self.get('/streamed-employees', query_string), expected)
+            self.assertEqual(self.loaded, [])
+
+    def test_single(self):
+        self.assertEqual(self.get('/core-employees/1'), {
+            'data': {
+                'pk':           1,
+                'type':         'employees',
+                'attributes':   {'name': 'Jim', 'joined': '2016-10-01T13:00:00', 'pay_rate': 25.4},
+            }
+        })
+        self.assertEqual(self.loaded, [])
+
+        self.simulate_request('/core-employees/100', method='GET', headers={'Accept': 'application/json'})
+        self.assertEqual(self.srmock.status, '404 Not Found')
+
+    def test_fallback_to_orm(self):
+        data = self.get('/core-employees', '__included=company&__sort=id')['data']
+        self.assertEqual(data[0]['attributes']['companies']['name'], 'Initech')
+        self.assertNotEqual(self.loaded, [])
+
+        self.assertEqual(self.get('/hooked-employees/2')['data']['attributes']['hooked'], 'Bob')
@@ -0,0 +1,117 @@
+import json
+
+from .resource import CollectionResource
+from .test_base import BaseTestCase
+from .test_fixtures import Employee
+
+
+class EmployeeCollectionResource(CollectionResource):
+    model = Employee
+
+class WindowEmployeeCollectionResource(CollectionResource):
+    model           = Employee
+    count_strategy  = 'window'
+
+class CoreWindowEmployeeCollectionResource(WindowEmployeeCollectionResource):
+    core_reads      = True
+
+class CachedEmployeeCollectionResource(CollectionResource):
+    model           = Employee
+    count_strategy  = 'cached'
+
+class EstimateEmployeeCollectionResource(CollectionResource):
+    model                       = Employee
+    allowed_count_strategies    = ['exact', 'estimate']
+
+
+class CountTest(BaseTestCase):
+    def create_test_resources(self):
+        self.app.add_route('/employees', EmployeeCollectionResource(self.db_engine))
+        self.app.add_route('/window-employees', WindowEmployeeCollectionResource(self.db_engine))
+        self.app.add_route('/core-window-employees', CoreWindowEmployeeCollectionResource(self.db_engine))
+        self.app.add_route('/cached-employees', CachedEmployeeCollectionResource(self.db_engine))
+        self.app.add_route('/estimate-employees', EstimateEmployeeCollectionResource(self.db_engine))
+
+    def create_common_fixtures(self):
+        for index in range(1, 8):
+            self.db_session.add(Employee(id=index, name='Employee {0}'.format(index), caps_name='GROUP {0}'.format(index % 2)))
+        self.db_session.commit()
+
+    def get(self, path, query_string):
+        response, = self.simulate_request(path, method='GET', query_string=query_string, headers={'Accept': 'application/json'})
+        return json.loads(response.decode('utf-8'))
+
+    def test_exact(self):
+        body = self.get('/employees', '__sort=id&__page=2&__page_size=3')
+        self.assertEqual([item['pk'] for item in body['data']], [4, 5, 6])
+        self.assertEqual(body['meta'], {'total': 7, 'page': 2, 'page_size': 3})
+
+    def test_window(self):
+        for path in ['/window-employees', '/core-window-employees']:
+            with self.capture_queries() as queries:
+                body = self.get(path, '__sort=id&__page=3&__page_size=3')
+            self.assertEqual(self.srmock.status, '200 OK')
+            self.assertEqual([item['pk'] for item in body['data']], [7])
+            self.assertEqual(body['meta'], {'total': 7, 'page': 3, 'page_size': 3, 'total_strategy': 'window'})
+            self.assertEqual(len([query for query in queries if query.lstrip().upper().startswith('SELECT')]), 1)
+
+            body = self.get(path, 'caps_name=GROUP 1&__sort=id&__page=1&__page_size=3')
+            self.assertEqual([item['pk'] for item in body['data']], [1, 3, 5])
+            self.assertEqual(body['meta']['total'], 4)
+
+    def test_window_empty(self):
+        body = self.get('/window-employees', 'caps_name=NOBODY&__page=1&__page_size=3')
+        self.assertEqual(body['meta'], {'total': 0, 'page': 1, 'page_size': 3, 'total_strategy': 'window'})
+
+        # Past the end there are no rows to carry the total, so count instead
+        body = self.get('/window-employees', '__page=4&__page_size=3')
+        self.assertEqual(body['data'], [])
+        self.assertEqual(body['meta'], {'total': 7, 'page': 4, 'page_size': 3, 'total_strategy': 'exact'})
+
+    def test_none(self):
+        for value in ['none', '0']:
+            with self.capture_queries() as queries:
+                body = self.get('/employees', '__sort=id&__page=1&__page_size=3&__count=' + value)
+            self.assertEqual([item['pk'] for item in body['data']], [1, 2, 3])
+            self.assertEqual(body['meta'], {'total': None, 'page': 1, 'page_size': 3, 'total_strategy': 'none'})
+            self.assertFalse([query for query in queries if 'count(' in query.lower()])
+
+    def test_estimate_falls_back(self):
+        # Only PostgreSQL can estimate, so SQLite counts exactly
+        body = self.get('/estimate-employees', '__page=1&__page_size=3&__count=estimate')
+        self.assertEqual(body['meta'], {'total': 7, 'page': 1, 'page_size': 3, 'total_strategy': 'exact'})
+
+    def test_cached(self):
+        body = self.get('/cached-employees', 'caps_name=GROUP 1&__page=1&__page_size=2')
+        self.assertEqual(body['meta'], {'total': 4, 'page': 1, 'page_size': 2, 'total_strategy': 'cached'})
+
+        self.db_session.add(Employee(id=8, name='Employee 8', caps_name='GROUP 1'))
+        self.db_session.commit()
+
+        with self.capture_queries() as queries:
+            body = self.get('/cached-employees', 'caps_name=GROUP 1&__page=2&__page_size=2')
+        self.assertEqual(body['meta']['total'], 4)
+        self.assertFalse([query for query in queries if 'count(' in query.lower()])
+
+        # A different filter is counted separately
+        body = self.get('/cached-employees', 'caps_name=GROUP 0&__page=1&__page_size=2')
+        self.assertEqual(body['meta']['total'], 3)
+
+    def test_invalid(self):
+        self.get('/employees', '__page=1&__page_size=3&__count=guess')
+        self.assertEqual(self.srmock.status, '400 Bad Request')
+
+    def test_not_allowed(self):
+        # Strategies the resource did not opt in to are refused
+        for value in ['cached', 'estimate', 'window']:
+            body = self.get('/employees', '__page=1&__page_size=3&__count=' + value)
+            self.assertEqual(self.srmock.status, '400 Bad Request')
+            self.assertEqual(body['description'], 'The "__count" parameter is invalid')
+        body = self.get('/estimate-employees', '__page=1&__page_size=3&__count=cached')
+        self.assertEqual(self.srmock.status, '400 Bad Request')
+
+        # The resource's own strategy may still be asked for
+        body = self.get('/cached-employees', '__page=1&__page_size=3&__count=cached')
+        self.assertEqual(body['meta']['total_strategy'], 'cached')
+        body = self.get('/cached-employees', '__page=1&__page_size=3&__count=none')
+        self.assertEqual(body['meta']['total'], None)
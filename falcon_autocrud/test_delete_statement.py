@@ -0,0 +1,93 @@
+from datetime import datetime
+import json
+
+from .resource import SingleResource
+from .statements import supports_returning
+from .test_base import BaseTestCase
+from .test_fixtures import Company, Employee
+
+
+class CompanyResource(SingleResource):
+    model = Company
+
+class EmployeeResource(SingleResource):
+    model = Employee
+
+    def delete_precondition(self, req, resp, query, *args, **kwargs):
+        return query.filter(Employee.left == None)
+
+    def mark_deleted_values(self, req, resp, *args, **kwargs):
+        return {'left': datetime(2016, 10, 1, 13, 0, 0)}
+
+class OrmEmployeeResource(EmployeeResource):
+    delete_statement = False
+
+class HookedEmployeeResource(EmployeeResource):
+    def after_delete(self, req, resp, item, *args, **kwargs):
+        self.deleted.append(item.id)
+
+
+class DeleteStatementTest(BaseTestCase):
+    def create_test_resources(self):
+        self.app.add_route('/companies/{id}', CompanyResource(self.db_engine))
+        self.app.add_route('/employees/{id}', EmployeeResource(self.db_engine))
+        self.app.add_route('/orm-employees/{id}', OrmEmployeeResource(self.db_engine))
+        self.hooked = HookedEmployeeResource(self.db_engine)
+        self.hooked.deleted = []
+        self.app.add_route('/hooked-employees/{id}', self.hooked)
+
+    def create_common_fixtures(self):
+        self.db_session.add(Company(id=1, name='Initech'))
+        self.db_session.add(Company(id=2, name='Initrode'))
+        self.db_session.add(Employee(id=1, name='Jim', company_id=1))
+        self.db_session.add(Employee(id=2, name='Bob', company_id=1, left=datetime(2015, 1, 1)))
+        self.db_session.commit()
+
+    def test_delete(self):
+        with self.capture_queries() as queries:
+            response, = self.simulate_request('/companies/2', method='DELETE', headers={'Accept': 'application/json'})
+        self.assertOK(response, {'data': {'id': 2, 'name': 'Initrode'}})
+        if supports_returning(self.db_engine.dialect, 'delete'):
+            # Otherwise the item is loaded and deleted through the ORM
+            self.assertEqual(len(queries), 1)
+            self.assertTrue(queries[0].startswith('DELETE'))
+        self.assertIsNone(self.db_session.query(Company).get(2))
+
+    def test_not_found(self):
+        response = self.simulate_request('/companies/3', method='DELETE', headers={'Accept': 'application/json'})
+        self.assertNotFound(response)
+
+    def test_linked(self):
+        response, = self.simulate_request('/companies/1', method='DELETE', headers={'Accept': 'application/json'})
+        self.assertConflict(response, 'Other content links to this')
+        self.assertIsNotNone(self.db_session.query(Company).get(1))
+
+    def test_mark_deleted(self):
+        with self.capture_queries() as queries:
+            response, = self.simulate_request('/employees/1', method='DELETE', headers={'Accept': 'application/json'})
+        self.assertEqual(self.srmock.status, '200 OK')
+        self.assertEqual(json.loads(response.decode('utf-8'))['data']['left'], '2016-10-01T13:00:00Z')
+        if supports_returning(self.db_engine.dialect, 'update'):
+            self.assertEqual(len(queries), 1)
+            self.assertTrue(queries[0].startswith('UPDATE'))
+        self.assertEqual(self.db_session.query(Employee).get(1).left, datetime(2016, 10, 1, 13, 0, 0))
+
+    def test_mark_deleted_orm(self):
+        # Without the single statement, the values are set on the instance
+        for path in ['/orm-employees/1', '/hooked-employees/1']:
+            self.db_session.query(Employee).filter(Employee.id == 1).update({'left': None})
+            self.db_session.commit()
+            with self.capture_queries() as queries:
+                response, = self.simulate_request(path, method='DELETE', headers={'Accept': 'application/json'})
+            self.assertEqual(self.srmock.status, '200 OK')
+            self.assertEqual(json.loads(response.decode('utf-8'))['data']['left'], '2016-10-01T13:00:00Z')
+            self.assertFalse([query for query in queries if query.startswith('DELETE')])
+            self.db_session.expire_all()
+            self.assertEqual(self.db_session.query(Employee).get(1).left, datetime(2016, 10, 1, 13, 0, 0))
+        self.assertEqual(self.hooked.deleted, [1])
+
+    def test_conditions_violated(self):
+        with self.capture_queries() as queries:
+            response, = self.simulate_request('/employees/2', method='DELETE', headers={'Accept': 'application/json'})
+        self.assertConflict(response, 'Resource found but conditions violated')
+        self.assertEqual(len(queries), 2)
@@ -0,0 +1,69 @@
+from datetime import date, datetime, time
+import unittest
+
+from .deserialize import get_deserializer, parse_date, parse_datetime, parse_naive_datetime, parse_time
+from .test_fixtures import Character, Employee
+
+
+class DeserializeTest(unittest.TestCase):
+    def test_compiled_once(self):
+        self.assertIs(get_deserializer(Employee), get_deserializer(Employee))
+        self.assertIsNot(get_deserializer(Employee), get_deserializer(Employee, ['joined']))
+
+    def test_parsers(self):
+        parsers = get_deserializer(Employee, ['left'])
+        self.assertIs(parsers['joined'], parse_datetime)
+        self.assertIs(parsers['left'], parse_naive_datetime)
+        self.assertIs(parsers['start_time'], parse_time)
+        self.assertIsNone(parsers['name'])
+        self.assertNotIn('company', parsers)
+
+    def test_properties(self):
+        parsers = get_deserializer(Character)
+        self.assertIsNone(parsers['indirect_name'])
+        self.assertNotIn('team', parsers)
+
+    def test_values(self):
+        self.assertEqual(parse_datetime('2016-10-01T13:00:05Z'), datetime(2016, 10, 1, 13, 0, 5))
+        self.assertEqual(parse_naive_datetime('2016-10-01T13:00:05'), datetime(2016, 10, 1, 13, 0, 5))
+        self.assertEqual(parse_date('2016-10-01'), date(2016, 10, 1))
+        self.assertEqual(parse_time('09:05:00'), time(9, 5, 0))
+        self.assertEqual(parse_time('9:5:0'), time(9, 5, 0))
+
+    def test_strict_formats(self):
+        for value in ['2016-10-01T13:00:05', '2016-10-01 13:00:05Z', '2016-10-01T13:00:05.5Z', '2016-10-01T13:0a:05Z']:
+            self.assertRaises(ValueError, parse_datetime, value)
+        for value in ['2016-10-01T13:00:05Z', '2016-10-01 13:00:05']:
+            self.assertRaises(ValueError, parse_naive_datetime, value)
+        for value in ['20161001', '2016-10-01T00']:
+            self.assertRaises(ValueError, parse_date, value)
+        # Forms fromisoformat accepts on some Python versions
+        for value in ['2016-10-01T13:00+01Z', '2016-10-01T13:00:05+01:00', '2016-10-01T13:00:05.000Z', '2016-W40-1T13:00:05Z']:
+            self.assertRaises(ValueError, parse_datetime, value)
+        for value in ['2016-10-01T13:00+01', '2016-10-01T13:00:05+01:00', '2016-10-01T130005']:
+            self.assertRaises(ValueError, parse_naive_datetime, value)
+        for value in ['2016-W40-1', '2016-275']:
+            self.assertRaises(ValueError, parse_date, value)
+        for value in ['13:00+01', '13:00:05+01:00', '13:00:05.5', '130005']:
+            self.assertRaises(ValueError, parse_time, value)
+
+    def test_same_as_strptime(self):
+        values = [
+            '2016-10-01T13:00:05Z', '2016-1-1T13:00:00Z', '2016-10-1T3:0:5Z', '2016-10-01T13:00:05',
+            '2016-02-30T13:00:05Z', '2016-10-01T24:00:05Z', '2016-10-01T13:00+01Z', '16-10-01T13:00:05Z',
+        ]
+        for parse, format in [(parse_datetime, '%Y-%m-%dT%H:%M:%SZ'), (parse_naive_datetime, '%Y-%m-%dT%H:%M:%S')]:
+            for value in values + [value.rstrip('Z') for value in values]:
+                try:
+                    expected = datetime.strptime(value, format)
+                except ValueError:
+                    self.assertRaises(ValueError, parse, value)
+                else:
+                    self.assertEqual(parse(value), expected)
+        for value in ['2016-10-01', '2016-1-1', '2016-02-30', '16-10-01', '2016-10-01T00']:
+            try:
+                expected = datetime.strptime(value, '%Y-%m-%d').date()
+            except ValueError:
+                self.assertRaises(ValueError, parse_date, value)
+            else:
+                self.assertEqual(parse_date(value), expected)
@@ -0,0 +1,70 @@
+import gc
+import json
+import weakref
+
+from .dispatch import get_dispatch
+from .resource import CollectionResource, SingleResource
+from .schema import request_schema, response_schema
+from .test_base import BaseTestCase
+from .test_fixtures import Account
+
+
+@request_schema({'type': 'object'}, method_name='on_post')
+class AccountCollectionResource(CollectionResource):
+    model = Account
+
+    @response_schema({'type': 'object'})
+    def on_get(self, req, resp, *args, **kwargs):
+        return super(AccountCollectionResource, self).on_get(req, resp, *args, **kwargs)
+
+    def after_post(self, req, resp, item, *args, **kwargs):
+        self.posted.append(item.name)
+
+class AccountResource(SingleResource):
+    model = Account
+
+
+class DispatchTest(BaseTestCase):
+    def create_test_resources(self):
+        self.accounts = AccountCollectionResource(self.db_engine)
+        self.accounts.posted = []
+        self.account = AccountResource(self.db_engine)
+        self.app.add_route('/accounts', self.accounts)
+        self.app.add_route('/accounts/{id}', self.account)
+
+    def test_cached(self):
+        self.assertIs(get_dispatch(self.accounts, 'GET'), get_dispatch(self.accounts, 'GET'))
+        self.assertIsNot(get_dispatch(self.accounts, 'GET'), get_dispatch(self.accounts, 'POST'))
+
+    def test_released(self):
+        resource = AccountCollectionResource(self.db_engine)
+        self.assertIsNotNone(get_dispatch(resource, 'POST').after)
+        reference = weakref.ref(resource)
+        del resource
+        gc.collect()
+        self.assertIsNone(reference())
+
+    def test_default_methods(self):
+        self.assertTrue(get_dispatch(self.accounts, 'POST').allowed)
+        self.assertFalse(get_dispatch(self.accounts, 'DELETE').allowed)
+        self.assertFalse(get_dispatch(self.account, 'POST').allowed)
+        self.assertEqual(get_dispatch(self.account, 'DELETE').methods, ['GET', 'PUT', 'PATCH', 'DELETE'])
+
+    def test_schemas(self):
+        self.assertEqual(get_dispatch(self.accounts, 'POST').request_schema, {'type': 'object'})
+        self.assertIsNone(get_dispatch(self.accounts, 'POST').response_schema)
+        self.assertEqual(get_dispatch(self.accounts, 'GET').response_schema, {'type': 'object'})
+        self.assertIsNone(get_dispatch(self.accounts, 'GET').request_schema)
+
+    def test_hooks(self):
+        self.assertEqual(get_dispatch(self.accounts, 'POST').after, self.accounts.after_post)
+        self.assertIsNone(get_dispatch(self.accounts, 'POST').before)
+        self.assertIsNone(get_dispatch(self.account, 'DELETE').mark_deleted)
+
+        response, = self.simulate_request('/accounts', method='POST', body=json.dumps({'name': 'Initech Sales', 'owner': 'Jim'}), headers={'Accept': 'application/json', 'Content-Type': 'application/json'})
+        self.assertEqual(self.srmock.status, '201 Created')
+        self.assertEqual(self.accounts.posted, ['Initech Sales'])
+
+    def test_method_not_allowed(self):
+        response = self.simulate_request('/accounts/1', method='POST', body=json.dumps({'name': 'Initech Sales'}), headers={'Accept': 'application/json', 'Content-Type': 'application/json'})
+        self.assertMethodNotAllowed(response)
@@ -0,0 +1,95 @@
+from datetime import datetime
+from decimal import Decimal
+import falcon
+import json
+import unittest
+import uuid
+
+from .encoder import JSONEncoder, OrjsonEncoder, RapidjsonEncoder, UjsonEncoder
+from .middleware import Middleware
+from .resource import CollectionResource, SingleResource
+from .test_base import BaseTestCase
+from .test_fixtures import Employee
+
+
+def available(encoder_class):
+    try:
+        encoder_class()
+        return True
+    except ImportError:
+        return False
+
+
+class EncoderTest(unittest.TestCase):
+    doc = {'data': [{'id': 1, 'name': 'Jim/Bob', 'ratio': 0.5, 'left': None}]}
+
+    def assertEncodes(self, encoder):
+        encoded = encoder.encode(self.doc)
+        self.assertIsInstance(encoded, bytes)
+        self.assertEqual(json.loads(encoded.decode('utf-8')), self.doc)
+
+    def assertNativeTypes(self, encoder):
+        values = {
+            datetime:   (datetime(2016, 10, 1, 13, 0, 0, 5), '2016-10-01T13:00:00Z'),
+            Decimal:    (Decimal('25.40'), 25.4),
+            uuid.UUID:  (uuid.UUID(int=1), uuid.UUID(int=1).hex),
+        }
+        for native_type in encoder.native_types:
+            value, expected = values[native_type]
+            self.assertEqual(json.loads(encoder.encode({'value': value}).decode('utf-8')), {'value': expected})
+
+    def test_stdlib(self):
+        self.assertEncodes(JSONEncoder())
+
+    @unittest.skipUnless(available(OrjsonEncoder), 'orjson not installed')
+    def test_orjson(self):
+        self.assertEncodes(OrjsonEncoder())
+        self.assertNativeTypes(OrjsonEncoder())
+
+    @unittest.skipUnless(available(OrjsonEncoder), 'orjson not installed')
+    def test_orjson_fallback(self):
+        encoder = OrjsonEncoder()
+        self.assertEqual(json.loads(encoder.encode({1: 'a'}).decode('utf-8')), {'1': 'a'})
+        doc = {'big': 2 ** 64, 'when': datetime(2016, 10, 1, 13, 0, 0, 5), 'rate': Decimal('25.40')}
+        self.assertEqual(json.loads(encoder.encode(doc).decode('utf-8')), {'big': 2 ** 64, 'when': '2016-10-01T13:00:00Z', 'rate': 25.4})
+
+    @unittest.skipUnless(available(RapidjsonEncoder), 'python-rapidjson not installed')
+    def test_rapidjson(self):
+        self.assertEncodes(RapidjsonEncoder())
+        self.assertNativeTypes(RapidjsonEncoder())
+
+    @unittest.skipUnless(available(UjsonEncoder), 'ujson not installed')
+    def test_ujson(self):
+        self.assertEncodes(UjsonEncoder())
+
+
+class EmployeeCollectionResource(CollectionResource):
+    model = Employee
+
+class EmployeeResource(SingleResource):
+    model = Employee
+
+
+class NativeTypesTest(BaseTestCase):
+    def setUp(self):
+        super(NativeTypesTest, self).setUp()
+        self.db_session.add(Employee(id=1, name='Jim', joined=datetime(2016, 10, 1, 13, 0, 0, 5), pay_rate=Decimal('25.40')))
+        self.db_session.commit()
+
+    def get_with(self, encoder):
+        self.app = falcon.API(middleware=[Middleware(encoder=encoder)])
+        self.app.add_route('/employees', EmployeeCollectionResource(self.db_engine))
+        self.app.add_route('/employees/{id}', EmployeeResource(self.db_engine))
+        collection, = self.simulate_request('/employees', method='GET', headers={'Accept': 'application/json'})
+        self.assertOK(collection)
+        single, = self.simulate_request('/employees/1', method='GET', headers={'Accept': 'application/json'})
+        self.assertOK(single)
+        return json.loads(collection.decode('utf-8')), json.loads(single.decode('utf-8'))
+
+    def test_same_output(self):
+        expected = self.get_with(JSONEncoder())
+        self.assertEqual(expected[1]['data']['attributes']['joined'], '2016-10-01T13:00:00Z')
+        self.assertEqual(expected[1]['data']['attributes']['pay_rate'], 25.4)
+        for encoder_class in [OrjsonEncoder, RapidjsonEncoder, UjsonEncoder]:
+            if available(encoder_class):
+                self.assertEqual(self.get_with(encoder_class()), expected)
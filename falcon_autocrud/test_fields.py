@@ -84,3 +84,40 @@ class SortTest(BaseTestCase):
         self.assertOK(response, {
             'data': {'id': 4, 'name': 'Iris'},
         })
+
+    def test_sparse_fields(self):
+        response, = self.simulate_request('/employees', method='GET', query_string='__fields=name,id&__sort=id', headers={'Accept': 'application/json'})
+        self.assertOK(response, {
+            'data': [
+                {'pk': 1, 'type': 'employees', 'attributes': {'id': 1, 'name': 'John'}},
+                {'pk': 2, 'type': 'employees', 'attributes': {'id': 2, 'name': 'Barry'}},
+            ]
+        })
+        response, = self.simulate_request('/employees/2', method='GET', query_string='__fields=name', headers={'Accept': 'application/json'})
+        self.assertOK(response, {
+            'data': {'pk': 2, 'type': 'employees', 'attributes': {'name': 'Barry'}},
+        })
+
+    def test_sparse_fields_within_response_fields(self):
+        response, = self.simulate_request('/limited-employees', method='GET', query_string='__fields=name&__sort=id', headers={'Accept': 'application/json'})
+        self.assertOK(response, {
+            'data': [
+                {'pk': 1, 'type': 'employees', 'attributes': {'name': 'John'}},
+                {'pk': 2, 'type': 'employees', 'attributes': {'name': 'Barry'}},
+            ]
+        })
+        response, = self.simulate_request('/limited-employees', method='GET', query_string='__fields=name,joined', headers={'Accept': 'application/json'})
+        self.assertBadRequest(response, 'Invalid parameter', 'The "__fields" parameter includes invalid attributes')
+        response, = self.simulate_request('/employees/1', method='GET', query_string='__fields=company', headers={'Accept': 'application/json'})
+        self.assertBadRequest(response, 'Invalid parameter', 'The "__fields" parameter includes invalid attributes')
+
+    def test_only_fields_loaded(self):
+        with self.capture_queries() as queries:
+            self.simulate_request('/limited-employees', method='GET', headers={'Accept': 'application/json'})
+            self.simulate_request('/employees/1', method='GET', query_string='__fields=name', headers={'Accept': 'application/json'})
+        self.assertEqual(len(queries), 2)
+        for query in queries:
+            select_list = query.split('FROM')[0]
+            self.assertIn('employees.id', select_list)
+            self.assertIn('employees.name', select_list)
+            self.assertNotIn('employees.joined', select_list)
@@ -46,3 +46,29 @@ class Character(Base):
 
     team_id     = Column(Integer, ForeignKey('teams.id'), nullable=True)
     team        = relationship('Team', back_populates='characters')
+
+class Seat(Base):
+    __tablename__ = 'seats'
+    row         = Column(String(2), primary_key=True)
+    number      = Column(Integer, primary_key=True)
+    holder      = Column(String(50), nullable=True)
+
+class Fleet(Base):
+    __tablename__ = 'fleets'
+    id          = Column(Integer, primary_key=True)
+    name        = Column(String(50))
+    vehicles    = relationship('Vehicle')
+
+class Vehicle(Base):
+    __tablename__ = 'vehicles'
+    id          = Column(Integer, primary_key=True)
+    kind        = Column(String(20))
+    name        = Column(String(50))
+    fleet_id    = Column(Integer, ForeignKey('fleets.id'), nullable=True)
+    __mapper_args__ = {'polymorphic_on': kind, 'polymorphic_identity': 'vehicle'}
+
+class Truck(Vehicle):
+    __tablename__ = 'trucks'
+    id          = Column(Integer, ForeignKey('vehicles.id'), primary_key=True)
+    payload     = Column(Integer, nullable=True)
+    __mapper_args__ = {'polymorphic_identity': 'truck'}
@@ -0,0 +1,90 @@
+import json
+
+from .resource import CollectionResource, SingleResource
+from .test_base import BaseTestCase
+from .test_fixtures import Company, Employee, Fleet, Truck, Vehicle
+
+
+class EmployeeCollectionResource(CollectionResource):
+    model               = Employee
+    response_fields     = ['name']
+    allowed_included    = ['company', 'company.employees']
+
+class CompanyCollectionResource(CollectionResource):
+    model               = Company
+    allowed_included    = ['employees']
+
+class CompanyResource(SingleResource):
+    model               = Company
+    allowed_included    = ['employees']
+
+
+class FleetResource(SingleResource):
+    model               = Fleet
+    allowed_included    = ['vehicles']
+
+
+class IncludedTest(BaseTestCase):
+    def create_test_resources(self):
+        self.app.add_route('/employees', EmployeeCollectionResource(self.db_engine))
+        self.app.add_route('/companies', CompanyCollectionResource(self.db_engine))
+        self.app.add_route('/companies/{id}', CompanyResource(self.db_engine))
+        self.app.add_route('/fleets/{id}', FleetResource(self.db_engine))
+
+    def create_common_fixtures(self):
+        for company_id in range(1, 6):
+            self.db_session.add(Company(id=company_id, name='Company {0}'.format(company_id)))
+        for employee_id in range(1, 21):
+            # The last company has no employees
+            self.db_session.add(Employee(id=employee_id, name='Employee {0}'.format(employee_id), company_id=employee_id % 4 + 1))
+        self.db_session.commit()
+
+    def get(self, path, query_string):
+        with self.capture_queries() as queries:
+            response, = self.simulate_request(path, method='GET', query_string=query_string, headers={'Accept': 'application/json'})
+        self.assertEqual(self.srmock.status, '200 OK')
+        return json.loads(response.decode('utf-8')), [query for query in queries if query.lstrip().upper().startswith('SELECT')]
+
+    def test_single_related(self):
+        body, queries = self.get('/employees', '__included=company&__sort=id')
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(len(body['data']), 20)
+        for item in body['data']:
+            self.assertEqual(item['attributes']['companies']['id'], item['pk'] % 4 + 1)
+
+    def test_related_list(self):
+        body, queries = self.get('/companies', '__included=employees&__sort=id')
+        self.assertEqual(len(queries), 2)
+        for item in body['data']:
+            employees = item['attributes']['employees']
+            self.assertEqual(sorted(employee['id'] for employee in employees), [
+                employee_id for employee_id in range(1, 21) if employee_id % 4 + 1 == item['pk']
+            ])
+            self.assertTrue(all(employee['company_id'] == item['pk'] for employee in employees))
+        self.assertEqual(body['data'][-1]['attributes']['employees'], [])
+
+    def test_dotted(self):
+        body, queries = self.get('/employees', '__included=company.employees&__sort=id&__page=2&__page_size=5')
+        # Count, page with companies joined, and the companies' employees
+        self.assertEqual(len(queries), 3)
+        self.assertEqual([item['pk'] for item in body['data']], [6, 7, 8, 9, 10])
+        for item in body['data']:
+            self.assertEqual(len(item['attributes']['employees']), 5)
+
+    def test_single(self):
+        body, queries = self.get('/companies/2', '__included=employees')
+        self.assertEqual(len(queries), 2)
+        self.assertEqual(sorted(employee['id'] for employee in body['data']['attributes']['employees']), [1, 5, 9, 13, 17])
+
+    def test_invalid(self):
+        response, = self.simulate_request('/companies', method='GET', query_string='__included=employees.company', headers={'Accept': 'application/json'})
+        self.assertBadRequest(response, 'Invalid parameter', 'The "__included" parameter includes invalid entities')
+
+    def test_subclass(self):
+        self.db_session.add(Fleet(id=1, name='Initech'))
+        self.db_session.add(Vehicle(id=1, name='Van', fleet_id=1))
+        self.db_session.add(Truck(id=2, name='Lorry', fleet_id=1, payload=10))
+        self.db_session.commit()
+        body, queries = self.get('/fleets/1', '__included=vehicles')
+        self.assertEqual(sorted(vehicle['name'] for vehicle in body['data']['attributes']['vehicles']), ['Lorry', 'Van'])
+        self.assertNotIn('trucks', body['data']['attributes'])
@@ -0,0 +1,107 @@
+from datetime import datetime, timedelta
+import json
+
+from .resource import CollectionResource
+from .test_base import BaseTestCase
+from .test_fixtures import Employee
+
+
+class EmployeeCollectionResource(CollectionResource):
+    model = Employee
+
+class KeysetEmployeeCollectionResource(CollectionResource):
+    model               = Employee
+    default_sort        = ['joined']
+    keyset_pagination   = True
+
+class CoreKeysetEmployeeCollectionResource(KeysetEmployeeCollectionResource):
+    core_reads          = True
+    response_fields     = ['name']
+
+
+class KeysetTest(BaseTestCase):
+    def create_test_resources(self):
+        self.app.add_route('/employees', EmployeeCollectionResource(self.db_engine))
+        self.app.add_route('/keyset-employees', KeysetEmployeeCollectionResource(self.db_engine))
+        self.app.add_route('/core-employees', CoreKeysetEmployeeCollectionResource(self.db_engine))
+
+    def create_common_fixtures(self):
+        start = datetime(2016, 1, 1)
+        for index in range(1, 11):
+            # Names and join dates repeat, so the primary key has to break ties
+            self.db_session.add(Employee(
+                id=index,
+                name='Employee {0}'.format(index),
+                caps_name='GROUP {0}'.format(index % 3),
+                joined=start + timedelta(days=index % 4),
+            ))
+        self.db_session.commit()
+
+    def get(self, path, query_string):
+        response, = self.simulate_request(path, method='GET', query_string=query_string, headers={'Accept': 'application/json'})
+        return json.loads(response.decode('utf-8'))
+
+    def walk(self, path, query_string):
+        pks     = []
+        after   = None
+        while True:
+            page = self.get(path, query_string + ('&__after=' + after if after else ''))
+            self.assertEqual(self.srmock.status, '200 OK')
+            self.assertLessEqual(len(page['data']), page['meta']['page_size'])
+            pks.extend(item['pk'] for item in page['data'])
+            after = page['meta']['next']
+            if after is None:
+                return pks
+
+    def expected(self, sort):
+        return [item['pk'] for item in self.get('/employees', '__sort=' + sort)['data']]
+
+    def test_walk(self):
+        for sort in ['caps_name', '-caps_name', 'caps_name,-joined', '-joined,caps_name', '-id']:
+            self.assertEqual(
+                self.walk('/keyset-employees', '__sort={0}&__page_size=3'.format(sort)),
+                self.expected(sort + (',id' if 'id' not in sort else '')),
+            )
+
+    def test_nulls(self):
+        for employee in self.db_session.query(Employee).filter(Employee.id.in_([1, 3, 5, 6])):
+            employee.joined = None
+        self.db_session.commit()
+        for sort in ['joined', '-joined', 'joined,-caps_name', '-joined,caps_name']:
+            expected = self.expected(sort + ',id')
+            self.assertEqual(len(expected), 10)
+            for path in ['/keyset-employees', '/core-employees']:
+                # Walked twice, the second time from the statement cache
+                for _ in range(2):
+                    self.assertEqual(self.walk(path, '__sort={0}&__page_size=3'.format(sort)), expected)
+
+    def test_default_sort(self):
+        self.assertEqual(self.walk('/keyset-employees', '__page_size=4'), self.expected('joined,id'))
+        self.assertEqual(self.walk('/core-employees', '__page_size=4'), self.expected('joined,id'))
+
+    def test_meta(self):
+        page = self.get('/keyset-employees', '__page_size=20')
+        self.assertEqual(len(page['data']), 10)
+        self.assertEqual(page['meta'], {'page_size': 20, 'next': None})
+
+    def test_stable_under_inserts(self):
+        first = self.get('/keyset-employees', '__page_size=5')
+        self.db_session.add(Employee(id=100, name='Early', joined=datetime(2015, 1, 1)))
+        self.db_session.commit()
+        second = self.get('/keyset-employees', '__page_size=5&__after=' + first['meta']['next'])
+        self.assertEqual(
+            [item['pk'] for item in first['data'] + second['data']],
+            self.expected('joined,id')[1:],
+        )
+
+    def test_invalid(self):
+        next = self.get('/keyset-employees', '__page_size=5')['meta']['next']
+
+        response = self.get('/keyset-employees', '__page_size=5&__after=garbage')
+        self.assertEqual(response['description'], 'The "__after" parameter is invalid')
+        response = self.get('/keyset-employees', '__page_size=5&__sort=name&__after=' + next)
+        self.assertEqual(response['description'], 'The "__after" parameter does not match the sort order')
+        response = self.get('/keyset-employees', '__page=2&__page_size=5&__after=' + next)
+        self.assertEqual(response['description'], 'The "__after" parameter cannot be used with "__page"')
+        response = self.get('/keyset-employees', '__after=' + next)
+        self.assertEqual(response['description'], 'The "__page_size" parameter is required with "__after"')
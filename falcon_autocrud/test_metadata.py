@@ -0,0 +1,102 @@
+import json
+
+from .metadata import get_metadata
+from .resource import CollectionResource, SingleResource, identify_pk
+from .test_base import BaseTestCase
+from .test_fixtures import Account, Company, Seat
+
+
+class SeatCollectionResource(CollectionResource):
+    model               = Seat
+    allowed_patch_ops   = ['add', 'replace']
+
+class CoreSeatCollectionResource(CollectionResource):
+    model               = Seat
+    core_reads          = True
+    keyset_pagination   = True
+
+class SeatResource(SingleResource):
+    model = Seat
+
+
+class MetadataTest(BaseTestCase):
+    def create_test_resources(self):
+        self.app.add_route('/seats', SeatCollectionResource(self.db_engine))
+        self.app.add_route('/core-seats', CoreSeatCollectionResource(self.db_engine))
+        self.app.add_route('/seats/{row}/{number}', SeatResource(self.db_engine))
+
+    def create_seats(self):
+        for row, number, holder in [('A', 2, 'Jim'), ('A', 1, 'Bob'), ('B', 1, 'Alice')]:
+            self.db_session.add(Seat(row=row, number=number, holder=holder))
+        self.db_session.commit()
+
+    def request(self, path, method='GET', query_string=None, body=None):
+        response, = self.simulate_request(path, method=method, query_string=query_string, body=json.dumps(body) if body is not None else None, headers={'Accept': 'application/json', 'Content-Type': 'application/json'})
+        return json.loads(response.decode('utf-8'))
+
+    def test_registry(self):
+        metadata = get_metadata(Company)
+        self.assertIs(get_metadata(Company), metadata)
+        self.assertEqual(metadata.tablename, 'companies')
+        self.assertEqual(metadata.primary_key, ('id',))
+        self.assertEqual(list(metadata.columns), ['id', 'name'])
+        self.assertEqual(list(metadata.relationships), ['employees'])
+        self.assertIs(metadata.column('name'), Company.name)
+        self.assertIs(metadata.column('title', {'title': 'name'}), Company.name)
+        self.assertIsNone(metadata.column('employees'))
+        self.assertEqual(identify_pk(Account), 'id')
+
+    def test_composite(self):
+        metadata = get_metadata(Seat)
+        self.assertEqual(metadata.primary_key, ('row', 'number'))
+        self.assertEqual(metadata.pk(Seat(row='A', number=1)), ['A', 1])
+        self.assertEqual(metadata.pk_values(['A', 1]), ('A', 1))
+        self.assertIsNone(metadata.pk_values(['A']))
+        self.assertIsNone(metadata.pk_values('A'))
+        with self.assertRaises(ValueError):
+            identify_pk(Seat)
+
+    def test_get(self):
+        self.create_seats()
+        response = self.request('/seats', query_string='__sort=row,number')
+        self.assertEqual(self.srmock.status, '200 OK')
+        self.assertEqual([item['pk'] for item in response['data']], [['A', 1], ['A', 2], ['B', 1]])
+        self.assertEqual(response['data'][0]['type'], 'seats')
+
+        response = self.request('/seats/A/2')
+        self.assertEqual(self.srmock.status, '200 OK')
+        self.assertEqual(response['data']['pk'], ['A', 2])
+        self.assertEqual(response['data']['attributes']['holder'], 'Jim')
+
+    def test_keyset(self):
+        self.create_seats()
+        first = self.request('/core-seats', query_string='__page_size=2&__sort=row')
+        self.assertEqual([item['pk'] for item in first['data']], [['A', 1], ['A', 2]])
+        second = self.request('/core-seats', query_string='__page_size=2&__sort=row&__after=' + first['meta']['next'])
+        self.assertEqual([item['pk'] for item in second['data']], [['B', 1]])
+
+    def test_patch_pks(self):
+        self.create_seats()
+        self.request('/seats', method='PATCH', body={
+            'patches': [
+                {'op': 'replace', 'path': '/', 'pks': [['A', 1], ['B', 1]], 'value': {'holder': 'Sue'}},
+            ]
+        })
+        self.assertEqual(self.srmock.status, '200 OK')
+        self.assertEqual(
+            [(seat.row, seat.number, seat.holder) for seat in self.db_session.query(Seat).order_by(Seat.row, Seat.number)],
+            [('A', 1, 'Sue'), ('A', 2, 'Jim'), ('B', 1, 'Sue')],
+        )
+
+        response = self.request('/seats', method='PATCH', body={
+            'patches': [
+                {'op': 'replace', 'path': '/', 'pks': ['A'], 'value': {'holder': 'Sue'}},
+            ]
+        })
+        self.assertEqual(self.srmock.status, '400 Bad Request')
+        self.assertEqual(response['description'], 'Patch 0 is not valid for op replace')
+
+    def test_post(self):
+        response = self.request('/seats', method='POST', body={'row': 'C', 'number': 3, 'holder': 'Jim'})
+        self.assertEqual(self.srmock.status, '201 Created')
+        self.assertEqual(self.db_session.query(Seat).filter(Seat.row == 'C', Seat.number == 3).one().holder, 'Jim')
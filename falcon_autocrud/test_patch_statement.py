@@ -0,0 +1,111 @@
+import json
+from sqlalchemy import Column, Integer, String
+from sqlalchemy.event import listen
+from sqlalchemy.orm import validates
+
+from .resource import SingleResource
+from .statements import supports_returning
+from .test_base import Base, BaseTestCase
+from .test_fixtures import Account
+
+
+class Tag(Base):
+    __tablename__ = 'tags'
+    id          = Column(Integer, primary_key=True)
+    name        = Column(String(50))
+
+    @validates('name')
+    def validate_name(self, key, value):
+        return value.lower()
+
+class Label(Base):
+    __tablename__ = 'labels'
+    id          = Column(Integer, primary_key=True)
+    name        = Column(String(50))
+    updates     = Column(Integer, default=0)
+
+def count_update(mapper, connection, target):
+    target.updates += 1
+
+listen(Label, 'before_update', count_update)
+
+
+class AccountResource(SingleResource):
+    model = Account
+
+    def patch_precondition(self, req, resp, query, *args, **kwargs):
+        return query.filter(Account.owner == None)
+
+class HookedAccountResource(SingleResource):
+    model = Account
+
+    def before_patch(self, req, resp, db_session, resource, *args, **kwargs):
+        pass
+
+
+class TagResource(SingleResource):
+    model = Tag
+
+class LabelResource(SingleResource):
+    model = Label
+
+
+class PatchStatementTest(BaseTestCase):
+    def create_test_resources(self):
+        self.app.add_route('/accounts/{id}', AccountResource(self.db_engine))
+        self.app.add_route('/hooked-accounts/{id}', HookedAccountResource(self.db_engine))
+        self.app.add_route('/tags/{id}', TagResource(self.db_engine))
+        self.app.add_route('/labels/{id}', LabelResource(self.db_engine))
+
+    def create_common_fixtures(self):
+        self.db_session.add(Account(id=1, name='Initech Sales', owner=None))
+        self.db_session.add(Account(id=2, name='Initrode Sales', owner='Jim'))
+        self.db_session.add(Tag(id=1, name='sales'))
+        self.db_session.add(Label(id=1, name='Sales'))
+        self.db_session.commit()
+
+    def patch(self, path, body):
+        response, = self.simulate_request(path, method='PATCH', body=json.dumps(body), headers={'Accept': 'application/json', 'Content-Type': 'application/json'})
+        return response
+
+    def test_single_statement(self):
+        with self.capture_queries() as queries:
+            response = self.patch('/accounts/1', {'owner': 'Bob'})
+        self.assertOK(response, {'data': {'id': 1, 'name': 'Initech Sales', 'owner': 'Bob'}})
+        if supports_returning(self.db_engine.dialect, 'update'):
+            # Otherwise the item is loaded and patched through the ORM
+            self.assertEqual(len(queries), 1)
+            self.assertTrue(queries[0].startswith('UPDATE'))
+        self.assertEqual(self.db_session.query(Account).get(1).owner, 'Bob')
+
+    def test_conditions_violated(self):
+        with self.capture_queries() as queries:
+            response = self.patch('/accounts/2', {'owner': 'Bob'})
+        self.assertConflict(response, 'Resource found but conditions violated')
+        self.assertEqual(len(queries), 2)
+        self.assertEqual(self.db_session.query(Account).get(2).owner, 'Jim')
+
+    def test_not_found(self):
+        response = self.simulate_request('/accounts/3', method='PATCH', body=json.dumps({'owner': 'Bob'}), headers={'Accept': 'application/json', 'Content-Type': 'application/json'})
+        self.assertNotFound(response)
+
+    def test_unique_violated(self):
+        response = self.patch('/accounts/1', {'name': 'Initrode Sales'})
+        self.assertConflict(response, 'Unique constraint violated')
+        self.assertEqual(self.db_session.query(Account).get(1).name, 'Initech Sales')
+
+    def test_hooks_use_orm(self):
+        with self.capture_queries() as queries:
+            response = self.patch('/hooked-accounts/2', {'owner': 'Bob'})
+        self.assertOK(response, {'data': {'id': 2, 'name': 'Initrode Sales', 'owner': 'Bob'}})
+        self.assertTrue(queries[0].startswith('SELECT'))
+
+    def test_validators_use_orm(self):
+        response = self.patch('/tags/1', {'name': 'Marketing'})
+        self.assertOK(response, {'data': {'id': 1, 'name': 'marketing'}})
+        self.assertEqual(self.db_session.query(Tag).get(1).name, 'marketing')
+
+    def test_events_use_orm(self):
+        response = self.patch('/labels/1', {'name': 'Marketing'})
+        self.assertOK(response, {'data': {'id': 1, 'name': 'Marketing', 'updates': 1}})
+        self.assertEqual(self.db_session.query(Label).get(1).updates, 1)
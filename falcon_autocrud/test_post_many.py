@@ -0,0 +1,85 @@
+import json
+
+from .resource import CollectionResource
+from .test_base import BaseTestCase
+from .test_fixtures import Account, Company, Employee
+
+
+class AccountCollectionResource(CollectionResource):
+    model   = Account
+    methods = ['POST']
+
+    def after_post(self, req, resp, item, *args, **kwargs):
+        self.posted.append(item.name)
+
+class CompanyCollectionResource(CollectionResource):
+    model               = Company
+    methods             = ['POST']
+    allow_subresources  = True
+
+
+class PostManyTest(BaseTestCase):
+    def create_test_resources(self):
+        self.accounts = AccountCollectionResource(self.db_engine)
+        self.accounts.posted = []
+        self.app.add_route('/accounts', self.accounts)
+        self.app.add_route('/companies', CompanyCollectionResource(self.db_engine))
+
+    def post(self, path, body):
+        response, = self.simulate_request(path, method='POST', body=json.dumps(body), headers={'Accept': 'application/json', 'Content-Type': 'application/json'})
+        return response
+
+    def test_post_many(self):
+        response = self.post('/accounts', [
+            {'name': 'Account {0}'.format(index), 'owner': 'Owner {0}'.format(index)}
+            for index in range(50, 0, -1)
+        ])
+        self.assertCreated(response, {
+            'data': [
+                {'id': 51 - index, 'name': 'Account {0}'.format(index), 'owner': 'Owner {0}'.format(index)}
+                for index in range(50, 0, -1)
+            ],
+        })
+        self.assertEqual(self.accounts.posted, ['Account {0}'.format(index) for index in range(50, 0, -1)])
+        self.assertEqual(self.db_session.query(Account).count(), 50)
+
+    def test_batched(self):
+        # SQLAlchemy can't match the keys SQLite generates to the rows of a
+        # batch, so supply them to see the rows inserted together
+        with self.capture_queries() as queries:
+            response = self.post('/accounts', [
+                {'id': index, 'name': 'Account {0}'.format(index), 'owner': 'Owner {0}'.format(index)}
+                for index in range(1, 51)
+            ])
+        self.assertEqual(self.srmock.status, '201 Created')
+        self.assertEqual(len([query for query in queries if query.startswith('INSERT')]), 1)
+
+    def test_subresources(self):
+        response = self.post('/companies', [
+            {'name': 'Initech', 'employees': [{'name': 'Bob'}, {'name': 'Jim'}]},
+            {'name': 'Initrode', 'employees': [{'name': 'Alice'}]},
+            {'name': 'BigCorp'},
+        ])
+        self.assertEqual(self.srmock.status, '201 Created')
+        data = json.loads(response.decode('utf-8'))['data']
+        self.assertEqual([item['name'] for item in data], ['Initech', 'Initrode', 'BigCorp'])
+
+        employees = self.db_session.query(Employee).order_by(Employee.name).all()
+        self.assertEqual(
+            [(employee.name, employee.company.name) for employee in employees],
+            [('Alice', 'Initrode'), ('Bob', 'Initech'), ('Jim', 'Initech')],
+        )
+
+    def test_conflict(self):
+        response = self.post('/accounts', [
+            {'name': 'Initech Sales', 'owner': 'Jim'},
+            {'name': 'Initech Sales', 'owner': 'Bob'},
+        ])
+        self.assertConflict(response)
+        self.assertEqual(self.db_session.query(Account).count(), 0)
+        self.assertEqual(self.accounts.posted, [])
+
+    def test_invalid_item(self):
+        response = self.post('/accounts', [{'name': 'Initech Sales', 'owner': 'Jim'}, 'Bob'])
+        self.assertBadRequest(response, 'Invalid request body', 'Item 1 is not an object')
+        self.assertEqual(self.db_session.query(Account).count(), 0)
@@ -0,0 +1,37 @@
+import unittest
+
+from .query_plan import COMPARISONS, get_filter_plan, get_sort_plan
+from .test_fixtures import Character, Employee
+
+
+class QueryPlanTest(unittest.TestCase):
+    def test_compiled_once(self):
+        self.assertIs(get_filter_plan(Employee), get_filter_plan(Employee))
+        self.assertIs(get_sort_plan(Employee), get_sort_plan(Employee))
+
+    def test_filters(self):
+        plan = get_filter_plan(Employee)
+        self.assertEqual(plan['name'], (Employee.name,) + COMPARISONS['='])
+        for comparison in ['in', 'null', 'startswith', 'contains', 'lt', 'lte', 'gt', 'gte']:
+            self.assertEqual(plan['joined__' + comparison], (Employee.joined,) + COMPARISONS[comparison])
+        attr, condition, prepare, bind = plan['left__null']
+        self.assertFalse(bind)
+        self.assertEqual(str(condition(attr, prepare('0'))), str(Employee.left.isnot(None)))
+        attr, condition, prepare, bind = plan['name__startswith']
+        self.assertTrue(bind)
+        self.assertEqual(prepare('Ji'), 'Ji%')
+
+    def test_invalid_filters(self):
+        plan = get_filter_plan(Character)
+        # Relationships, properties, unknown comparisons and extra parts
+        for key in ['team', 'indirect_name', 'name__like', 'name__lt__gt', 'nonexistent']:
+            self.assertNotIn(key, plan)
+
+    def test_sorts(self):
+        plan = get_sort_plan(Employee)
+        key, reverse, column, order = plan['-joined']
+        self.assertEqual((key, reverse, column), ('joined', True, Employee.joined))
+        self.assertEqual(str(order), str(Employee.joined.desc()))
+        self.assertEqual(plan['name'][:2], ('name', False))
+        self.assertNotIn('company', plan)
+        self.assertNotIn('--name', plan)
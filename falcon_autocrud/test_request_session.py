@@ -0,0 +1,94 @@
+import json
+from sqlalchemy.event import listen, remove
+
+from falcon_autocrud.auth import identify
+from .resource import CollectionResource, SingleResource
+from .test_base import BaseTestCase
+from .test_fixtures import Account
+
+
+sessions = []
+
+class AccountIdentifier(object):
+    def identify(self, req, resp, resource, params):
+        db_session = req.context['db_session']
+        sessions.append(db_session)
+        req.context['user'] = db_session.query(Account).filter(Account.owner == req.get_header('Authorization')).one()
+
+@identify(AccountIdentifier)
+class AccountCollectionResource(CollectionResource):
+    model = Account
+
+    def before_post(self, req, resp, db_session, resource, *args, **kwargs):
+        sessions.append(db_session)
+
+    def after_post(self, req, resp, resource):
+        sessions.append(req.context['db_session'])
+
+@identify(AccountIdentifier)
+class AccountResource(SingleResource):
+    model = Account
+
+class AutocommitAccountResource(SingleResource):
+    model           = Account
+    read_autocommit = True
+
+
+class RequestSessionTest(BaseTestCase):
+    def create_test_resources(self):
+        self.accounts = AccountCollectionResource(self.db_engine)
+        self.app.add_route('/accounts', self.accounts)
+        self.app.add_route('/accounts/{id}', AccountResource(self.db_engine))
+        self.autocommit = AutocommitAccountResource(self.db_engine)
+        self.app.add_route('/autocommit-accounts/{id}', self.autocommit)
+
+    def create_common_fixtures(self):
+        self.db_session.add(Account(id=1, name='Initech Sales', owner='Jim'))
+        self.db_session.commit()
+        del sessions[:]
+
+    def test_shared_session(self):
+        response, = self.simulate_request('/accounts', method='POST', body=json.dumps({'name': 'Initrode Sales', 'owner': 'Bob'}), headers={'Accept': 'application/json', 'Content-Type': 'application/json', 'Authorization': 'Jim'})
+        self.assertCreated(response)
+        self.assertEqual(len(sessions), 3)
+        self.assertIs(sessions[0], sessions[1])
+        self.assertIs(sessions[0], sessions[2])
+
+    def test_one_connection(self):
+        checkouts = []
+        checkins  = []
+        def checkout(dbapi_connection, connection_record, connection_proxy):
+            checkouts.append(dbapi_connection)
+        def checkin(dbapi_connection, connection_record):
+            checkins.append(dbapi_connection)
+        listen(self.db_engine, 'checkout', checkout)
+        listen(self.db_engine, 'checkin', checkin)
+        try:
+            response, = self.simulate_request('/accounts/1', method='GET', headers={'Accept': 'application/json', 'Authorization': 'Jim'})
+        finally:
+            remove(self.db_engine, 'checkout', checkout)
+            remove(self.db_engine, 'checkin', checkin)
+        self.assertEqual(self.srmock.status, '200 OK')
+        self.assertEqual(len(checkouts), 1)
+        # The session is closed, returning the connection, with the response.
+        # Not every pool can count checked out connections, so count checkins
+        self.assertEqual(len(checkins), 1)
+
+    def test_session_factory_cached(self):
+        self.assertIs(self.accounts.session_factory, self.accounts.session_factory)
+        self.assertEqual(self.accounts.session_factory.kw['bind'], self.db_engine)
+
+    def test_read_only_gets(self):
+        response, = self.simulate_request('/accounts/1', method='GET', headers={'Accept': 'application/json', 'Authorization': 'Jim'})
+        self.assertEqual(self.srmock.status, '200 OK')
+        self.assertFalse(sessions[0].autoflush)
+
+        response, = self.simulate_request('/accounts', method='POST', body=json.dumps({'name': 'Initrode Sales', 'owner': 'Bob'}), headers={'Accept': 'application/json', 'Content-Type': 'application/json', 'Authorization': 'Jim'})
+        self.assertCreated(response)
+        self.assertTrue(sessions[1].autoflush)
+
+    def test_read_autocommit(self):
+        self.assertEqual(self.autocommit.read_session_factory.kw['bind'].get_execution_options()['isolation_level'], 'AUTOCOMMIT')
+        self.assertIs(self.autocommit.session_factory.kw['bind'], self.db_engine)
+        response, = self.simulate_request('/autocommit-accounts/1', method='GET', headers={'Accept': 'application/json'})
+        self.assertEqual(json.loads(response.decode('utf-8'))['data']['attributes']['name'], 'Initech Sales')
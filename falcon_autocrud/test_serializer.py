@@ -0,0 +1,61 @@
+from datetime import datetime, time
+from decimal import Decimal
+import unittest
+
+from .serialize import get_serializer, serialize_value
+from .test_fixtures import Employee
+
+
+class SerializerTest(unittest.TestCase):
+    def employee(self):
+        return Employee(
+            id=1,
+            name='Jim',
+            joined=datetime(2016, 10, 1, 13, 0, 0, 123456),
+            left=None,
+            pay_rate=Decimal('25.4000'),
+            start_time=time(9, 0, 0),
+        )
+
+    def test_compiled_once(self):
+        serializer = get_serializer(Employee, ['id', 'name'], {}, ['left'])
+        self.assertIs(get_serializer(Employee, ['id', 'name'], {}, ['left']), serializer)
+        self.assertIsNot(get_serializer(Employee, ['id', 'name'], {}, []), serializer)
+
+    def test_types(self):
+        self.assertEqual(
+            get_serializer(Employee)(self.employee()),
+            {
+                'id':           1,
+                'name':         'Jim',
+                'joined':       '2016-10-01T13:00:00Z',
+                'left':         None,
+                'company_id':   None,
+                'pay_rate':     25.4,
+                'start_time':   '09:00:00',
+                'lunch_start':  None,
+                'end_time':     None,
+                'caps_name':    None,
+            }
+        )
+
+    def test_naive_datetimes(self):
+        self.assertEqual(
+            get_serializer(Employee, ['joined'], None, ['joined'])(self.employee()),
+            {'joined': '2016-10-01T13:00:00'}
+        )
+
+    def test_response_fields(self):
+        # Relationships are skipped, and field order is kept
+        data = get_serializer(Employee, ['name', 'company', 'id'])(self.employee())
+        self.assertEqual(list(data.keys()), ['name', 'id'])
+
+    def test_matches_value_serialization(self):
+        employee = self.employee()
+        self.assertEqual(
+            get_serializer(Employee)(employee),
+            {
+                key: serialize_value(key, getattr(employee, key))
+                for key in get_serializer(Employee)(employee).keys()
+            }
+        )
@@ -0,0 +1,79 @@
+from datetime import datetime
+import json
+
+from .paging import encode_cursor
+from .resource import CollectionResource
+from .test_base import BaseTestCase
+from .test_fixtures import Company, Employee
+
+
+class EmployeeCollectionResource(CollectionResource):
+    model = Employee
+
+class CompanyEmployeeCollectionResource(CollectionResource):
+    model       = Employee
+    attr_map    = {'company_id': 'company_id'}
+
+class FilteredEmployeeCollectionResource(CollectionResource):
+    model = Employee
+
+    def get_filter(self, req, resp, query, *args, **kwargs):
+        return query.filter(Employee.left.is_(None))
+
+class UncachedEmployeeCollectionResource(CollectionResource):
+    model                   = Employee
+    statement_cache_size    = 0
+
+
+class StatementCacheTest(BaseTestCase):
+    def create_test_resources(self):
+        self.employees = EmployeeCollectionResource(self.db_engine)
+        self.company_employees = CompanyEmployeeCollectionResource(self.db_engine)
+        self.filtered = FilteredEmployeeCollectionResource(self.db_engine)
+        self.uncached = UncachedEmployeeCollectionResource(self.db_engine)
+        self.app.add_route('/employees', self.employees)
+        self.app.add_route('/companies/{company_id}/employees', self.company_employees)
+        self.app.add_route('/filtered-employees', self.filtered)
+        self.app.add_route('/uncached-employees', self.uncached)
+
+    def create_common_fixtures(self):
+        self.db_session.add(Company(id=1, name='Initech'))
+        self.db_session.add(Company(id=2, name='Initrode'))
+        for index in range(1, 11):
+            self.db_session.add(Employee(id=index, name='Employee {0}'.format(index), company_id=index % 2 + 1))
+        self.db_session.commit()
+
+    def get(self, path, query_string):
+        response, = self.simulate_request(path, method='GET', query_string=query_string, headers={'Accept': 'application/json'})
+        self.assertEqual(self.srmock.status, '200 OK')
+        return [item['pk'] for item in json.loads(response.decode('utf-8'))['data']]
+
+    def test_same_shape(self):
+        self.assertEqual(self.get('/employees', 'id__gte=3&id__lt=6&__sort=-id'), [5, 4, 3])
+        self.assertEqual(self.get('/employees', 'id__gte=7&id__lt=9&__sort=-id'), [8, 7])
+        self.assertEqual(self.get('/employees', 'id__in=2,4,9&__sort=-id'), [9, 4, 2])
+        self.assertEqual(self.get('/employees', 'id__in=1,10&__sort=-id'), [10, 1])
+        self.assertEqual(self.employees.statement_cache_info(), {'hits': 2, 'misses': 2, 'size': 2})
+
+        # The value of a null filter changes the statement
+        self.assertEqual(self.get('/employees', 'left__null=1&__sort=id&__page=1&__page_size=2'), [1, 2])
+        self.assertEqual(self.get('/employees', 'left__null=0&__sort=id&__page=1&__page_size=2'), [])
+        self.assertEqual(self.employees.statement_cache_info()['misses'], 4)
+
+    def test_url_arguments(self):
+        self.assertEqual(self.get('/companies/1/employees', '__sort=id'), [2, 4, 6, 8, 10])
+        self.assertEqual(self.get('/companies/2/employees', '__sort=id'), [1, 3, 5, 7, 9])
+        self.assertEqual(self.company_employees.statement_cache_info(), {'hits': 1, 'misses': 1, 'size': 1})
+
+    def test_keyset(self):
+        self.assertEqual(self.get('/employees', '__sort=-id&__page_size=4&__after=' + encode_cursor(['-id'], [7])), [6, 5, 4, 3])
+        self.assertEqual(self.get('/employees', '__sort=-id&__page_size=4&__after=' + encode_cursor(['-id'], [3])), [2, 1])
+        self.assertEqual(self.employees.statement_cache_info()['hits'], 1)
+
+    def test_bypassed(self):
+        self.db_session.query(Employee).filter(Employee.id == 1).update({'left': datetime(2016, 1, 1)})
+        self.db_session.commit()
+        self.assertEqual(self.get('/filtered-employees', 'id__lt=3'), [2])
+        self.assertEqual(self.get('/uncached-employees', 'id__lt=3&__sort=id'), [1, 2])
+        self.assertEqual(self.filtered.statement_cache_info(), {'hits': 0, 'misses': 0, 'size': 0})
+        self.assertEqual(self.uncached.statement_cache_info(), {'hits': 0, 'misses': 0, 'size': 0})
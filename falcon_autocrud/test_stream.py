@@ -0,0 +1,57 @@
+import json
+
+from .resource import CollectionResource
+from .test_base import BaseTestCase
+from .test_fixtures import Account
+
+
+class AccountCollectionResource(CollectionResource):
+    model = Account
+
+class StreamedAccountCollectionResource(CollectionResource):
+    model               = Account
+    stream_results      = True
+    stream_chunk_size   = 2
+
+
+class StreamTest(BaseTestCase):
+    def create_test_resources(self):
+        self.app.add_route('/accounts', AccountCollectionResource(self.db_engine))
+        self.app.add_route('/streamed-accounts', StreamedAccountCollectionResource(self.db_engine))
+
+    def create_common_fixtures(self):
+        for index in range(1, 8):
+            self.db_session.add(Account(id=index, name='Account {0}'.format(index), owner='Owner {0}'.format(index)))
+        self.db_session.commit()
+
+    def get(self, path, query_string=''):
+        return self.simulate_request(path, method='GET', query_string=query_string, headers={'Accept': 'application/json'})
+
+    def test_streamed_in_chunks(self):
+        chunks = list(self.get('/streamed-accounts'))
+        self.assertEqual(self.srmock.status, '200 OK')
+        self.assertGreater(len(chunks), 1)
+
+        expected, = self.get('/accounts')
+        self.assertEqual(json.loads(b''.join(chunks).decode('utf-8')), json.loads(expected.decode('utf-8')))
+
+    def test_paging(self):
+        streamed = json.loads(b''.join(self.get('/streamed-accounts', '__sort=-id&__page=2&__page_size=3')).decode('utf-8'))
+        self.assertEqual([item['pk'] for item in streamed['data']], [4, 3, 2])
+        self.assertEqual(streamed['meta'], {'total': 7, 'page': 2, 'page_size': 3})
+
+    def test_empty(self):
+        streamed = b''.join(self.get('/streamed-accounts', 'name=Nobody'))
+        self.assertEqual(json.loads(streamed.decode('utf-8')), {'data': []})
+
+    def test_invalid_before_streaming(self):
+        response, = self.get('/streamed-accounts', '__sort=nonexistent')
+        self.assertBadRequest(response, 'Invalid attribute', 'An attribute provided for sorting is invalid')
+
+    def test_closed_early(self):
+        stream = self.get('/streamed-accounts')
+        next(iter(stream))
+        stream.close()
+        # The session was released, so the table is not locked
+        self.db_session.add(Account(id=100, name='Late', owner='Late'))
+        self.db_session.commit()
@@ -156,3 +156,17 @@ class SubresourceTest(BaseTestCase):
 
         characters = self.db_session.query(Character).filter(Character.team_id == 1).order_by(Character.name)
         self.assertEqual([character.name for character in characters], ['Oliver'])
+
+    def test_nested(self):
+        post = {
+            'name':     'Alice',
+            'company':  {
+                'name':         'BigCorp',
+                'employees':    [{'name': 'Bob'}, {'name': 'Jim'}],
+            },
+        }
+        response, = self.simulate_request('/employees', method='POST', body=json.dumps(post), headers={'Accept': 'application/json', 'Content-Type': 'application/json'})
+        self.assertEqual(self.srmock.status, '201 Created')
+
+        company = self.db_session.query(Company).filter(Company.name == 'BigCorp').one()
+        self.assertEqual(sorted(employee.name for employee in company.employees), ['Alice', 'Bob', 'Jim'])
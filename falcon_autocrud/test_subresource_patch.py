@@ -0,0 +1,53 @@
+import json
+
+from .resource import SingleResource
+from .test_base import BaseTestCase
+from .test_fixtures import Company, Employee
+
+
+class CompanyResource(SingleResource):
+    model               = Company
+    allow_subresources  = True
+    response_fields     = ['id', 'name']
+
+
+class SubresourcePatchTest(BaseTestCase):
+    def create_test_resources(self):
+        self.app.add_route('/companies/{id}', CompanyResource(self.db_engine))
+
+    def create_common_fixtures(self):
+        self.db_session.add(Company(id=1, name='Initech'))
+        self.db_session.add(Company(id=2, name='Initrode'))
+        for index in range(1, 6):
+            self.db_session.add(Employee(id=index, name='Employee {0}'.format(index), company_id=1))
+        self.db_session.add(Employee(id=6, name='Employee 6', company_id=2))
+        self.db_session.commit()
+
+    def patch(self, body):
+        with self.capture_queries() as queries:
+            response, = self.simulate_request('/companies/1', method='PATCH', body=json.dumps(body), headers={'Accept': 'application/json', 'Content-Type': 'application/json'})
+        return response, queries
+
+    def test_targeted(self):
+        response, queries = self.patch({'employees': [{'pk': 4, 'name': 'Bob'}, {'pk': 2, 'name': 'Jim'}]})
+        self.assertOK(response, {
+            'data': {
+                'id':           1,
+                'name':         'Initech',
+                'employees':    [{'id': 4, 'name': 'Bob'}, {'id': 2, 'name': 'Jim'}],
+            }
+        })
+        employee_selects = [query for query in queries if query.startswith('SELECT employees')]
+        self.assertEqual(len(employee_selects), 1)
+        self.assertIn(' IN ', employee_selects[0])
+
+        employees = self.db_session.query(Employee).order_by(Employee.id)
+        self.assertEqual(
+            [employee.name for employee in employees],
+            ['Employee 1', 'Jim', 'Employee 3', 'Bob', 'Employee 5', 'Employee 6'],
+        )
+
+    def test_missing(self):
+        response, _ = self.patch({'employees': [{'pk': 99, 'name': 'Bob'}, {'pk': 2, 'name': 'Jim'}, {'pk': 6, 'name': 'Alice'}]})
+        self.assertBadRequest(response, 'Invalid request', 'Primary keys 99, 6 not found in related resources.')
+        self.assertEqual(self.db_session.query(Employee).get(2).name, 'Employee 2')
@@ -0,0 +1,201 @@
+import json
+
+from .resource import CollectionResource
+from .test_base import BaseTestCase
+from .test_fixtures import Account, Company, Employee
+
+
+class AccountCollectionResource(CollectionResource):
+    model           = Account
+    methods         = ['POST']
+    post_upsert     = True
+    conflict_target = ['name']
+
+class CompanyCollectionResource(CollectionResource):
+    model           = Company
+    methods         = ['POST']
+    post_upsert     = True
+    conflict_target = ['name']
+
+class EmployeeCollectionResource(CollectionResource):
+    model               = Employee
+    methods             = ['PATCH']
+    allowed_patch_ops   = ['add', 'upsert']
+    conflict_target     = {Employee: ['name']}
+
+class CompanyEmployeeCollectionResource(CollectionResource):
+    model               = Employee
+    methods             = ['PATCH']
+    allowed_patch_ops   = ['upsert']
+    attr_map            = {'company_id': 'company_id'}
+    conflict_target     = ['name']
+
+class FilteredEmployeeCollectionResource(CollectionResource):
+    model               = Employee
+    methods             = ['PATCH']
+    allowed_patch_ops   = ['upsert']
+    attr_map            = {'company_id': 'company_id'}
+
+    def get_filter(self, req, resp, query, *args, **kwargs):
+        return query.filter(Employee.caps_name != 'HIDDEN')
+
+class FilteredAccountCollectionResource(CollectionResource):
+    model           = Account
+    methods         = ['POST']
+    post_upsert     = True
+    conflict_target = ['name']
+
+    def get_filter(self, req, resp, query, *args, **kwargs):
+        return query.filter(Account.owner != 'Jim')
+
+
+class UpsertTest(BaseTestCase):
+    def create_test_resources(self):
+        self.app.add_route('/accounts', AccountCollectionResource(self.db_engine))
+        self.app.add_route('/companies', CompanyCollectionResource(self.db_engine))
+        self.app.add_route('/employees', EmployeeCollectionResource(self.db_engine))
+        self.app.add_route('/companies/{company_id}/employees', CompanyEmployeeCollectionResource(self.db_engine))
+        self.app.add_route('/filtered/companies/{company_id}/employees', FilteredEmployeeCollectionResource(self.db_engine))
+        self.app.add_route('/filtered/accounts', FilteredAccountCollectionResource(self.db_engine))
+
+    def create_common_fixtures(self):
+        self.db_session.add(Account(id=1, name='Initech Sales', owner='Jim'))
+        self.db_session.add(Company(id=1, name='Initech'))
+        self.db_session.add(Employee(id=1, name='Jim', company_id=1, caps_name='JIM'))
+        self.db_session.commit()
+
+    def request(self, method, path, body):
+        response, = self.simulate_request(path, method=method, body=json.dumps(body), headers={'Accept': 'application/json', 'Content-Type': 'application/json'})
+        return response
+
+    def patch(self, path, patches):
+        return self.request('PATCH', path, {'patches': patches})
+
+    def test_post_update(self):
+        response = self.request('POST', '/accounts', {'name': 'Initech Sales', 'owner': 'Bob'})
+        self.assertOK(response, {
+            'data': {'id': 1, 'name': 'Initech Sales', 'owner': 'Bob'},
+            'meta': {'upserted': 'updated'},
+        })
+        self.assertEqual(self.db_session.query(Account).count(), 1)
+
+    def test_post_insert(self):
+        response = self.request('POST', '/accounts', {'name': 'Initrode Sales', 'owner': 'Bob'})
+        self.assertCreated(response, {
+            'data': {'id': 2, 'name': 'Initrode Sales', 'owner': 'Bob'},
+            'meta': {'upserted': 'inserted'},
+        })
+
+    def test_post_many(self):
+        with self.capture_queries() as queries:
+            response = self.request('POST', '/accounts', [
+                {'name': 'Initrode Sales', 'owner': 'Bob'},
+                {'name': 'Initech Sales', 'owner': 'Alice'},
+            ])
+        self.assertCreated(response, {
+            'data': [
+                {'id': 2, 'name': 'Initrode Sales', 'owner': 'Bob'},
+                {'id': 1, 'name': 'Initech Sales', 'owner': 'Alice'},
+            ],
+            'meta': {'upserted': ['inserted', 'updated']},
+        })
+        self.assertEqual(len([query for query in queries if query.startswith('INSERT')]), 1)
+        self.assertEqual(len([query for query in queries if query.startswith('UPDATE')]), 0)
+
+    def test_post_missing_target(self):
+        response = self.request('POST', '/accounts', {'owner': 'Bob'})
+        self.assertBadRequest(response, 'Invalid request body', 'Item 0 does not have the attributes to upsert on')
+
+    def test_post_linked(self):
+        response = self.request('POST', '/companies', [
+            {'name': 'Initrode'},
+            {'name': 'Initech', 'employees': [{'name': 'Bob'}]},
+        ])
+        self.assertBadRequest(response, 'Invalid request body', 'Item 1 has linked resources, which can\'t be upserted')
+        self.assertEqual([company.name for company in self.db_session.query(Company)], ['Initech'])
+        self.assertEqual(self.db_session.query(Employee).count(), 1)
+
+    def test_post_conflict(self):
+        # The owner is unique too, and isn't the conflict target
+        response = self.request('POST', '/accounts', {'name': 'Initrode Sales', 'owner': 'Jim'})
+        self.assertConflict(response)
+
+    def test_patch(self):
+        response = self.patch('/employees', [
+            {'op': 'upsert', 'path': '/', 'value': {'name': 'Bob', 'company_id': 1}},
+            {'op': 'upsert', 'path': '/', 'value': {'name': 'Jim', 'caps_name': 'JAMES'}},
+        ])
+        self.assertOK(response, {
+            'data': [
+                {'pk': 2, 'type': 'employees', 'upserted': 'inserted'},
+                {'pk': 1, 'type': 'employees', 'upserted': 'updated'},
+            ],
+        })
+        employees = self.db_session.query(Employee).order_by(Employee.id).all()
+        self.assertEqual(
+            [(employee.name, employee.company_id, employee.caps_name) for employee in employees],
+            [('Jim', 1, 'JAMES'), ('Bob', 1, None)],
+        )
+
+    def test_patch_path_attributes(self):
+        self.db_session.add(Company(id=2, name='Initrode'))
+        self.db_session.commit()
+        response = self.patch('/companies/2/employees', [
+            {'op': 'upsert', 'path': '/', 'value': {'name': 'Bob'}},
+        ])
+        self.assertOK(response, {'data': [{'pk': 2, 'type': 'employees', 'upserted': 'inserted'}]})
+        self.assertEqual(self.db_session.query(Employee).get(2).company_id, 2)
+
+        response = self.patch('/companies/1/employees', [
+            {'op': 'upsert', 'path': '/', 'value': {'name': 'Jim', 'caps_name': 'JAMES'}},
+        ])
+        self.assertOK(response, {'data': [{'pk': 1, 'type': 'employees', 'upserted': 'updated'}]})
+
+    def test_patch_outside_path(self):
+        # Jim belongs to company 1, so is out of reach under company 2
+        self.db_session.add(Company(id=2, name='Initrode'))
+        self.db_session.commit()
+        response = self.patch('/companies/2/employees', [
+            {'op': 'upsert', 'path': '/', 'value': {'name': 'Jim'}},
+        ])
+        self.assertConflict(response, 'Resource found but conditions violated')
+        self.db_session.expire_all()
+        self.assertEqual(self.db_session.query(Employee).get(1).company_id, 1)
+
+    def test_patch_hidden(self):
+        self.db_session.add(Company(id=2, name='Initrode'))
+        self.db_session.add(Employee(id=5, name='Bob', company_id=1, caps_name='HIDDEN'))
+        self.db_session.commit()
+        response = self.patch('/filtered/companies/1/employees', [
+            {'op': 'upsert', 'path': '/', 'value': {'id': 1, 'name': 'James'}},
+            {'op': 'upsert', 'path': '/', 'value': {'id': 5, 'name': 'Robert'}},
+        ])
+        self.assertConflict(response, 'Resource found but conditions violated')
+        self.db_session.expire_all()
+        self.assertEqual(
+            [(employee.id, employee.name) for employee in self.db_session.query(Employee).order_by(Employee.id)],
+            [(1, 'Jim'), (5, 'Bob')],
+        )
+
+        response = self.patch('/filtered/companies/1/employees', [
+            {'op': 'upsert', 'path': '/', 'value': {'id': 1, 'name': 'James'}},
+            {'op': 'upsert', 'path': '/', 'value': {'id': 6, 'name': 'Robert'}},
+        ])
+        self.assertOK(response, {
+            'data': [
+                {'pk': 1, 'type': 'employees', 'upserted': 'updated'},
+                {'pk': 6, 'type': 'employees', 'upserted': 'inserted'},
+            ],
+        })
+
+    def test_post_hidden(self):
+        response = self.request('POST', '/filtered/accounts', {'name': 'Initech Sales', 'owner': 'Bob'})
+        self.assertConflict(response, 'Resource found but conditions violated')
+        self.db_session.expire_all()
+        self.assertEqual(self.db_session.query(Account).get(1).owner, 'Jim')
+
+    def test_patch_missing_target(self):
+        response = self.patch('/employees', [
+            {'op': 'upsert', 'path': '/', 'value': {'caps_name': 'BOB'}},
+        ])
+        self.assertBadRequest(response, 'Invalid patch', 'Patch 0 is not valid for op upsert')
@@ -0,0 +1,70 @@
+import jsonschema
+import jsonschema.exceptions
+import unittest
+
+from .validator import FastjsonschemaValidator, JSONSchemaValidator
+
+
+SCHEMA = {
+    'type':         'object',
+    'properties':   {
+        'name':     {'type': 'string'},
+        'joined':   {'type': 'string', 'format': 'date-time'},
+        'pay_rate': {'type': 'number', 'minimum': 0, 'default': 10},
+    },
+    'required':     ['name'],
+}
+
+
+class ValidatorTest(unittest.TestCase):
+    validator_class = JSONSchemaValidator
+
+    def setUp(self):
+        try:
+            self.validator = self.validator_class()
+        except ImportError:
+            self.skipTest('Validator library is not installed')
+
+    def test_compiled_once(self):
+        compiled = []
+        compile = self.validator.compile
+        def counting_compile(schema):
+            compiled.append(schema)
+            return compile(schema)
+        self.validator.compile = counting_compile
+        for _ in range(3):
+            self.validator.validate({'name': 'Jim'}, SCHEMA)
+        self.assertEqual(compiled, [SCHEMA])
+
+    def test_same_errors(self):
+        for doc in [{}, {'name': 5}, {'name': 'Jim', 'pay_rate': -1}, []]:
+            with self.assertRaises(jsonschema.exceptions.ValidationError) as expected:
+                jsonschema.validate(doc, SCHEMA)
+            with self.assertRaises(jsonschema.exceptions.ValidationError) as raised:
+                self.validator.validate(doc, SCHEMA)
+            self.assertEqual(str(raised.exception), str(expected.exception))
+
+    def test_documents_unchanged(self):
+        doc = {'name': 'Jim', 'joined': 'not checked'}
+        self.validator.validate(doc, SCHEMA)
+        self.assertEqual(doc, {'name': 'Jim', 'joined': 'not checked'})
+
+    def test_invalid_schema(self):
+        self.assertRaises(jsonschema.exceptions.SchemaError, self.validator.validate, {}, {'type': 'nothing'})
+
+    def test_draft3_schema(self):
+        schema = {
+            '$schema':      'http://json-schema.org/draft-03/schema#',
+            'type':         'object',
+            'properties':   {'name': {'type': 'string', 'required': True}},
+        }
+        self.validator.validate({'name': 'Jim'}, schema)
+        with self.assertRaises(jsonschema.exceptions.ValidationError) as expected:
+            jsonschema.validate({}, schema)
+        with self.assertRaises(jsonschema.exceptions.ValidationError) as raised:
+            self.validator.validate({}, schema)
+        self.assertEqual(str(raised.exception), str(expected.exception))
+
+
+class FastjsonschemaValidatorTest(ValidatorTest):
+    validator_class = FastjsonschemaValidator
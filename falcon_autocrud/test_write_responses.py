@@ -0,0 +1,87 @@
+import json
+from sqlalchemy import Column, Integer, String, text
+
+from .resource import CollectionResource, SingleResource
+from .statements import supports_returning
+from .test_base import Base, BaseTestCase
+from .test_fixtures import Account, Company
+
+
+class Ticket(Base):
+    __tablename__ = 'tickets'
+    id          = Column(Integer, primary_key=True)
+    title       = Column(String(50))
+    status      = Column(String(20), server_default=text("'open'"))
+
+
+class AccountCollectionResource(CollectionResource):
+    model = Account
+
+class AccountResource(SingleResource):
+    model = Account
+
+class CompanyCollectionResource(CollectionResource):
+    model = Company
+
+class TicketCollectionResource(CollectionResource):
+    model = Ticket
+
+class HookedAccountResource(SingleResource):
+    model = Account
+
+    def before_patch(self, req, resp, db_session, resource, *args, **kwargs):
+        pass
+
+
+class WriteResponseTest(BaseTestCase):
+    """
+    Responses to writes are serialized from the flushed instances, rather
+    than by reloading them once the commit has expired them.
+    """
+    def create_test_resources(self):
+        self.app.add_route('/accounts', AccountCollectionResource(self.db_engine))
+        self.app.add_route('/accounts/{id}', AccountResource(self.db_engine))
+        self.app.add_route('/hooked-accounts/{id}', HookedAccountResource(self.db_engine))
+        self.app.add_route('/companies', CompanyCollectionResource(self.db_engine))
+        self.app.add_route('/tickets', TicketCollectionResource(self.db_engine))
+
+    def request(self, method, path, body):
+        with self.capture_queries() as queries:
+            response, = self.simulate_request(path, method=method, body=json.dumps(body), headers={'Accept': 'application/json', 'Content-Type': 'application/json'})
+        return response, [query for query in queries if query.startswith('SELECT')]
+
+    def test_post(self):
+        response, selects = self.request('POST', '/accounts', {'name': 'Initech Sales', 'owner': 'Jim'})
+        self.assertCreated(response, {'data': {'id': 1, 'name': 'Initech Sales', 'owner': 'Jim'}})
+        self.assertEqual(selects, [])
+
+    def test_post_subresources(self):
+        with self.capture_queries() as queries:
+            response, = self.simulate_request('/companies', method='POST', body=json.dumps({'name': 'Initech', 'employees': [{'name': 'Jim'}]}), headers={'Accept': 'application/json', 'Content-Type': 'application/json'})
+        self.assertEqual(self.srmock.status, '201 Created')
+        self.assertEqual(json.loads(response.decode('utf-8'))['data']['employees']['name'], 'Jim')
+        # One flush of INSERTs, without a savepoint or foreign key UPDATEs
+        self.assertEqual([query.split()[0] for query in queries], ['INSERT', 'INSERT'])
+
+    def test_put(self):
+        self.db_session.add(Account(id=1, name='Initech Sales', owner='Jim'))
+        self.db_session.commit()
+        response, selects = self.request('PUT', '/accounts/1', {'name': 'Initrode Sales', 'owner': 'Bob'})
+        self.assertOK(response, {'data': {'id': 1, 'name': 'Initrode Sales', 'owner': 'Bob'}})
+        # Only the load of the instance to change
+        self.assertEqual(len(selects), 1)
+
+    def test_patch(self):
+        self.db_session.add(Account(id=1, name='Initech Sales', owner='Jim'))
+        self.db_session.commit()
+        response, selects = self.request('PATCH', '/hooked-accounts/1', {'owner': 'Bob'})
+        self.assertOK(response, {'data': {'id': 1, 'name': 'Initech Sales', 'owner': 'Bob'}})
+        # The instance is loaded by the arguments, and then the preconditions
+        self.assertEqual(len(selects), 2)
+
+    def test_post_server_default(self):
+        response, selects = self.request('POST', '/tickets', {'title': 'Printer jam'})
+        self.assertCreated(response, {'data': {'id': 1, 'title': 'Printer jam', 'status': 'open'}})
+        if supports_returning(self.db_engine.dialect, 'insert'):
+            # The default is returned by the INSERT
+            self.assertEqual(selects, [])
@@ -0,0 +1,79 @@
+import jsonschema
+import jsonschema.exceptions
+import jsonschema.validators
+
+
+class JSONSchemaValidator(object):
+    """
+    Validates documents against JSON schemas using the jsonschema library.
+
+    Each schema is checked against its metaschema, and its validator built,
+    only the first time it is used.  Schemas are cached by identity, so they
+    must not be changed once in use.
+    """
+    def __init__(self):
+        self._validators = {}
+
+    def compile(self, schema):
+        """
+        Return a function validating documents against `schema`, which raises
+        jsonschema.exceptions.ValidationError for an invalid document.
+        """
+        validator_class = jsonschema.validators.validator_for(schema)
+        validator_class.check_schema(schema)
+        validator = validator_class(schema)
+        def validate(doc):
+            # The same error as jsonschema.validate reports
+            error = jsonschema.exceptions.best_match(validator.iter_errors(doc))
+            if error is not None:
+                raise error
+        return validate
+
+    def validate(self, doc, schema):
+        try:
+            validate = self._validators[id(schema)][1]
+        except KeyError:
+            validate = self.compile(schema)
+            # Hold on to the schema, so that its id is not reused while cached
+            self._validators[id(schema)] = (schema, validate)
+        validate(doc)
+
+
+class FastjsonschemaValidator(JSONSchemaValidator):
+    """
+    Validates documents with code generated for each schema by
+    fastjsonschema.  Documents it rejects are validated again with jsonschema,
+    so that the errors are the same as with JSONSchemaValidator.  Schemas
+    that jsonschema accepts but fastjsonschema cannot compile, such as draft 3
+    schemas, are validated with jsonschema alone.
+    """
+    def __init__(self):
+        import fastjsonschema
+        super(FastjsonschemaValidator, self).__init__()
+        self._compile               = fastjsonschema.compile
+        self._exception             = fastjsonschema.JsonSchemaException
+        self._definition_exception  = fastjsonschema.JsonSchemaDefinitionException
+
+    def compile(self, schema):
+        slow_validate = super(FastjsonschemaValidator, self).compile(schema)
+        try:
+            # Like jsonschema, leave documents unchanged and formats unchecked
+            fast_validate = self._compile(schema, use_default=False, use_formats=False)
+        except self._definition_exception:
+            return slow_validate
+        def validate(doc):
+            try:
+                fast_validate(doc)
+            except self._exception:
+                slow_validate(doc)
+        return validate
+
+
+def get_validator():
+    """
+    Return a validator using the fastest JSON schema library installed.
+    """
+    try:
+        return FastjsonschemaValidator()
+    except ImportError:
+        return JSONSchemaValidator()
@@ -32,6 +32,6 @@ setup(name='falcon-autocrud',
       install_requires=[
           'falcon >= 1.0.0',
           'jsonschema',
-          'sqlalchemy',
+          'sqlalchemy >= 2.0',
       ],
       zip_safe=False)